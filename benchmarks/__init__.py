@@ -0,0 +1 @@
+"""Benchmarks for OpenFinCh's data path. Run modules with ``python -m benchmarks.<name>``."""
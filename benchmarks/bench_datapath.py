@@ -0,0 +1,167 @@
+"""Benchmark the price-data path on synthetic OHLCV: cache writes/reads, resampling, chart prep.
+
+Usage: python -m benchmarks.bench_datapath [--repeat 5] [--seed 0] [--symbol BENCH]
+                                           [--output results.json]
+                                           [--baseline before.json] [--threshold 0.2]
+
+Yahoo is replaced by ``benchmarks.synthetic.FakeTicker`` and the cache
+lives in a temporary database, so runs are offline and repeatable. Each
+stage is timed on its own (``db.save_data`` and ``db.get_cached_data``
+per yfinance interval, ``_resample`` per resample rule,
+``prepare_chart_data`` per chart interval), then ``fetch_all_intervals``
+end to end: cold (empty cache, every interval downloaded and stored) and
+warm (everything served from the cache).
+
+Times are medians in milliseconds. ``--output`` writes them as JSON;
+``--baseline`` compares against such a file and exits with status 1 if
+any case got slower by more than ``--threshold`` (a fraction).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import fake_yahoo, make_history
+from openfinch.intervals import INTERVALS, _resample, db, fetch_all_intervals, prepare_chart_data
+
+
+def _use_db(path: Path):
+    """Point the cache at ``path`` (created on first connect)."""
+    db.DB_PATH = path
+    db._schema_checked = False
+
+
+def _median_ms(fn, repeat: int, setup=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def _groups() -> dict[str, str]:
+    """yfinance interval -> the period fetch_all_intervals downloads it with."""
+    groups: dict[str, str] = {}
+    for cfg in INTERVALS.values():
+        period = groups.get(cfg["yf_interval"])
+        if period != "max":
+            groups[cfg["yf_interval"]] = "max" if cfg["period"] == "max" else (period or cfg["period"])
+    return groups
+
+
+def run(repeat: int = 5, seed: int = 0, symbol: str = "BENCH") -> dict:
+    results: dict[str, float] = {}
+    frames = {yf_int: make_history(symbol, period, yf_int, seed) for yf_int, period in _groups().items()}
+
+    with tempfile.TemporaryDirectory(prefix="openfinch-bench-") as tmp:
+        tmp = Path(tmp)
+        original_path = db.DB_PATH
+        runs = iter(range(10**9))
+
+        def fresh_db():
+            _use_db(tmp / f"cache-{next(runs)}.db")
+            db.connect().close()
+
+        try:
+            for yf_int, df in frames.items():
+                results[f"save_data[{yf_int}]"] = _median_ms(
+                    lambda: db.save_data(symbol, yf_int, df), repeat, setup=fresh_db)
+            fresh_db()
+            for yf_int, df in frames.items():
+                db.save_data(symbol, yf_int, df)
+            cached = {}
+            for yf_int in frames:
+                results[f"get_cached_data[{yf_int}]"] = _median_ms(
+                    lambda: cached.__setitem__(yf_int, db.get_cached_data(symbol, yf_int)), repeat)
+
+            for key, cfg in INTERVALS.items():
+                if cfg["resample_rule"]:
+                    df = cached[cfg["yf_interval"]]
+                    results[f"resample[{key}]"] = _median_ms(lambda: _resample(df, cfg["resample_rule"]), repeat)
+            for key, cfg in INTERVALS.items():
+                df = cached[cfg["yf_interval"]]
+                if cfg["resample_rule"]:
+                    df = _resample(df, cfg["resample_rule"])
+                results[f"prepare_chart_data[{key}]"] = _median_ms(
+                    lambda: prepare_chart_data(df, cfg["intraday"]), repeat)
+
+            with fake_yahoo(seed), contextlib.redirect_stdout(io.StringIO()):
+                results["fetch_all_intervals[cold]"] = _median_ms(
+                    lambda: fetch_all_intervals(symbol), repeat, setup=fresh_db)
+                results["fetch_all_intervals[warm]"] = _median_ms(lambda: fetch_all_intervals(symbol), repeat)
+        finally:
+            _use_db(original_path)
+
+    return {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "symbol": symbol,
+            "rows": {yf_int: len(df) for yf_int, df in frames.items()},
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Cases present in both runs, with the ratio current/baseline and whether it regressed."""
+    rows = []
+    for case, ms in current["results"].items():
+        before = baseline["results"].get(case)
+        if not before:
+            continue
+        ratio = ms / before
+        rows.append({"case": case, "baselineMs": before, "ms": ms, "ratio": round(ratio, 3),
+                     "regressed": ratio > 1 + threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--symbol", default="BENCH")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown vs the baseline before failing (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    current = run(args.repeat, args.seed, args.symbol)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2), encoding="utf-8")
+
+    if not args.baseline:
+        print(f"{'case':<34}{'ms':>10}")
+        for case, ms in current["results"].items():
+            print(f"{case:<34}{ms:>10.3f}")
+        return
+
+    rows = compare(current, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+    print(f"{'case':<34}{'baseline ms':>12}{'ms':>10}{'ratio':>8}")
+    for r in rows:
+        flag = "  REGRESSED" if r["regressed"] else ""
+        print(f"{r['case']:<34}{r['baselineMs']:>12.3f}{r['ms']:>10.3f}{r['ratio']:>8.2f}{flag}")
+    regressed = [r["case"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"{len(regressed)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Benchmark DataFrame serialization: iterrows loops vs openfinch.serialize.
+
+Usage: python -m benchmarks.bench_serialize [--rows 1000] [--repeat 20]
+
+The ``_legacy_*`` functions are the per-row loops the endpoints used
+before the vectorized serializer, kept here as the baseline.
+"""
+
+import argparse
+import math
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from openfinch import serialize
+from openfinch.server import _insider_records
+
+
+def make_insiders(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Shares": np.where(rng.random(rows) < 0.2, np.nan, rng.integers(1, 10**6, rows).astype(float)),
+        "Value": np.where(rng.random(rows) < 0.3, np.nan, rng.random(rows) * 1e6),
+        "URL": "",
+        "Text": rng.choice(["Sale at price 190.00", "Purchase", "Gift", "Stock Award(Grant)", ""], rows),
+        "Insider": rng.choice(["COOK TIMOTHY D", "MAESTRI LUCA", "ADAMS KATHERINE L"], rows),
+        "Position": "Officer",
+        "Transaction": "",
+        "Start Date": pd.date_range("2020-01-01", periods=rows, freq="D"),
+        "Ownership": "D",
+    })
+
+
+def make_holders(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date Reported": pd.Timestamp("2025-09-30"),
+        "Holder": [f"Holder {i}" for i in range(rows)],
+        "pctHeld": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows) / 10),
+        "Shares": rng.integers(1, 10**9, rows),
+        "Value": rng.random(rows) * 1e10,
+        "pctChange": rng.normal(size=rows),
+    })
+
+
+def make_statement(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cols = pd.date_range("2015-12-31", periods=10, freq="YE")
+    data = np.where(rng.random((rows, 10)) < 0.2, np.nan, rng.normal(size=(rows, 10)) * 1e9)
+    return pd.DataFrame(data, index=[f"Line Item {i}" for i in range(rows)], columns=cols)
+
+
+def _legacy_insiders(df: pd.DataFrame) -> list[dict]:
+    insiders = []
+    for _, row in df.iterrows():
+        val = row.get("Value", None)
+        if val is not None:
+            try:
+                if math.isnan(val):
+                    val = None
+            except (TypeError, ValueError):
+                pass
+        shares = row.get("Shares", None)
+        if shares is not None:
+            try:
+                shares = None if math.isnan(shares) else int(shares)
+            except (TypeError, ValueError):
+                pass
+        start_date = row.get("Start Date", None)
+        if start_date is not None:
+            start_date = str(start_date)
+        txn = str(row.get("Transaction", "")).strip()
+        if not txn:
+            text = str(row.get("Text", "")).lower()
+            if "sale" in text:
+                txn = "Sale"
+            elif "purchase" in text or "buy" in text:
+                txn = "Purchase"
+            elif "gift" in text:
+                txn = "Stock Gift"
+            elif "exercise" in text:
+                txn = "Option Exercise"
+            elif val is not None and val > 0 and shares and shares > 0:
+                txn = "Sale"
+            elif val is None or val == 0:
+                txn = "Award"
+        insiders.append({
+            "insider": str(row.get("Insider", "")),
+            "position": str(row.get("Position", "")),
+            "transaction": txn,
+            "date": start_date or "",
+            "shares": shares,
+            "value": val,
+            "ownership": str(row.get("Ownership", "")),
+        })
+    return insiders
+
+
+def _legacy_holders(df: pd.DataFrame) -> list[dict]:
+    holders = []
+    for _, row in df.iterrows():
+        entry = {}
+        for col in df.columns:
+            v = row.get(col)
+            if v is not None and isinstance(v, float) and math.isnan(v):
+                v = None
+            entry[col] = str(v) if v is not None else None
+        holders.append(entry)
+    return holders
+
+
+def _legacy_statement(df: pd.DataFrame) -> dict:
+    out = {}
+    for col in df.columns:
+        col_key = col.strftime("%Y-%m-%d") if hasattr(col, "strftime") else str(col)
+        col_data = {}
+        for idx, val in df[col].items():
+            v = val
+            if v is not None and isinstance(v, float) and math.isnan(v):
+                v = None
+            col_data[str(idx)] = v
+        out[col_key] = col_data
+    return out
+
+
+def _time(fn, arg, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in milliseconds."""
+    return min(timeit.repeat(lambda: fn(arg), number=1, repeat=repeat)) * 1000
+
+
+def run(rows: int = 1000, repeat: int = 20) -> list[dict]:
+    cases = [
+        ("insiders", make_insiders(rows), _legacy_insiders, _insider_records),
+        ("holders", make_holders(rows), _legacy_holders,
+         lambda df: serialize.to_records(df, stringify=True)),
+        ("statement", make_statement(rows), _legacy_statement, serialize.to_columns),
+    ]
+    results = []
+    for name, df, legacy, vectorized in cases:
+        before = _time(legacy, df, repeat)
+        after = _time(vectorized, df, repeat)
+        results.append({
+            "case": name,
+            "rows": len(df),
+            "iterrowsMs": round(before, 3),
+            "vectorizedMs": round(after, 3),
+            "speedup": round(before / after, 1) if after else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<12}{'rows':>7}{'iterrows ms':>14}{'vectorized ms':>16}{'speedup':>10}")
+    for r in run(args.rows, args.repeat):
+        print(f"{r['case']:<12}{r['rows']:>7}{r['iterrowsMs']:>14.3f}{r['vectorizedMs']:>16.3f}{r['speedup']:>9}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark cold start: time from ``python -m openfinch`` to the first response for ``/``.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--port 8790]
+
+Each run starts a fresh headless server process, polls ``/`` until it
+answers, then stops the server. Also reports the time to import
+``openfinch.server`` in a fresh interpreter.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from openfinch.startup import import_times
+
+POLL_INTERVAL = 0.01
+TIMEOUT = 60.0
+
+
+def time_to_first_response(port: int) -> tuple[float, int]:
+    """Start a server and return (seconds until ``/`` answered, HTTP status)."""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "openfinch", "--headless", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        while time.perf_counter() - started < TIMEOUT:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    return time.perf_counter() - started, resp.status
+            except urllib.error.HTTPError as e:
+                return time.perf_counter() - started, e.code
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"server did not answer within {TIMEOUT:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(runs: int, port: int) -> dict:
+    imports = [
+        next(e["cumulativeMs"] for e in import_times() if e["module"] == "openfinch.server")
+        for _ in range(runs)
+    ]
+    first = [time_to_first_response(port) for _ in range(runs)]
+    return {
+        "importMs": statistics.median(imports),
+        "firstResponseMs": statistics.median(t for t, _ in first) * 1000,
+        "status": first[-1][1],
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    r = run(args.runs, args.port)
+    print(f"import openfinch.server   {r['importMs']:8.0f} ms  (median of {r['runs']})")
+    print(f"first response for /      {r['firstResponseMs']:8.0f} ms  (HTTP {r['status']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+"""Local stand-in for Yahoo Finance, Google News and SEC EDGAR, for offline load tests.
+
+Usage: python -m benchmarks.fixture_server [--port 9100] [--latency 50] [--jitter 20]
+                                           [--error-rate 0.01] [--throttle 20]
+                                           [--recordings DIR] [--symbols AAPL,MSFT,...]
+
+Then start OpenFinCh against it:
+
+    python -m openfinch --headless --upstream http://127.0.0.1:9100
+
+With the override, OpenFinCh requests ``<server>/<original host>/<path>``
+(see ``openfinch.upstream.resolve``). A file at ``DIR/<host>/<path>`` in
+the recordings directory is replayed as-is (query strings are ignored);
+everything else is synthesized: chart data from ``benchmarks.synthetic``,
+minimal quoteSummary/quote/search payloads, a Google News RSS feed, and an
+SEC 13F index page listing four quarterly 13F data set ZIPs covering
+``--symbols``.
+
+Every request first waits ``latency`` ± ``jitter`` ms. Beyond
+``--throttle`` requests per second per host it gets a 429 with
+Retry-After, and a ``--error-rate`` fraction of the rest get a 503.
+``GET /_stats`` returns request counts per host and status.
+
+yfinance only persists cookies set for a yahoo.com domain, so it can't
+keep the fixture's and asks fc.yahoo.com again before each call; those
+extra requests show up under that host.
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import mimetypes
+import random
+import re
+import threading
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from benchmarks.synthetic import INTRADAY_MINUTES, MAX_START, TZ, make_history
+
+DEFAULT_SYMBOLS = "AAPL,MSFT,NVDA,AMZN,GOOGL,META,TSLA,JPM,V,XOM"
+CRUMB = "fixturecrumb"
+# Old quarters, so the extracted data can't be mistaken for a real download:
+# (data set, period of report, filing date), newest first like SEC's index
+QUARTERS = [
+    ("01jan2000-31mar2000", "31-DEC-1999", "14-FEB-2000"),
+    ("01oct1999-31dec1999", "30-SEP-1999", "12-NOV-1999"),
+    ("01jul1999-30sep1999", "30-JUN-1999", "13-AUG-1999"),
+    ("01apr1999-30jun1999", "31-MAR-1999", "14-MAY-1999"),
+]
+ZIP_DIR = "/files/structureddata/data/form-13f-data-sets/"
+MANAGERS = 300
+HOLD_PROBABILITY = 0.6   # Chance a manager holds a symbol in a given quarter
+# Longest history Yahoo serves per intraday interval, in days
+INTRADAY_LIMIT_DAYS = {"1m": 8, "1h": 730, "60m": 730}
+DEFAULT_INTRADAY_LIMIT = 60
+
+
+@dataclass
+class Config:
+    latency: float = 0.0        # Seconds
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle: float = 0.0       # Requests per second per host; 0 = unlimited
+    recordings: Path | None = None
+    symbols: list[str] = field(default_factory=lambda: DEFAULT_SYMBOLS.split(","))
+    seed: int = 0
+
+
+class _Throttle:
+    """Token bucket per host; a burst of one second's worth of requests is allowed."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.buckets: dict[str, tuple[float, float]] = {}   # host -> (tokens, updated)
+        self.lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated = self.buckets.get(host, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self.buckets[host] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+
+class _Stats:
+    def __init__(self):
+        self.counts: dict[str, dict[int, int]] = {}
+        self.lock = threading.Lock()
+
+    def add(self, host: str, status: int):
+        with self.lock:
+            by_status = self.counts.setdefault(host, {})
+            by_status[status] = by_status.get(status, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {host: dict(by_status) for host, by_status in self.counts.items()}
+
+
+def cusip6(symbol: str) -> str:
+    return f"{zlib.crc32(symbol.encode()) % 10**6:06d}"
+
+
+def company_name(symbol: str) -> str:
+    return f"{symbol} Fixture Corp"
+
+
+def _json(payload) -> tuple[int, str, bytes]:
+    return 200, "application/json", json.dumps(payload).encode()
+
+
+# -- Yahoo ---------------------------------------------------------------------
+
+def _history_window(query: dict, interval: str) -> tuple[str, pd.Timestamp]:
+    """(period, end) for a chart request given as range=... or period1/period2."""
+    now = pd.Timestamp.now(tz=TZ).floor("min")
+    if "period1" in query:
+        start = pd.Timestamp(int(float(query["period1"])), unit="s", tz=TZ)
+        end = min(now, pd.Timestamp(int(float(query.get("period2", now.timestamp()))), unit="s", tz=TZ))
+        if interval not in INTRADAY_MINUTES and start <= MAX_START:
+            return "max", end
+        days = max(1, math.ceil((end - start) / pd.Timedelta(days=1)))
+    else:
+        period = query.get("range", "1mo")
+        if period in ("max", "ytd") or not period.endswith("d"):
+            return ("max" if interval not in INTRADAY_MINUTES else "60d"), now
+        days = int(period[:-1])
+    if interval in INTRADAY_MINUTES:
+        days = min(days, INTRADAY_LIMIT_DAYS.get(interval, DEFAULT_INTRADAY_LIMIT))
+    return f"{days}d", now
+
+
+def _period(start: int, end: int) -> dict:
+    return {"timezone": "EDT", "start": start, "end": end, "gmtoffset": -14400}
+
+
+@lru_cache(maxsize=256)
+def _chart(symbol: str, period: str, interval: str, end_minute: int, seed: int) -> bytes:
+    end = pd.Timestamp(end_minute * 60, unit="s", tz=TZ)
+    df = make_history(symbol, period, interval, seed, end)
+    timestamps = (df.index.as_unit("s").asi8).tolist()
+    last = float(df["Close"].iloc[-1]) if len(df) else 0.0
+    today = end.normalize()
+    regular = _period(int((today + pd.Timedelta(hours=9, minutes=30)).timestamp()),
+                      int((today + pd.Timedelta(hours=16)).timestamp()))
+    meta = {
+        "currency": "USD", "symbol": symbol, "exchangeName": "NMS", "fullExchangeName": "NasdaqGS",
+        "instrumentType": "EQUITY", "firstTradeDate": 315964800, "regularMarketTime": int(end.timestamp()),
+        "hasPrePostMarketData": False, "gmtoffset": -14400, "timezone": "EDT",
+        "exchangeTimezoneName": TZ, "regularMarketPrice": last, "chartPreviousClose": last,
+        "previousClose": last, "priceHint": 2, "shortName": company_name(symbol),
+        "currentTradingPeriod": {"pre": regular, "regular": regular, "post": regular},
+        "dataGranularity": interval, "range": period,
+        "validRanges": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"],
+    }
+    if interval in INTRADAY_MINUTES:
+        days = df.index.normalize().unique()
+        meta["tradingPeriods"] = [[_period(int((d + pd.Timedelta(hours=9, minutes=30)).timestamp()),
+                                           int((d + pd.Timedelta(hours=16)).timestamp()))] for d in days]
+    quote = {col.lower(): df[col].round(4).tolist() for col in ("Open", "High", "Low", "Close")}
+    quote["volume"] = df["Volume"].tolist()
+    result = {
+        "meta": meta,
+        "timestamp": timestamps,
+        "indicators": {"quote": [quote], "adjclose": [{"adjclose": quote["close"]}]},
+    }
+    return json.dumps({"chart": {"result": [result], "error": None}}).encode()
+
+
+def yahoo_chart(cfg: Config, match, query: dict):
+    symbol = match["symbol"].upper()
+    interval = query.get("interval", "1d")
+    period, end = _history_window(query, interval)
+    body = _chart(symbol, period, interval, int(end.timestamp()) // 60, cfg.seed)
+    return 200, "application/json", body
+
+
+def _quote_fields(symbol: str) -> dict:
+    rng = random.Random(zlib.crc32(symbol.encode()))
+    price = round(rng.uniform(20, 500), 2)
+    return {
+        "symbol": symbol, "shortName": company_name(symbol), "longName": company_name(symbol),
+        "quoteType": "EQUITY", "exchange": "NMS", "currency": "USD",
+        "regularMarketPrice": price, "marketCap": int(price * rng.uniform(1e8, 1e10)),
+        "sector": "Technology", "industry": "Software", "country": "United States",
+        "longBusinessSummary": f"{company_name(symbol)} is a synthetic company for load tests.",
+    }
+
+
+def yahoo_quote_summary(cfg: Config, match, query: dict):
+    symbol = match["symbol"].upper()
+    fields = _quote_fields(symbol)
+    modules = {m: {} for m in query.get("modules", "").split(",") if m}
+    modules["quoteType"] = {k: fields[k] for k in ("symbol", "shortName", "longName", "quoteType", "exchange")}
+    modules["price"] = {"regularMarketPrice": {"raw": fields["regularMarketPrice"]}, "currency": "USD"}
+    modules["assetProfile"] = {k: fields[k] for k in ("sector", "industry", "country", "longBusinessSummary")}
+    return _json({"quoteSummary": {"result": [modules], "error": None}})
+
+
+def yahoo_quote(cfg: Config, match, query: dict):
+    symbols = [s for s in query.get("symbols", "").upper().split(",") if s]
+    return _json({"quoteResponse": {"result": [_quote_fields(s) for s in symbols], "error": None}})
+
+
+def yahoo_search(cfg: Config, match, query: dict):
+    q = query.get("q", "").upper()
+    quotes = [
+        {"symbol": s, "shortname": company_name(s), "exchDisp": "NASDAQ", "quoteType": "EQUITY"}
+        for s in cfg.symbols if s.startswith(q) or q in company_name(s).upper()
+    ]
+    return _json({"quotes": quotes[:int(query.get("quotesCount", 6))], "news": []})
+
+
+def yahoo_timeseries(cfg: Config, match, query: dict):
+    return _json({"timeseries": {"result": [], "error": None}})
+
+
+def yahoo_crumb(cfg: Config, match, query: dict):
+    return 200, "text/plain", CRUMB.encode()
+
+
+def yahoo_cookie(cfg: Config, match, query: dict):
+    # fc.yahoo.com answers 404 but sets the session cookie
+    return 404, "text/html", b"", {"Set-Cookie": "A3=fixture; Max-Age=31536000; Path=/"}
+
+
+# -- Google News -----------------------------------------------------------------
+
+def news_rss(cfg: Config, match, query: dict):
+    topic = (query.get("q", "").split() or ["market"])[0].strip('"')
+    now = int(time.time()) // 3600 * 3600   # New articles appear hourly
+    items = []
+    for i in range(25):
+        published = now - i * 3600
+        items.append(
+            f"<item><title>{topic} headline {published}</title>"
+            f"<link>https://news.example.com/{topic}/{published}</link>"
+            f"<pubDate>{formatdate(published, usegmt=True)}</pubDate>"
+            f"<source url=\"https://news.example.com\">Fixture News</source></item>"
+        )
+    body = f"<?xml version=\"1.0\"?><rss version=\"2.0\"><channel>{''.join(items)}</channel></rss>"
+    return 200, "application/rss+xml", body.encode(), {"ETag": f'"{topic}-{now}"'}
+
+
+# -- SEC -------------------------------------------------------------------------
+
+def sec_index(cfg: Config, match, query: dict):
+    links = "".join(f'<a href="{ZIP_DIR}{name}_form13f.zip">{name}</a>' for name, _, _ in QUARTERS)
+    return 200, "text/html", f"<html><body>{links}</body></html>".encode()
+
+
+def _tsv(header: list[str], rows: list[list]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter="\t", lineterminator="\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+
+@lru_cache(maxsize=8)
+def _13f_zip(symbols: tuple[str, ...], seed: int, quarter: int) -> bytes:
+    """One quarter's data set; positions drift between quarters and some open or close.
+
+    In the newest quarter manager 0 also files a restating amendment and
+    manager 1 a "NEW HOLDINGS" amendment, as real filers do.
+    """
+    _, period, filed = QUARTERS[quarter]
+    cover, submission, info = [], [], []
+    for m in range(MANAGERS):
+        accession = f"{quarter:04d}{m:06d}-00-{m:06d}"
+        cik = f"{1000000 + m:010d}"   # Zero-padded, as in SEC's files
+        filings = [(accession, filed, "", "")]
+        if quarter == 0 and m == 0:
+            filings.append((f"{quarter:04d}{m:06d}-01-{m:06d}", "01-MAR-2000", "Y", "RESTATEMENT"))
+        for accession, filing_date, amended, amendment_type in filings:
+            cover.append([accession, f"FIXTURE CAPITAL {m} LLC", period, amended, amendment_type])
+            submission.append([accession, filing_date, "13F-HR/A" if amended else "13F-HR", cik, period])
+            for symbol in symbols:
+                # Same draws for a (manager, symbol) in every quarter, so holdings evolve smoothly
+                rng = random.Random(f"{seed}:{m}:{symbol}")
+                base = rng.randint(100, 10**7)
+                draws = [rng.random() for _ in QUARTERS]
+                if draws[quarter] > HOLD_PROBABILITY:
+                    continue
+                shares = int(base * (1 + 0.1 * (len(QUARTERS) - quarter) * (draws[quarter] - 0.3)))
+                if amendment_type == "RESTATEMENT":
+                    shares += 1000
+                info.append([accession, company_name(symbol).upper(), "COM", f"{cusip6(symbol)}10{m % 10}",
+                             shares * (20 + m % 480) // 1000, shares, "SH"])
+        if quarter == 0 and m == 1:
+            accession = f"{quarter:04d}{m:06d}-02-{m:06d}"
+            cover.append([accession, f"FIXTURE CAPITAL {m} LLC", period, "Y", "NEW HOLDINGS"])
+            submission.append([accession, "02-MAR-2000", "13F-HR/A", cik, period])
+            symbol = symbols[-1]
+            info.append([accession, company_name(symbol).upper(), "COM", f"{cusip6(symbol)}109", 1234, 5000, "SH"])
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("COVERPAGE.tsv", _tsv(
+            ["ACCESSION_NUMBER", "FILINGMANAGER_NAME", "REPORTCALENDARORQUARTER", "ISAMENDMENT", "AMENDMENTTYPE"],
+            cover))
+        zf.writestr("SUBMISSION.tsv", _tsv(
+            ["ACCESSION_NUMBER", "FILING_DATE", "SUBMISSIONTYPE", "CIK", "PERIODOFREPORT"], submission))
+        zf.writestr("INFOTABLE.tsv", _tsv(
+            ["ACCESSION_NUMBER", "NAMEOFISSUER", "TITLEOFCLASS", "CUSIP", "VALUE", "SSHPRNAMT", "SSHPRNAMTTYPE"],
+            info))
+    return buf.getvalue()
+
+
+def sec_zip(cfg: Config, match, query: dict):
+    names = [name for name, _, _ in QUARTERS]
+    if match["name"] not in names:
+        return 404, "text/plain", b"Not Found"
+    return 200, "application/zip", _13f_zip(tuple(cfg.symbols), cfg.seed, names.index(match["name"])), {
+        "Accept-Ranges": "bytes", "Last-Modified": "Mon, 15 May 2000 00:00:00 GMT"}
+
+
+# (host suffix, path pattern, handler); first match wins
+ROUTES = [
+    ("finance.yahoo.com", r"/v8/finance/chart/(?P<symbol>[^/]+)", yahoo_chart),
+    ("finance.yahoo.com", r"/v10/finance/quoteSummary/(?P<symbol>[^/]+)", yahoo_quote_summary),
+    ("finance.yahoo.com", r"/v7/finance/quote/?", yahoo_quote),
+    ("finance.yahoo.com", r"/v1/finance/search", yahoo_search),
+    ("finance.yahoo.com", r"/ws/fundamentals-timeseries/.*", yahoo_timeseries),
+    ("finance.yahoo.com", r"/v1/test/getcrumb", yahoo_crumb),
+    ("fc.yahoo.com", r"/.*", yahoo_cookie),
+    ("news.google.com", r"/rss/search", news_rss),
+    ("sec.gov", r"/data-research/sec-markets-data/form-13f-data-sets/?", sec_index),
+    ("sec.gov", re.escape(ZIP_DIR) + r"(?P<name>[^/]+)_form13f\.zip", sec_zip),
+]
+
+
+def _route(host: str, path: str):
+    for suffix, pattern, handler in ROUTES:
+        if host == suffix or host.endswith("." + suffix):
+            match = re.fullmatch(pattern, path)
+            if match:
+                return handler, match
+    return None, None
+
+
+def make_handler(cfg: Config):
+    throttle = _Throttle(cfg.throttle)
+    stats = _Stats()
+    rng = random.Random(cfg.seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # Keep-alive, like the real hosts
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, host: str, status: int, content_type: str, body: bytes, headers: dict | None = None):
+            stats.add(host, status)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _recorded(self, host: str, path: str) -> Path | None:
+            if cfg.recordings is None:
+                return None
+            candidate = (cfg.recordings / host / (path.strip("/") or "index")).resolve()
+            if cfg.recordings.resolve() not in candidate.parents or not candidate.is_file():
+                return None
+            return candidate
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/_stats":
+                self._send("_stats", 200, "application/json", json.dumps(stats.snapshot()).encode())
+                return
+            host, _, path = parts.path.lstrip("/").partition("/")
+            path = "/" + path
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+            delay = cfg.latency + rng.uniform(-cfg.jitter, cfg.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            if not throttle.allow(host):
+                self._send(host, 429, "text/plain", b"Too Many Requests", {"Retry-After": "1"})
+                return
+            if rng.random() < cfg.error_rate:
+                self._send(host, 503, "text/plain", b"Service Unavailable")
+                return
+
+            recorded = self._recorded(host, path)
+            if recorded is not None:
+                content_type = mimetypes.guess_type(recorded.name)[0] or "application/octet-stream"
+                self._send(host, 200, content_type, recorded.read_bytes())
+                return
+
+            handler, match = _route(host, path)
+            if handler is None:
+                self._send(host, 404, "text/plain", b"Not Found")
+                return
+            status, content_type, body, *headers = handler(cfg, match, query)
+            headers = headers[0] if headers else {}
+            etag = headers.get("ETag")
+            if etag and self.headers.get("If-None-Match") == etag:
+                self._send(host, 304, content_type, b"", headers)
+                return
+            if status == 200 and headers.get("Accept-Ranges") == "bytes":
+                status, body, headers = self._range(status, body, headers)
+            self._send(host, status, content_type, body, headers)
+
+        def _range(self, status: int, body: bytes, headers: dict):
+            """Honour an open-ended ``Range: bytes=N-`` (and If-Range), as SEC does for ZIPs."""
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range") or "")
+            if_range = self.headers.get("If-Range")
+            if not match or (if_range and if_range not in (headers.get("ETag"), headers.get("Last-Modified"))):
+                return status, body, headers
+            start = int(match.group(1))
+            if start >= len(body):
+                return 416, b"", {**headers, "Content-Range": f"bytes */{len(body)}"}
+            return 206, body[start:], {**headers, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"}
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def serve(cfg: Config, host: str = "127.0.0.1", port: int = 9100) -> ThreadingHTTPServer:
+    """Create the server (call ``serve_forever()`` on it, e.g. in a thread)."""
+    server = ThreadingHTTPServer((host, port), make_handler(cfg))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="added delay per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random ± spread of the delay in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--throttle", type=float, default=0.0,
+                        help="requests per second per host before answering 429 (0 = off)")
+    parser.add_argument("--recordings", type=Path, help="directory of recorded responses, laid out as <host>/<path>")
+    parser.add_argument("--symbols", default=DEFAULT_SYMBOLS, help="comma-separated symbols in the 13F data set")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cfg = Config(
+        latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+        throttle=args.throttle, recordings=args.recordings,
+        symbols=[s.strip().upper() for s in args.symbols.split(",") if s.strip()], seed=args.seed,
+    )
+    server = serve(cfg, args.host, args.port)
+    print(f"Fixture server at http://{args.host}:{args.port} "
+          f"(latency {args.latency:.0f}±{args.jitter:.0f} ms, error rate {args.error_rate:.1%}, "
+          f"throttle {args.throttle or 'off'})")
+    print(f"Start OpenFinCh with: python -m openfinch --headless --upstream http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Load generator: per-endpoint throughput and latency percentiles under concurrency.
+
+Usage: python -m benchmarks.loadgen [--url http://127.0.0.1:8765] [--concurrency 16]
+                                    [--duration 30] [--endpoints data,interval,quotes,...]
+                                    [--symbols AAPL,MSFT,...] [--output results.json]
+
+Meant to run against a server started with ``--upstream`` pointing at
+``benchmarks.fixture_server``, so results don't depend on (or hammer)
+Yahoo, Google News and SEC. Each of ``--concurrency`` threads keeps one
+keep-alive connection and sends requests back to back for ``--duration``
+seconds, picking an endpoint and symbol at random for each. A response
+with status 400 or above, or a connection error, counts as an error.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.fixture_server import DEFAULT_SYMBOLS
+
+INTERVAL_CHOICES = ("1m", "5m", "15m", "1h", "4h", "1d", "1wk")
+
+# name -> (symbols, rng) -> (method, path, JSON body or None)
+SCENARIOS = {
+    "data": lambda syms, rng: ("POST", "/api/data", {"symbol": rng.choice(syms)}),
+    "interval": lambda syms, rng: ("POST", "/api/interval",
+                                   {"symbol": rng.choice(syms), "interval": rng.choice(INTERVAL_CHOICES)}),
+    "quotes": lambda syms, rng: ("GET", "/api/quotes?symbols=" + ",".join(syms), None),
+    "news": lambda syms, rng: ("POST", "/api/news", {"symbol": rng.choice(syms)}),
+    "profile": lambda syms, rng: ("POST", "/api/profile", {"symbol": rng.choice(syms)}),
+    "analysts": lambda syms, rng: ("POST", "/api/analysts", {"symbol": rng.choice(syms)}),
+    "financials": lambda syms, rng: ("POST", "/api/financials", {"symbol": rng.choice(syms)}),
+    "insiders": lambda syms, rng: ("POST", "/api/insiders", {"symbol": rng.choice(syms)}),
+    "holders": lambda syms, rng: ("POST", "/api/holders", {"symbol": rng.choice(syms)}),
+    "search": lambda syms, rng: ("POST", "/api/search", {"query": rng.choice(syms)[:2]}),
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _worker(base: str, endpoints: list[str], symbols: list[str], deadline: float, seed: int,
+            samples: list, lock: threading.Lock):
+    parts = urlsplit(base)
+    rng = random.Random(seed)
+    conn = None
+    local = []
+    while time.perf_counter() < deadline:
+        name = rng.choice(endpoints)
+        method, path, body = SCENARIOS[name](symbols, rng)
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"} if payload else {}
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+            conn.request(method, path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException):
+            status = 0
+            if conn is not None:
+                conn.close()
+            conn = None
+        local.append((name, status, time.perf_counter() - started))
+    if conn is not None:
+        conn.close()
+    with lock:
+        samples.extend(local)
+
+
+def run(url: str, concurrency: int, duration: float, endpoints: list[str], symbols: list[str],
+        seed: int = 0) -> dict:
+    samples: list[tuple[str, int, float]] = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [
+        threading.Thread(target=_worker, args=(url, endpoints, symbols, deadline, seed + i, samples, lock))
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    by_endpoint: dict[str, list[tuple[int, float]]] = {}
+    for name, status, seconds in samples:
+        by_endpoint.setdefault(name, []).append((status, seconds))
+    by_endpoint["all"] = [(status, seconds) for _, status, seconds in samples]
+
+    results = {}
+    for name, rows in by_endpoint.items():
+        latencies = sorted(seconds * 1000 for _, seconds in rows)
+        results[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for status, _ in rows if status == 0 or status >= 400),
+            "rps": round(len(rows) / elapsed, 2),
+            "p50Ms": round(percentile(latencies, 50), 1),
+            "p99Ms": round(percentile(latencies, 99), 1),
+            "maxMs": round(latencies[-1], 1) if latencies else 0.0,
+        }
+    return {
+        "meta": {"url": url, "concurrency": concurrency, "durationSeconds": round(elapsed, 2),
+                 "symbols": symbols, "seed": seed},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--symbols", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in endpoints if e not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(unknown)}")
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+
+    report = run(args.url, args.concurrency, args.duration, endpoints, symbols, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    meta = report["meta"]
+    print(f"{meta['url']}: {meta['concurrency']} connections for {meta['durationSeconds']:.0f}s")
+    print(f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, r in report["results"].items():
+        print(f"{name:<12}{r['requests']:>10}{r['errors']:>8}{r['rps']:>9.1f}"
+              f"{r['p50Ms']:>10.1f}{r['p99Ms']:>10.1f}{r['maxMs']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Seeded synthetic OHLCV data shaped like yfinance output, and a fake ``yf.Ticker``.
+
+``make_history(symbol, period, interval)`` returns what
+``yf.Ticker(symbol).history(period=..., interval=...)`` would: a
+DataFrame indexed by America/New_York timestamps with Open, High, Low,
+Close, Volume, Dividends and Stock Splits columns. Intraday bars cover
+regular sessions (09:30-16:00 on weekdays, holidays ignored), so 1m over
+7d, 1h over 730d and daily since 1980 have about the row counts Yahoo
+returns. The same seed, symbol, interval and end always give the same
+frame.
+
+``fake_yahoo()`` swaps ``openfinch.yahoo.ticker`` for ``FakeTicker`` so the
+data path runs without network access.
+"""
+
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from openfinch import yahoo
+
+TZ = "America/New_York"
+END = pd.Timestamp("2025-06-30 16:00", tz=TZ)   # Fixed so runs are comparable
+MAX_START = pd.Timestamp("1980-01-02", tz=TZ)   # Start of "max" history
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+INTRADAY_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60}
+PERIOD_FREQ = {"1d": "B", "5d": "B", "1wk": "W-MON", "1mo": "MS", "3mo": "QS"}
+COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+def _start(period: str, end: pd.Timestamp) -> pd.Timestamp:
+    if period == "max":
+        return MAX_START
+    if period.endswith("d"):
+        return (end - pd.Timedelta(days=int(period[:-1]))).normalize()
+    if period.endswith("mo"):
+        return (end - pd.DateOffset(months=int(period[:-2]))).normalize()
+    if period.endswith("y"):
+        return (end - pd.DateOffset(years=int(period[:-1]))).normalize()
+    raise ValueError(f"Unsupported period '{period}'")
+
+
+def make_index(period: str, interval: str, end: pd.Timestamp = END) -> pd.DatetimeIndex:
+    """Bar timestamps yfinance would return for ``period`` and ``interval``."""
+    start = _start(period, end)
+    if interval in INTRADAY_MINUTES:
+        step = INTRADAY_MINUTES[interval]
+        days = pd.bdate_range(start.tz_localize(None), end.tz_localize(None).normalize())
+        offsets = pd.to_timedelta(np.arange(0, SESSION_MINUTES, step), unit="min") + SESSION_OPEN
+        naive = (days.values[:, None] + offsets.values[None, :]).ravel()
+        # Sessions are far from the 2 a.m. DST switch, so localizing is unambiguous
+        index = pd.DatetimeIndex(naive).tz_localize(TZ)
+        return index[index <= end]
+    if interval in PERIOD_FREQ:
+        return pd.date_range(start.tz_localize(None), end.tz_localize(None).normalize(),
+                             freq=PERIOD_FREQ[interval]).tz_localize(TZ)
+    raise ValueError(f"Unsupported interval '{interval}'")
+
+
+def _seed(seed: int, symbol: str, interval: str) -> int:
+    # hash() is salted per process; crc32 is stable
+    return seed ^ zlib.crc32(f"{symbol}:{interval}".encode())
+
+
+def make_history(symbol: str, period: str, interval: str, seed: int = 0, end: pd.Timestamp = END) -> pd.DataFrame:
+    """A random-walk OHLCV frame with yfinance's index, columns and dtypes."""
+    index = make_index(period, interval, end)
+    n = len(index)
+    rng = np.random.default_rng(_seed(seed, symbol, interval))
+
+    vol = 0.02 / np.sqrt(SESSION_MINUTES / INTRADAY_MINUTES.get(interval, SESSION_MINUTES))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, vol / 4, n))
+    wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(13, 1, n).astype("int64")
+
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=pd.DatetimeIndex(index, name="Datetime" if interval in INTRADAY_MINUTES else "Date"))[COLUMNS]
+
+
+class FakeTicker:
+    """Stands in for ``yf.Ticker``; only ``history`` is implemented."""
+
+    def __init__(self, symbol: str, seed: int = 0, end: pd.Timestamp = END):
+        self.ticker = symbol.upper()
+        self.seed = seed
+        self.end = end
+        self.calls = 0
+
+    def history(self, period: str = "1mo", interval: str = "1d", **kwargs) -> pd.DataFrame:
+        self.calls += 1
+        return make_history(self.ticker, period, interval, self.seed, self.end)
+
+
+@contextmanager
+def fake_yahoo(seed: int = 0, end: pd.Timestamp = END):
+    """Serve ``yahoo.ticker()`` (and so ``yahoo.history``) from ``FakeTicker``."""
+    original = yahoo.ticker
+    tickers: dict[str, FakeTicker] = {}
+    yahoo.ticker = lambda symbol: tickers.setdefault(symbol.upper(), FakeTicker(symbol, seed, end))
+    try:
+        yield tickers
+    finally:
+        yahoo.ticker = original
@@ -1,4 +1,39 @@
 """Entry point: python -m openfinch"""
-from openfinch.server import start_server
+import argparse
 
-start_server()
+from openfinch.server import PORT, start_server
+
+parser = argparse.ArgumentParser(prog="python -m openfinch", description="OpenFinCh - Open Financial Charts")
+parser.add_argument("--dev", action="store_true",
+                    help="rebuild the frontend bundle whenever a source file changes")
+parser.add_argument("--headless", action="store_true",
+                    help="run the server without opening a browser")
+parser.add_argument("--workers", type=int, default=1,
+                    help="number of server processes sharing the port (default: 1)")
+parser.add_argument("--host", default="127.0.0.1",
+                    help="interface to bind (default: 127.0.0.1)")
+parser.add_argument("--port", type=int, default=PORT,
+                    help=f"port to listen on (default: {PORT})")
+parser.add_argument("--profile-startup", action="store_true",
+                    help="print a per-import timing breakdown of server startup before starting")
+parser.add_argument("--profile-requests", action="store_true",
+                    help="let requests ask to be profiled (X-OpenFinCh-Profile header or ?profile=1)")
+parser.add_argument("--upstream", metavar="URL",
+                    help="send Yahoo, Google News and SEC requests to this stand-in server "
+                         "(e.g. python -m benchmarks.fixture_server)")
+parser.add_argument("--offline", action="store_true",
+                    help="serve only cached data, without contacting Yahoo, Google News or SEC")
+parser.add_argument("--prefetch-13f", action="store_true",
+                    help="download and index SEC 13F holdings at startup instead of on first use")
+args = parser.parse_args()
+
+if args.workers < 1:
+    parser.error("--workers must be at least 1")
+
+if args.profile_startup:
+    from openfinch.startup import print_profile
+    print_profile()
+
+start_server(dev=args.dev, headless=args.headless, workers=args.workers, host=args.host, port=args.port,
+             profile_requests=args.profile_requests, upstream_url=args.upstream,
+             offline_mode=args.offline, prefetch_13f=args.prefetch_13f)
@@ -0,0 +1,172 @@
+"""Prebuilt frontend bundle.
+
+The frontend CSS/JS and the vendored Lightweight Charts library are read
+once, minified, content-hashed and compressed, then kept in memory along
+with a small HTML shell that links them, so neither ``/`` nor the static
+routes touch the disk. In dev mode a polling watcher rebuilds the
+bundle (reloading ``stock_chart``) whenever one of its source files changes.
+"""
+
+import gzip
+import hashlib
+import importlib
+import os
+import re
+import threading
+import time
+
+import openfinch.stock_chart as _stock_chart_mod
+from openfinch.compression import brotli, choose_encoding
+
+WATCH_INTERVAL = 1.0     # Seconds between source mtime checks in dev mode
+STATIC_PREFIX = "/static"
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """Conservative JS minification: indentation, blank lines and whole-line comments.
+
+    Statements are never joined across lines, so code relying on automatic
+    semicolon insertion keeps working.
+    """
+    lines = []
+    for line in js.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+class Asset:
+    """One served file with its content hash and precompressed variants."""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.hash = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{self.hash}"'
+        self.variants = {}  # in order of preference
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+        self.variants["gzip"] = gzip.compress(body, compresslevel=9)
+
+    def negotiate(self, accept_encoding: str) -> tuple[bytes, str | None, str]:
+        """Pick the best precompressed body for an Accept-Encoding header.
+
+        Returns the body, its encoding (None for identity) and its ETag.
+        """
+        encoding = choose_encoding(accept_encoding, available=tuple(self.variants))
+        if encoding is None:
+            return self.body, None, self.etag
+        return self.variants[encoding], encoding, f'"{self.hash}-{encoding}"'
+
+
+class Bundle:
+    """The HTML shell plus the content-hashed static assets it links to.
+
+    Static assets are addressed as ``/static/<name>.<hash>.<ext>``, so they
+    can be cached forever; only the small shell is revalidated.
+    """
+
+    def __init__(self, shell: Asset, static: dict[str, Asset], sources: dict[str, float]):
+        self.shell = shell
+        self.static = static          # hashed file name -> asset
+        self.sources = sources        # path -> mtime at build time
+        self.built_at = time.time()
+
+
+def _mtimes(paths: list[str]) -> dict[str, float]:
+    out = {}
+    for p in paths:
+        try:
+            out[p] = os.path.getmtime(p)
+        except OSError:
+            out[p] = 0.0
+    return out
+
+
+def _hashed_name(stem: str, ext: str, asset: Asset) -> str:
+    return f"{stem}.{asset.hash}.{ext}"
+
+
+def build_bundle(default_symbol: str) -> Bundle:
+    """Read, minify and hash the frontend assets and render the shell."""
+    paths = _stock_chart_mod.source_paths() + [_stock_chart_mod.__file__]
+    sources = _mtimes(paths)
+    parts = _stock_chart_mod.read_sources(default_symbol)
+
+    css = Asset(minify_css(parts["css"]).encode("utf-8"), "text/css; charset=utf-8")
+    js = Asset(minify_js(parts["js"]).encode("utf-8"), "application/javascript; charset=utf-8")
+    vendor = Asset(parts["vendor"].encode("utf-8"), "application/javascript; charset=utf-8")
+    names = {
+        "css": _hashed_name("app", "css", css),
+        "js": _hashed_name("app", "js", js),
+        "vendor": _hashed_name("lightweight-charts", "js", vendor),
+    }
+
+    html = _stock_chart_mod.render_shell(
+        default_symbol,
+        layout=parts["layout"],
+        css_url=f"{STATIC_PREFIX}/{names['css']}",
+        vendor_url=f"{STATIC_PREFIX}/{names['vendor']}",
+        js_url=f"{STATIC_PREFIX}/{names['js']}",
+    )
+    shell = Asset(html.encode("utf-8"), "text/html; charset=utf-8")
+    static = {names["css"]: css, names["js"]: js, names["vendor"]: vendor}
+
+    sizes = ", ".join(f"{name} {len(a.body) / 1e3:.0f} KB" for name, a in static.items())
+    print(f"[OpenFinCh] Built frontend bundle: shell {len(shell.body) / 1e3:.0f} KB, {sizes}")
+    return Bundle(shell, static, sources)
+
+
+_bundle: Bundle | None = None
+_bundle_symbol: str | None = None
+_bundle_lock = threading.Lock()
+
+
+def get_bundle(default_symbol: str) -> Bundle:
+    """Return the in-memory bundle, building it on first use."""
+    global _bundle, _bundle_symbol
+    if _bundle is None or _bundle_symbol != default_symbol:
+        with _bundle_lock:
+            if _bundle is None or _bundle_symbol != default_symbol:
+                _bundle = build_bundle(default_symbol)
+                _bundle_symbol = default_symbol
+    return _bundle
+
+
+def _changed(bundle: Bundle) -> bool:
+    return _mtimes(list(bundle.sources)) != bundle.sources
+
+
+def start_watcher(default_symbol: str) -> threading.Thread:
+    """Rebuild the bundle whenever a source file changes (dev mode only)."""
+    def _watch():
+        global _bundle, _bundle_symbol
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            bundle = _bundle
+            if bundle is None or not _changed(bundle):
+                continue
+            try:
+                importlib.reload(_stock_chart_mod)
+                new = build_bundle(default_symbol)
+            except Exception as e:
+                print(f"[OpenFinCh] Frontend rebuild failed: {e}")
+                # Remember the new mtimes so a broken file isn't retried every tick
+                bundle.sources = _mtimes(list(bundle.sources))
+                continue
+            with _bundle_lock:
+                _bundle, _bundle_symbol = new, default_symbol
+
+    thread = threading.Thread(target=_watch, name="openfinch-asset-watcher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,119 @@
+"""Small in-memory cache primitives shared across OpenFinCh modules."""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Named caches, for reporting (see openfinch.metrics)
+_registry: "weakref.WeakValueDictionary[str, LRUCache]" = weakref.WeakValueDictionary()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping with an optional per-entry TTL.
+
+    With ``maxbytes``, values must support ``len()`` (e.g. ``bytes``) and
+    their total length is bounded too; a value longer than that on its own
+    isn't stored. Keeps hit/miss/eviction counters so callers can report
+    cache effectiveness; caches given a ``name`` are listed by ``registry()``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None, name: str | None = None,
+                 maxbytes: int | None = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name is not None:
+            _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key, default=None, count: bool = True):
+        """Return the cached value for ``key`` (marking it recently used)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl is not None and time.monotonic() - item[0] > self.ttl:
+                self._remove(key)
+                item = None
+            if item is None:
+                if count:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return item[1]
+
+    def _size(self, value) -> int:
+        return len(value) if self.maxbytes is not None else 0
+
+    def _remove(self, key):
+        item = self._data.pop(key)
+        self._bytes -= self._size(item[1])
+        return item
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.maxbytes is not None and len(value) > self.maxbytes:
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._bytes += self._size(value)
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def get_or_create(self, key, factory: Callable[[], Any]):
+        """Return the cached value, creating and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / lookups, 4) if lookups else None,
+        }
+        if self.maxbytes is not None:
+            stats["bytes"] = self._bytes
+            stats["maxbytes"] = self.maxbytes
+        return stats
+
+
+def registry() -> dict[str, LRUCache]:
+    """All live caches that were given a name."""
+    return dict(_registry)
+
+
+_MISSING = object()
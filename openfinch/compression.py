@@ -0,0 +1,177 @@
+"""gzip/brotli response compression with a cache of compressed bodies.
+
+Candle JSON for a symbol is large and compresses roughly 10x, and hot
+symbols produce byte-identical responses over and over. The middleware
+negotiates an encoding from Accept-Encoding, tags each compressible
+response with a content-hash ETag, and keeps compressed bodies in an
+LRU keyed by (ETag, encoding) and bounded by total size, so each one is
+compressed once. The compressed response's ETag names its encoding.
+"""
+
+import gzip
+import hashlib
+
+import anyio
+
+from openfinch import metrics
+from openfinch.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+MINIMUM_SIZE = 1024          # Bytes; smaller bodies aren't worth compressing
+CACHE_ENTRIES = 128
+CACHE_BYTES = 32 * 1024 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5           # Dynamic responses: favour speed over ratio
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/x-ndjson")
+
+
+def _qvalue(params: str) -> float:
+    for param in params.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key.strip().lower() == "q":
+            try:
+                return min(max(float(value), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def choose_encoding(accept_encoding: str, available=("br", "gzip")) -> str | None:
+    """Pick the encoding the client ranks highest, or None for identity.
+
+    Encodings are ranked by their q-value ("*" covers any not named);
+    ``available`` is in order of preference and breaks ties. q=0 refuses
+    an encoding.
+    """
+    qvalues = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if name:
+            qvalues[name] = _qvalue(params)
+    best, best_q = None, 0.0
+    for encoding in available:
+        if encoding == "br" and brotli is None:
+            continue
+        q = qvalues.get(encoding, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag: bytes, encoding: str) -> bytes:
+    """The ETag of an encoded representation: ``"abc"`` becomes ``"abc-gzip"``.
+
+    Each encoding is a different representation, so caches mustn't treat
+    a gzip and a brotli body as interchangeable.
+    """
+    if etag.endswith(b'"'):
+        return etag[:-1] + b"-" + encoding.encode("latin-1") + b'"'
+    return etag
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+_cache = LRUCache(maxsize=CACHE_ENTRIES, maxbytes=CACHE_BYTES, name="compression.bodies")
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses complete, compressible HTTP responses.
+
+    Streaming responses and responses that already carry a
+    Content-Encoding (e.g. precompressed static assets) pass through as-is.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streaming response: don't buffer, forward everything unchanged
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            await self._send_complete(start_message, body, encoding, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_complete(self, start_message, body: bytes, encoding: str, send):
+        headers = [(k.lower(), v) for k, v in start_message.get("headers", [])]
+        names = {k for k, _ in headers}
+        content_type = dict(headers).get(b"content-type", b"").decode("latin-1")
+
+        if (
+            start_message["status"] != 200
+            or b"content-encoding" in names
+            or len(body) < self.minimum_size
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = dict(headers).get(b"etag")
+        if etag is None:
+            etag = ('"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"').encode("latin-1")
+
+        key = (etag, encoding)
+        compressed = _cache.get(key)
+        if compressed is None:
+            with metrics.stage("compress"):
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            _cache.set(key, compressed)
+
+        vary = [v for k, v in headers if k == b"vary"]
+        headers = [(k, v) for k, v in headers if k not in (b"content-length", b"vary", b"etag")]
+        vary.append(b"Accept-Encoding")
+        headers += [
+            (b"etag", encoded_etag(etag, encoding)),
+            (b"content-encoding", encoding.encode("latin-1")),
+            (b"content-length", str(len(compressed)).encode("latin-1")),
+            (b"vary", b", ".join(vary)),
+        ]
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,211 @@
+"""Coordination between server workers through the shared SQLite cache.
+
+With ``--workers N`` each worker is a separate process with its own
+in-memory caches, while ``openfinch_cache.db`` is shared. Two small
+tables in it keep the workers coherent:
+
+* ``generations`` holds a counter per named cache. ``SharedCache`` is an
+  LRU that compares its generation with the table (at most once per
+  ``GENERATION_CHECK_INTERVAL``) and drops its contents when another
+  worker has called ``invalidate()``.
+* ``leases`` holds short-lived, expiring locks. ``run_once`` uses them so
+  only one worker (or thread) performs a given upstream refresh while the
+  others wait for it and then read its result from the database. The
+  holder renews its lease while it works, so a lease stops blocking the
+  others soon after its process dies, however long the work takes.
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Callable
+
+from openfinch.cache import LRUCache
+from openfinch.intervals import db
+
+GENERATION_CHECK_INTERVAL = 1.0   # Seconds between generation lookups per cache
+LEASE_TTL = 120.0                 # A crashed holder's lease expires after this
+LEASE_RENEW_FRACTION = 3          # The holder renews its lease every ttl / this
+LEASE_POLL = 0.1                  # Seconds between checks while waiting on a lease
+
+
+def generation(name: str) -> int:
+    """Current generation of a named cache (0 if never invalidated)."""
+    conn = db.connect()
+    try:
+        row = conn.execute("SELECT value FROM generations WHERE name=?", (name,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def bump(name: str) -> int:
+    """Advance a named cache's generation and return the new value."""
+    conn = db.connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO generations (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                (name,),
+            )
+            return conn.execute("SELECT value FROM generations WHERE name=?", (name,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class SharedCache(LRUCache):
+    """LRU cache that is cleared in every worker when any worker invalidates it."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float | None = None):
+        super().__init__(maxsize, ttl, name=name)
+        self._generation: int | None = None
+        self._checked = 0.0
+
+    def _sync(self):
+        now = time.monotonic()
+        if now - self._checked < GENERATION_CHECK_INTERVAL:
+            return
+        self._checked = now
+        current = generation(self.name)
+        if current != self._generation:
+            if self._generation is not None:
+                self.clear()
+            self._generation = current
+
+    def get(self, key, default=None, count: bool = True):
+        self._sync()
+        return super().get(key, default, count)
+
+    def invalidate(self):
+        """Clear this cache here and, within a second, in every other worker."""
+        self._generation = bump(self.name)
+        self._checked = time.monotonic()
+        self.clear()
+
+
+_HOST = socket.gethostname()
+
+
+def _owner() -> str:
+    return f"{_HOST}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate it; rely on the lease expiring
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _owner_dead(owner: str) -> bool:
+    """Whether ``owner`` is a process on this host that no longer exists."""
+    parts = owner.rsplit(":", 2)
+    if len(parts) != 3 or parts[0] != _HOST or not parts[1].isdigit():
+        return False
+    return not _pid_alive(int(parts[1]))
+
+
+def _reap(conn, key: str, now: float):
+    """Delete the lease on ``key`` if it has expired or its process has died."""
+    row = conn.execute("SELECT owner, expires FROM leases WHERE key=?", (key,)).fetchone()
+    if row is not None and (row[1] < now or _owner_dead(row[0])):
+        conn.execute("DELETE FROM leases WHERE key=? AND owner=?", (key, row[0]))
+
+
+def try_lease(key: str, owner: str, ttl: float = LEASE_TTL) -> bool:
+    """Take the lease on ``key`` unless someone else holds a live, unexpired one."""
+    now = time.time()
+    conn = db.connect()
+    try:
+        with conn:
+            _reap(conn, key, now)
+            cur = conn.execute(
+                "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires < ? OR leases.owner = excluded.owner",
+                (key, owner, now + ttl, now),
+            )
+            return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def renew(key: str, owner: str, ttl: float = LEASE_TTL) -> bool:
+    """Push back the expiry of a lease ``owner`` holds; False if it no longer does."""
+    conn = db.connect()
+    try:
+        with conn:
+            cur = conn.execute(
+                "UPDATE leases SET expires = ? WHERE key=? AND owner=?", (time.time() + ttl, key, owner)
+            )
+            return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def release(key: str, owner: str):
+    conn = db.connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM leases WHERE key=? AND owner=?", (key, owner))
+    finally:
+        conn.close()
+
+
+def _lease_state(key: str) -> str:
+    """"held" by a live holder, "abandoned" (expired or dead holder) or "free"."""
+    conn = db.connect()
+    try:
+        row = conn.execute("SELECT owner, expires FROM leases WHERE key=?", (key,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return "free"
+    return "abandoned" if row[1] < time.time() or _owner_dead(row[0]) else "held"
+
+
+def _heartbeat(key: str, owner: str, ttl: float, done: threading.Event):
+    while not done.wait(ttl / LEASE_RENEW_FRACTION):
+        try:
+            if not renew(key, owner, ttl):
+                return
+        except Exception as e:
+            print(f"[OpenFinCh] Could not renew lease {key}: {e}")
+
+
+def run_once(key: str, fn: Callable[[], None], ttl: float = LEASE_TTL) -> bool:
+    """Run ``fn()`` under the lease for ``key``, or wait for whoever holds it.
+
+    Returns True if ``fn`` ran in this caller. If another worker or thread
+    already holds the lease, blocks until it is released and returns False;
+    ``fn`` is expected to leave its result in the database. The lease is
+    renewed every ``ttl / LEASE_RENEW_FRACTION`` seconds while ``fn`` runs,
+    and a lease that lapses or whose process has died is taken over.
+    """
+    owner = _owner()
+    while True:
+        if try_lease(key, owner, ttl):
+            done = threading.Event()
+            threading.Thread(target=_heartbeat, args=(key, owner, ttl, done),
+                             name=f"lease:{key}", daemon=True).start()
+            try:
+                fn()
+            finally:
+                done.set()
+                release(key, owner)
+            return True
+
+        while (state := _lease_state(key)) == "held":
+            time.sleep(LEASE_POLL)
+        if state == "free":
+            return False
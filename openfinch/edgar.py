@@ -1,44 +1,211 @@
 """SEC EDGAR 13F data download, parsing, and caching.
 
-Downloads quarterly bulk 13F datasets from SEC EDGAR, parses INFOTABLE.tsv
-and COVERPAGE.tsv to find all institutional holders for a given CUSIP.
+Downloads the last HISTORY_QUARTERS quarterly bulk 13F datasets from SEC
+EDGAR and loads their INFOTABLE.tsv, COVERPAGE.tsv and SUBMISSION.tsv into
+an indexed store (``openfinch.holdings``) to find all institutional holders
+for a given CUSIP and how their positions changed since the previous quarter.
+
+Downloading and indexing a quarter takes minutes, so it runs as a
+background job (``start_ingest``) rather than inside a request:
+``get_holders`` raises ``Preparing`` until the first quarter is indexed,
+and ``ingest_status`` reports the job's progress to every worker.
+
+The same store answers the reverse question, what a filing manager holds
+(``get_portfolio``), and what two managers hold in common (``get_overlap``).
 """
 
-import csv
-import io
+import json
+import math
 import os
 import re
+import shutil
+import threading
+import time
 import zipfile
 from pathlib import Path
+from urllib.error import HTTPError
 from urllib.request import urlopen, Request
 
-import yfinance as yf
+from openfinch import coordination, holdings, offline, upstream, yahoo
+from openfinch.cache import LRUCache
+from openfinch.intervals import db
 
 SEC_BASE = "https://www.sec.gov/files/structureddata/data/form-13f-data-sets"
 SEC_INDEX = "https://www.sec.gov/data-research/sec-markets-data/form-13f-data-sets"
 USER_AGENT = "OpenFinCh admin@openfinch.app"
 DATA_DIR = Path.home() / ".openfinch" / "13f"
+DOWNLOAD_CHUNK = 1 << 20       # Bytes per read while streaming the ZIP to disk
+DOWNLOAD_TIMEOUT = 60          # Seconds without data before a read is abandoned (and resumed)
+STATUS_SETTING = "13f.status"  # Job progress, shared with other workers through the cache DB
+STATUS_INTERVAL = 1.0          # Seconds between progress writes
+JOB_RETRY = 5 * 60             # Seconds after a failed job before another is started
+RUNNING_STATES = ("starting", "downloading", "extracting", "indexing")
 
-# In-memory caches
-_cusip_cache: dict[str, str] = {}
-_holders_cache: dict[str, dict] = {}
-_latest_url_cache: str | None = None
+HISTORY_QUARTERS = 4           # Quarterly data sets kept in the holdings store
+SEC_INDEX_TTL = 6 * 3600       # Seconds before the list of quarters is re-read (and new ones fetched)
+CUSIP_TTL = 30 * 86400         # Seconds a stored symbol -> CUSIP mapping is trusted (tickers get reused)
+STORED_HOLDERS = 2048          # Holder results kept in the cache database
+
+# Upper-cased name in the ZIP -> file name we extract it to
+TSV_FILES = {"INFOTABLE.TSV": "INFOTABLE.tsv", "COVERPAGE.TSV": "COVERPAGE.tsv",
+             "SUBMISSION.TSV": "SUBMISSION.tsv"}
+
+ACCESSION_RE = re.compile(r"\d{10}-\d{2}-\d{6}")   # e.g. 0001067983-25-000012
+
+# In-memory LRU caches in front of the copies in the cache database;
+# holder results are keyed by quarter and cleared in every worker when the
+# set of stored quarters changes
+_cusip_cache = coordination.SharedCache("edgar.cusip", maxsize=4096)
+_holders_cache = coordination.SharedCache("edgar.holders", maxsize=256)
+_urls_cache = LRUCache(1, ttl=SEC_INDEX_TTL, name="edgar.urls")
+_urls_last: list[str] = []   # Served when the index page can't be re-read
+
+
+class Preparing(Exception):
+    """Raised until 13F data has been downloaded and indexed; carries ``ingest_status()``."""
+
+    def __init__(self, status: dict):
+        super().__init__("13F data is being prepared")
+        self.status = status
+
+
+class IngestFailed(RuntimeError):
+    """Raised while no 13F data is indexed and the last job failed; carries ``ingest_status()``."""
+
+    def __init__(self, status: dict):
+        super().__init__(f"13F data could not be prepared: {status.get('error') or 'unknown error'}")
+        self.status = status
+
+
+# The ingestion job of this process, and the progress it last reported
+_job: threading.Thread | None = None
+_job_done: float | None = None   # time.monotonic() when it last succeeded
+_job_lock = threading.Lock()
+_job_status: dict = {}
+_status_written = 0.0
+
+
+def _report(force: bool = False, **fields):
+    """Update the job's progress, writing it for other workers at most once per STATUS_INTERVAL."""
+    global _status_written
+    _job_status.update(fields, updatedAt=time.time())
+    now = time.monotonic()
+    if force or now - _status_written >= STATUS_INTERVAL:
+        _status_written = now
+        db.set_setting(STATUS_SETTING, json.dumps(_job_status))
+
+
+def _start_phase(state: str, **fields):
+    _report(force=True, state=state, phaseStartedAt=time.time(), **fields)
+
+
+def _eta(status: dict) -> float | None:
+    """Seconds left in the current phase, extrapolated from its progress so far."""
+    if status.get("state") == "downloading":
+        done, total, start = status.get("bytesDownloaded"), status.get("bytesTotal"), status.get("resumedAt", 0)
+    elif status.get("state") == "indexing":
+        done, total, start = status.get("rowsIndexed"), status.get("rowsEstimated"), 0
+    else:
+        return None
+    elapsed = status["updatedAt"] - status["phaseStartedAt"]
+    if not total or not done or done <= start or elapsed <= 0:
+        return None
+    rate = (done - start) / elapsed
+    return round(max(total - done, 0) / rate, 1)
+
+
+def ingest_status() -> dict:
+    """Progress of the 13F download/indexing job, as seen from any worker.
+
+    ``state`` is idle, starting, downloading, extracting, indexing, ready
+    or error, with byte and row counts and ``etaSeconds`` for the current
+    phase where they are known. A failed refresh while data is already
+    indexed reads as ready, with the failure kept in ``error``. ``quarter``
+    is the one being processed while a phase runs, and otherwise the
+    latest one stored.
+    """
+    raw = db.get_setting(STATUS_SETTING)
+    status = json.loads(raw) if raw else {"state": "idle"}
+    if status["state"] in ("idle", "error"):
+        if holdings.latest_quarter() is not None:
+            status["state"] = "ready"
+        elif status["state"] == "idle" and _job is not None and _job.is_alive():
+            status["state"] = "starting"
+    status["etaSeconds"] = _eta(status)
+    if status["state"] not in RUNNING_STATES or not status.get("quarter"):
+        status["quarter"] = holdings.latest_quarter()
+    return status
+
+
+def _run_job():
+    global _job_done
+    # Until this job fails too, other workers shouldn't report the last failure
+    _start_phase("starting", quarter=None, error=None)
+    try:
+        ensure_13f_data()
+        ensure_13f_history()
+    except Exception as e:
+        print(f"[OpenFinCh] 13F ingestion failed: {e}")
+        _report(force=True, state="error", error=str(e))
+    else:
+        _job_done = time.monotonic()
+        _start_phase("ready")
+
+
+def start_ingest() -> bool:
+    """Download and index the latest 13F quarters in the background.
+
+    Does nothing if this process's job is running or has succeeded within
+    SEC_INDEX_TTL, after which it runs again to pick up a newly published
+    quarter, nor in offline mode or within JOB_RETRY of a failed job (in
+    any worker); returns True if a job was started. With several workers,
+    only one does the work (see ``ensure_13f_data``).
+    """
+    global _job
+    if offline.is_offline():
+        return False
+    with _job_lock:
+        if _job is not None and _job.is_alive():
+            return False
+        if _job_done is not None and time.monotonic() - _job_done < SEC_INDEX_TTL:
+            return False
+        raw = db.get_setting(STATUS_SETTING)
+        status = json.loads(raw) if raw else {}
+        if status.get("state") == "error" and time.time() - status.get("updatedAt", 0) < JOB_RETRY:
+            return False
+        _job = threading.Thread(target=_run_job, name="openfinch-13f", daemon=True)
+        _job.start()
+        return True
 
 
 def _sec_request(url: str) -> bytes:
     """Make a request to SEC with the required User-Agent header."""
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=120) as resp:
-        return resp.read()
+    req = Request(upstream.resolve(url), headers={"User-Agent": USER_AGENT})
 
+    def _fetch():
+        with urlopen(req, timeout=120) as resp:
+            return resp.read()
 
-def get_latest_13f_url() -> str:
-    """Scrape SEC index page to find the most recent 13F ZIP URL."""
-    global _latest_url_cache
-    if _latest_url_cache:
-        return _latest_url_cache
+    return upstream.call(url, _fetch)
+
+
+def get_13f_urls() -> list[str]:
+    """Scrape SEC index page for the 13F ZIP URLs, most recent quarter first.
+
+    The list is re-read after SEC_INDEX_TTL; if that fails, the previous
+    list is kept until the next attempt.
+    """
+    global _urls_last
+    urls = _urls_cache.get("urls")
+    if urls is not None:
+        return urls
 
-    html = _sec_request(SEC_INDEX).decode("utf-8", errors="replace")
+    try:
+        html = _sec_request(SEC_INDEX).decode("utf-8", errors="replace")
+    except Exception:
+        if not _urls_last:
+            raise
+        return _urls_last
     # Look for ZIP links in the page
     pattern = r'href="([^"]*form13f[^"]*\.zip)"'
     matches = re.findall(pattern, html, re.IGNORECASE)
@@ -50,120 +217,309 @@ def get_latest_13f_url() -> str:
     if not matches:
         raise RuntimeError("Could not find 13F ZIP URL on SEC index page")
 
-    # Take the first match (most recent quarter — page lists newest first)
-    url = matches[0]
-    if url.startswith("/"):
-        url = "https://www.sec.gov" + url
-    elif not url.startswith("http"):
-        url = SEC_BASE + "/" + url
+    # The page lists newest first; keep that order and drop repeated links
+    urls = []
+    for url in matches:
+        if url.startswith("/"):
+            url = "https://www.sec.gov" + url
+        elif not url.startswith("http"):
+            url = SEC_BASE + "/" + url
+        if url not in urls:
+            urls.append(url)
 
-    _latest_url_cache = url
-    return url
+    _urls_cache.set("urls", urls)
+    _urls_last = urls
+    return urls
 
 
-def ensure_13f_data() -> Path:
-    """Download and extract 13F data if not already cached.
+def get_latest_13f_url() -> str:
+    """URL of the most recent quarter's 13F ZIP."""
+    return get_13f_urls()[0]
+
 
-    Returns path to directory containing INFOTABLE.tsv and COVERPAGE.tsv.
+def _progress(done: int, total: int | None) -> str:
+    if total:
+        return f"{done / 1e6:.1f} / {total / 1e6:.1f} MB ({done * 100 // total}%)"
+    return f"{done / 1e6:.1f} MB"
+
+
+def _fetch_zip_part(url: str, part: Path, meta_path: Path) -> int | None:
+    """Append the rest of ``url`` to ``part``; returns the full size if known.
+
+    Continues from the bytes already in ``part`` with a Range request, made
+    conditional (If-Range) on the validator recorded in ``meta_path`` when
+    the download started, so a file that changed upstream starts over.
     """
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+    offset = part.stat().st_size if part.exists() else 0
+    total = meta.get("size")
+    if offset and offset == total:
+        return total   # Finished before an interruption; nothing left to fetch
+
+    headers = {"User-Agent": USER_AGENT}
+    if offset and meta.get("validator"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = meta["validator"]
+
+    try:
+        resp = urlopen(Request(upstream.resolve(url), headers=headers), timeout=DOWNLOAD_TIMEOUT)
+    except HTTPError as e:
+        if e.code == 416:   # Our partial file doesn't fit the current one
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        raise
+
+    with resp:
+        if resp.status == 206:
+            content_range = resp.headers.get("Content-Range") or ""
+            if not content_range.startswith(f"bytes {offset}-"):
+                part.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                raise RuntimeError(f"Unexpected 13F download range '{content_range}'; starting over")
+            total = int(content_range.rsplit("/", 1)[-1]) if not content_range.endswith("/*") else None
+            mode = "ab"
+            print(f"[OpenFinCh] Resuming 13F download at {_progress(offset, total)}")
+            _report(resumedAt=offset)
+        else:
+            length = resp.headers.get("Content-Length")
+            total = int(length) if length else None
+            offset, mode = 0, "wb"
+            validator = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+            meta_path.write_text(json.dumps({"validator": validator, "size": total}))
+
+        done = offset
+        reported = done * 10 // total if total else done // (10 * DOWNLOAD_CHUNK)
+        with open(part, mode) as f:
+            while True:
+                chunk = resp.read(DOWNLOAD_CHUNK)
+                if not chunk:
+                    break
+                f.write(chunk)
+                done += len(chunk)
+                step = done * 10 // total if total else done // (10 * DOWNLOAD_CHUNK)
+                if step > reported:
+                    reported = step
+                    print(f"[OpenFinCh] Downloaded {_progress(done, total)}")
+                _report(bytesDownloaded=done, bytesTotal=total)
+    if total is not None and done < total:
+        # Reads of a known length just stop short when the server hangs up;
+        # raise so upstream.call retries, which resumes from here
+        raise ConnectionResetError(f"13F download cut off at {_progress(done, total)}")
+    return total
+
+
+def _download_zip(url: str, zip_path: Path):
+    """Stream a ZIP from SEC to ``zip_path`` without holding it in memory.
+
+    Bytes go to ``<name>.part`` first. An interrupted transfer is resumed
+    with a Range request, whether by ``upstream.call``'s retries or on a
+    later attempt after a restart. The finished file is checked against
+    the size the server announced and must open as a ZIP before it is
+    renamed into place; member CRCs are checked as they are extracted.
+    """
+    part = zip_path.with_name(zip_path.name + ".part")
+    meta_path = zip_path.with_name(zip_path.name + ".part.json")
+
+    total = upstream.call(url, lambda: _fetch_zip_part(url, part, meta_path))
+
+    size = part.stat().st_size
+    if total is not None and size != total:
+        if size > total:
+            part.unlink()
+            meta_path.unlink(missing_ok=True)
+        raise RuntimeError(f"13F download incomplete ({_progress(size, total)}); it will resume on the next request")
+    try:
+        zipfile.ZipFile(part).close()
+    except zipfile.BadZipFile:
+        part.unlink()
+        meta_path.unlink(missing_ok=True)
+        raise RuntimeError("Downloaded 13F archive is corrupt; it will be downloaded again")
+
+    os.replace(part, zip_path)
+    meta_path.unlink(missing_ok=True)
+
+
+def _extract_13f(zip_path: Path, quarter_dir: Path):
+    """Stream the TSVs we use out of the ZIP, each renamed into place when complete."""
+    quarter_dir.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            base = TSV_FILES.get(info.filename.rsplit("/", 1)[-1].upper())
+            if not base:
+                continue
+            out_path = quarter_dir / base
+            tmp_path = quarter_dir / (base + ".tmp")
+            try:
+                # zipfile raises BadZipFile at the end of a member whose CRC doesn't match
+                with zf.open(info) as src, open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            os.replace(tmp_path, out_path)
+            print(f"[OpenFinCh] Extracted {base} ({info.file_size / 1e6:.1f} MB)")
+
+
+def _download_13f(url: str, quarter_dir: Path):
+    """Download a quarterly 13F ZIP and extract the TSVs we use."""
+    if all((quarter_dir / name).exists() for name in TSV_FILES.values()):
+        return  # Another worker finished the download while we waited
+
+    zip_path = DATA_DIR / url.rsplit("/", 1)[-1]
+    if not zip_path.exists():
+        _start_phase("downloading", bytesDownloaded=0, bytesTotal=None, resumedAt=0)
+        print(f"[OpenFinCh] Downloading 13F data for {quarter_dir.name} from SEC EDGAR (~100MB)...")
+        print(f"[OpenFinCh] URL: {url}")
+        _download_zip(url, zip_path)
+
+    _start_phase("extracting")
+    try:
+        _extract_13f(zip_path, quarter_dir)
+    except zipfile.BadZipFile:
+        zip_path.unlink()
+        raise RuntimeError("13F archive failed its integrity check; it will be downloaded again")
+    zip_path.unlink()
+
+
+def _prepare_13f(url: str, quarter_dir: Path):
+    """Download a quarter if needed and load it into the holdings store."""
+    if holdings.is_ingested(quarter_dir.name):
+        return  # Another worker finished while we waited
+
+    _job_status.clear()
+    _start_phase("starting", quarter=quarter_dir.name, error=None)
+    _download_13f(url, quarter_dir)
+    for name in TSV_FILES.values():
+        if not (quarter_dir / name).exists():
+            raise RuntimeError(f"{name} not found in ZIP archive")
+
+    _start_phase("indexing", rowsIndexed=0, rowsEstimated=_estimate_rows(quarter_dir / "INFOTABLE.tsv"))
+    holdings.ingest(quarter_dir.name, quarter_dir, progress=lambda rows: _report(rowsIndexed=rows))
+    _start_phase("ready")
+
+    # Holder lists from an older quarter are stale now, in every worker
+    _holders_cache.invalidate()
+
+
+def _estimate_rows(path: Path, sample: int = DOWNLOAD_CHUNK) -> int:
+    """Rough row count of a TSV from the line density of its first ``sample`` bytes."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(sample)
+    lines = head.count(b"\n")
+    return max(lines - 1, 0) if len(head) >= size else int(size * lines / len(head))
+
+
+def _ensure_quarter(url: str) -> Path:
+    """Download, extract and index one quarter's ZIP if not already done; returns its directory."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    url = get_latest_13f_url()
     # Derive a folder name from the ZIP filename
     zip_name = url.rsplit("/", 1)[-1]
     quarter_dir = DATA_DIR / zip_name.replace(".zip", "")
 
-    info_path = quarter_dir / "INFOTABLE.tsv"
-    cover_path = quarter_dir / "COVERPAGE.tsv"
-
-    if info_path.exists() and cover_path.exists():
+    if holdings.is_ingested(quarter_dir.name):
         return quarter_dir
 
-    print(f"[OpenFinCh] Downloading 13F data from SEC EDGAR...")
-    print(f"[OpenFinCh] URL: {url}")
-    print(f"[OpenFinCh] This is a one-time download (~100MB). Please wait...")
-
-    data = _sec_request(url)
+    # Only one worker downloads and indexes the (large) ZIP; the others wait for it
+    coordination.run_once(f"13f:{zip_name}", lambda: _prepare_13f(url, quarter_dir))
 
-    quarter_dir.mkdir(parents=True, exist_ok=True)
+    if not holdings.is_ingested(quarter_dir.name):
+        raise RuntimeError(f"13F data for {quarter_dir.name} could not be loaded")
 
-    with zipfile.ZipFile(io.BytesIO(data)) as zf:
-        for name in zf.namelist():
-            base = name.rsplit("/", 1)[-1].upper()
-            if base in ("INFOTABLE.TSV", "COVERPAGE.TSV"):
-                content = zf.read(name)
-                out_path = quarter_dir / base
-                out_path.write_bytes(content)
-                print(f"[OpenFinCh] Extracted {base} ({len(content) / 1e6:.1f} MB)")
-
-    if not info_path.exists():
-        raise RuntimeError("INFOTABLE.tsv not found in ZIP archive")
-    if not cover_path.exists():
-        raise RuntimeError("COVERPAGE.tsv not found in ZIP archive")
-
-    print("[OpenFinCh] 13F data ready.")
+    print(f"[OpenFinCh] 13F data for {quarter_dir.name} ready.")
     return quarter_dir
 
 
-def _search_cusip_in_infotable(company_name: str, data_dir: Path) -> str | None:
-    """Search INFOTABLE.tsv for a CUSIP by matching company name."""
-    info_path = data_dir / "INFOTABLE.tsv"
-    if not info_path.exists():
-        return None
+def ensure_13f_data() -> Path:
+    """Download, extract and index the latest 13F data if not already done.
+
+    Returns path to directory containing the quarter's TSVs; its name is
+    the quarter's key in the holdings store.
+    """
+    return _ensure_quarter(get_latest_13f_url())
+
+
+def ensure_13f_history():
+    """Bring the store to the last HISTORY_QUARTERS quarters.
+
+    Only quarters not stored yet are downloaded, newest first; quarters
+    that have fallen out of the window are deleted, with their files.
+    """
+    urls = get_13f_urls()[:HISTORY_QUARTERS]
+    for url in urls:
+        _ensure_quarter(url)
+
+    keep = {url.rsplit("/", 1)[-1].replace(".zip", "") for url in urls}
+    dropped = holdings.prune(keep)
+    for quarter in dropped:
+        shutil.rmtree(DATA_DIR / quarter, ignore_errors=True)
+        print(f"[OpenFinCh] Dropped 13F data for {quarter}")
+    if dropped:
+        _holders_cache.invalidate()
 
-    # Build search terms from the company name
-    # e.g. "Tesla, Inc." -> "TESLA", "Alphabet Inc." -> "ALPHABET"
-    clean = re.sub(r"[,.\-\s]+(inc|corp|co|ltd|plc|llc|lp)\.?\s*$", "",
-                   company_name, flags=re.IGNORECASE).strip()
-    search_term = clean.upper()
-    if not search_term:
-        return None
 
-    # Count occurrences of each CUSIP prefix matching our search term
-    cusip_counts: dict[str, int] = {}
-    with open(info_path, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        for row in reader:
-            issuer = (row.get("NAMEOFISSUER") or "").upper()
-            if search_term in issuer:
-                cusip = (row.get("CUSIP") or "").strip()
-                if len(cusip) >= 6:
-                    prefix = cusip[:6]
-                    cusip_counts[prefix] = cusip_counts.get(prefix, 0) + 1
+def _require_data() -> str:
+    """Latest stored quarter, starting ingestion if due.
 
-    if cusip_counts:
-        # Return the most common CUSIP prefix (handles multiple share classes)
-        return max(cusip_counts, key=cusip_counts.get)
-    return None
+    While there is none yet, raises ``Preparing``, or ``IngestFailed``
+    if the last job failed and no new one has started (see JOB_RETRY),
+    or ``offline.NotCached`` in offline mode.
+    """
+    started = start_ingest()
+    quarter = holdings.latest_quarter()
+    if quarter is not None:
+        return quarter
+    if offline.is_offline():
+        raise offline.NotCached("Offline mode: no 13F data has been downloaded")
+    status = ingest_status()
+    if status["state"] == "error" and not started:
+        raise IngestFailed(status)
+    raise Preparing(status)
 
 
 def get_cusip(symbol: str) -> str:
-    """Get the 6-character CUSIP prefix for a stock symbol."""
-    symbol = symbol.upper()
-    if symbol in _cusip_cache:
-        return _cusip_cache[symbol]
+    """Get the 6-character CUSIP prefix for a stock symbol.
 
-    ticker = yf.Ticker(symbol)
+    Resolved prefixes are stored in the cache database, so a restart
+    doesn't repeat the Yahoo lookups. In offline mode a stored prefix is
+    used however old it is, and ``offline.NotCached`` is raised without one.
+    """
+    symbol = symbol.upper()
+    cached = _cusip_cache.get(symbol)
+    if cached is not None:
+        return cached
+    cached = db.get_cusip(symbol, math.inf if offline.is_offline() else CUSIP_TTL)
+    if cached is not None:
+        _cusip_cache.set(symbol, cached)
+        return cached
+    if offline.is_offline():
+        raise offline.NotCached(f"Offline mode: no CUSIP stored for {symbol}")
+
+    ticker = yahoo.ticker(symbol)
 
     # Method 1: ISIN lookup
     try:
         isin = ticker.get_isin()
         if isin and len(isin) >= 11 and isin.startswith("US"):
             cusip6 = isin[2:8]
-            _cusip_cache[symbol] = cusip6
+            _cusip_cache.set(symbol, cusip6)
+            db.put_cusip(symbol, cusip6)
             return cusip6
     except Exception:
         pass
 
-    # Method 2: Search INFOTABLE by company name
+    # Method 2: Search the indexed holdings by company name
     try:
         info = ticker.get_info() or {}
         company_name = info.get("shortName") or info.get("longName") or ""
-        if company_name:
-            data_dir = ensure_13f_data()
-            cusip6 = _search_cusip_in_infotable(company_name, data_dir)
+        quarter = holdings.latest_quarter()
+        if company_name and quarter:
+            # e.g. "Tesla, Inc." matches issuer "TESLA INC"; the most held prefix wins
+            cusip6 = holdings.search_issuer(quarter, company_name)
             if cusip6:
-                _cusip_cache[symbol] = cusip6
+                _cusip_cache.set(symbol, cusip6)
+                db.put_cusip(symbol, cusip6)
                 return cusip6
     except Exception:
         pass
@@ -174,107 +530,133 @@ def get_cusip(symbol: str) -> str:
     )
 
 
-def lookup_holders(cusip6: str, data_dir: Path) -> list[dict]:
-    """Find all institutional holders for a CUSIP by streaming 13F TSV files.
+def lookup_holders(cusip6: str, quarter: str) -> dict:
+    """Find all institutional holders for a CUSIP in the holdings store.
 
     Args:
         cusip6: 6-character CUSIP prefix
-        data_dir: Path to directory with INFOTABLE.tsv and COVERPAGE.tsv
+        quarter: Quarter name in the store, e.g. "01sep2025-30nov2025_form13f"
 
     Returns:
-        List of holder dicts sorted by shares descending
+        Dict with holders sorted by shares descending (with their change
+        since the previous quarter), closed positions, the periods of
+        report compared, and the ownership trend over all stored quarters
     """
-    if cusip6 in _holders_cache:
-        return _holders_cache[cusip6]
-
-    info_path = data_dir / "INFOTABLE.tsv"
-    cover_path = data_dir / "COVERPAGE.tsv"
-
-    # Step 1: Stream INFOTABLE.tsv, filter by CUSIP prefix
-    # Collect accession numbers and holding data
-    holdings_by_accession: dict[str, dict] = {}
-
-    with open(info_path, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        for row in reader:
-            row_cusip = (row.get("CUSIP") or "").strip()
-            if row_cusip[:6] == cusip6:
-                accession = (row.get("ACCESSION_NUMBER") or "").strip()
-                if not accession:
-                    continue
-                try:
-                    shares = int(float(row.get("SSHPRNAMT") or row.get("SHRS_OR_PRN_AMT") or 0))
-                except (ValueError, TypeError):
-                    shares = 0
-                try:
-                    value = int(float(row.get("VALUE") or 0)) * 1000  # Value in thousands
-                except (ValueError, TypeError):
-                    value = 0
-                sh_type = (row.get("SSHPRNAMTTYPE") or row.get("PUT_CALL") or "SH").strip()
-
-                # Aggregate if same accession has multiple entries for same CUSIP
-                if accession in holdings_by_accession:
-                    holdings_by_accession[accession]["shares"] += shares
-                    holdings_by_accession[accession]["value"] += value
-                else:
-                    holdings_by_accession[accession] = {
-                        "shares": shares,
-                        "value": value,
-                        "type": sh_type,
-                    }
-
-    if not holdings_by_accession:
-        _holders_cache[cusip6] = []
-        return []
-
-    # Step 2: Batch lookup filer names from COVERPAGE.tsv
-    accession_set = set(holdings_by_accession.keys())
-    filer_names: dict[str, tuple[str, str]] = {}  # accession -> (name, filing_date)
-
-    with open(cover_path, "r", encoding="utf-8", errors="replace") as f:
-        reader = csv.DictReader(f, delimiter="\t")
-        for row in reader:
-            accession = (row.get("ACCESSION_NUMBER") or "").strip()
-            if accession in accession_set:
-                name = (row.get("FILINGMANAGER_NAME") or row.get("FILING_MANAGER") or "").strip()
-                date = (row.get("REPORTCALENDARORQUARTER") or row.get("PERIODOFREPORT") or "").strip()
-                if name:
-                    filer_names[accession] = (name, date)
-
-    # Step 3: Build results
-    results = []
-    for accession, holding in holdings_by_accession.items():
-        name, date = filer_names.get(accession, ("Unknown Filer", ""))
-        results.append({
-            "holder": name,
-            "shares": holding["shares"],
-            "value": holding["value"],
-            "type": holding["type"],
-            "filingDate": date,
-        })
-
-    # Sort by shares descending
-    results.sort(key=lambda x: x["shares"], reverse=True)
-
-    _holders_cache[cusip6] = results
+    cached = _holders_cache.get((quarter, cusip6))
+    if cached is not None:
+        return cached
+
+    quarter_periods = holdings.periods()
+    stored = sorted(set(quarter_periods.values()))
+    # A stored result stays valid until a quarter is added, dropped or
+    # re-ingested (which also happens when the store's schema changes)
+    signature = ",".join(f"{name}@{at!r}" for name, at in sorted(holdings.ingested_at().items()))
+    text = db.get_holder_result(quarter, cusip6, signature)
+    if text is not None:
+        results = json.loads(text)
+        _holders_cache.set((quarter, cusip6), results)
+        return results
+
+    period = quarter_periods.get(quarter, "")
+    previous = max((p for p in stored if p < period), default=None)
+    holders, closed = holdings.lookup(cusip6, period, previous)
+    results = {
+        "holders": holders,
+        "closed": closed,
+        "period": period,
+        "previousPeriod": previous,
+        "trend": holdings.trend(cusip6, stored),
+    }
+    _holders_cache.set((quarter, cusip6), results)
+    db.put_holder_result(quarter, cusip6, signature, json.dumps(results), STORED_HOLDERS)
     return results
 
 
 def get_holders(symbol: str) -> dict:
     """Main entry point: get all 13F institutional holders for a symbol.
 
-    Returns dict with holders list, quarter info, and total count.
+    Returns dict with holders list, closed positions, ownership trend,
+    quarter info, and total count. Raises ``Preparing`` (and starts the
+    ingestion job) while no quarter has been indexed yet; once one has, it
+    is served while newer and older ones are fetched.
     """
+    quarter = _require_data()  # e.g. "01sep2025-30nov2025_form13f"
     cusip6 = get_cusip(symbol)
-    data_dir = ensure_13f_data()
-    holders = lookup_holders(cusip6, data_dir)
-
-    # Derive quarter from the data directory name
-    quarter = data_dir.name  # e.g. "01sep2025-30nov2025_form13f"
+    result = lookup_holders(cusip6, quarter)
 
     return {
-        "holders": holders,
+        **result,
         "quarter": quarter,
-        "total": len(holders),
+        "total": len(result["holders"]),
         "cusip": cusip6,
     }
+
+
+def resolve_filer(manager: str) -> tuple[str, str | None, list[dict]]:
+    """Find a 13F filer from an accession number, a CIK or (part of) a manager name.
+
+    Returns (filer, period of the given filing or None, other filers
+    matching the name). Raises LookupError if nothing matches.
+    """
+    manager = manager.strip()
+    if ACCESSION_RE.fullmatch(manager):
+        found = holdings.filing(manager)
+        if found is None:
+            raise LookupError(f"No stored 13F filing {manager}")
+        return found[0], found[1], []
+    if manager.isdigit():
+        filer = str(int(manager))  # CIKs are stored without leading zeros (see holdings._cik)
+        if not holdings.filer_periods(filer):
+            raise LookupError(f"No stored 13F filings for CIK {manager}")
+        return filer, None, []
+
+    matches = holdings.search_filers(manager)
+    if not matches:
+        raise LookupError(f"No 13F filer matches '{manager}'")
+    return matches[0]["filer"], None, matches[1:]
+
+
+def get_portfolio(manager: str, period: str | None = None) -> dict:
+    """Every position a filing manager reported for a period, weighted by value.
+
+    ``manager`` is an accession number, a CIK or a manager name search;
+    without ``period``, the filing's period or else the filer's latest
+    is used. Raises ``Preparing`` like ``get_holders``.
+    """
+    _require_data()
+    filer, filed_period, others = resolve_filer(manager)
+    periods = holdings.filer_periods(filer)
+    period = period or filed_period or (periods[0] if periods else "")
+    result = holdings.portfolio(filer, period)
+    if result is None:
+        raise LookupError(f"{filer} reported no 13F holdings for {period}")
+    return {**result, "periods": periods, "total": len(result["positions"]), "otherMatches": others}
+
+
+def get_overlap(manager_a: str, manager_b: str, period: str | None = None, limit: int = 10) -> dict:
+    """Holdings two filing managers have in common for a period, the most overlapping first.
+
+    Overlap per position is the smaller of its two portfolio weights;
+    ``overlap`` adds that up over every common position (1.0 means
+    identical portfolios). Without ``period``, the latest quarter's
+    period of report is used.
+    """
+    quarter = _require_data()
+    period = period or holdings.periods().get(quarter, "")
+    filers = []
+    for manager in (manager_a, manager_b):
+        filer, _, _ = resolve_filer(manager)
+        summary = holdings.portfolio(filer, period)
+        if summary is None:
+            raise LookupError(f"{filer} reported no 13F holdings for {period}")
+        filers.append({k: v for k, v in summary.items() if k != "positions"}
+                      | {"total": len(summary["positions"])})
+    common = holdings.overlap(filers[0]["filer"], filers[1]["filer"], period)
+    return {
+        "period": period,
+        "a": filers[0],
+        "b": filers[1],
+        "common": len(common),
+        "overlap": round(sum(min(h["a"]["weight"], h["b"]["weight"]) for h in common), 6),
+        "holdings": common[:limit],
+    }
@@ -0,0 +1,60 @@
+"""Concurrent fan-out of independent sub-requests.
+
+Composite endpoints (analysts, financials) are made of several
+independent upstream calls. ``gather`` runs them on a shared thread pool
+so the endpoint takes about as long as its slowest section, and gives
+each section its own deadline so a single slow source can't hold up
+the rest. Tasks run with a copy of the caller's context, so per-request
+state such as stage timings (``openfinch.metrics``) follows them, and
+under the request's profiler when it is being profiled.
+"""
+
+import concurrent.futures
+import contextvars
+import time
+from typing import Any, Callable
+
+from openfinch import profiling
+
+SECTION_TIMEOUT = 15.0   # Default per-section deadline in seconds
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="openfinch-fanout")
+# Whole sub-requests (e.g. from /api/batch) get their own pool: they may call
+# gather() themselves, and waiting on the same pool could starve it.
+_request_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="openfinch-batch")
+
+
+def submit(fn: Callable, *args) -> concurrent.futures.Future:
+    """Run a whole sub-request ``fn(*args)`` on the request pool."""
+    return _request_executor.submit(contextvars.copy_context().run, profiling.call, fn, *args)
+
+
+def gather(
+    tasks: dict[str, Callable[[], Any]],
+    defaults: dict[str, Any] | None = None,
+    timeouts: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """Run named zero-argument callables concurrently and collect their results.
+
+    A section that raises gets its entry from ``defaults`` (None if absent).
+    A section still running when its timeout expires yields None; it is
+    left to finish in the background and its result is discarded.
+    """
+    defaults = defaults or {}
+    timeouts = timeouts or {}
+    started = time.monotonic()
+    # One context copy per task: a Context can't be entered by two threads at once
+    futures = {name: _executor.submit(contextvars.copy_context().run, profiling.call, fn) for name, fn in tasks.items()}
+
+    results = {}
+    for name, future in futures.items():
+        deadline = started + timeouts.get(name, SECTION_TIMEOUT)
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            print(f"[OpenFinCh] Section '{name}' timed out")
+            results[name] = None
+        except Exception:
+            results[name] = defaults.get(name)
+    return results
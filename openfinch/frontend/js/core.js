@@ -1,8 +1,10 @@
 
 // ========== STATE ==========
 let DATASETS = null;
-let currentInterval = '{default_interval}';
-let currentSymbol = '{default_symbol}';
+// Initial state is injected into the HTML shell; the script itself is static and cacheable
+const OPENFINCH_CONFIG = window.OPENFINCH_CONFIG || {};
+let currentInterval = OPENFINCH_CONFIG.interval || '1d';
+let currentSymbol = OPENFINCH_CONFIG.symbol || 'AAPL';
 
 const urlParams = new URLSearchParams(window.location.search);
 const isPopout = urlParams.get('popout') === 'true';
@@ -117,18 +119,89 @@ async function fetchInterval(symbol, interval) {
   return data.dataset;
 }
 
+// Other modules can add sub-requests to the symbol-change batch. A provider
+// is called with the new symbol and returns [{ id, endpoint, body, onResult,
+// onDropped }]. Results are only handed to onResult once the symbol switch
+// has succeeded; if it fails, onDropped (optional) is called instead.
+const symbolBatchProviders = [];
+let requestedSymbol = currentSymbol;
+
+// POST several API calls as one /api/batch request, streaming each
+// {id, endpoint, status, body} result to onResult as soon as it is ready.
+async function fetchBatch(requests, onResult) {
+  const resp = await fetch('/api/batch', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      stream: true,
+      requests: requests.map(r => ({ id: r.id, endpoint: r.endpoint, body: r.body })),
+    }),
+  });
+  if (!resp.ok) {
+    const data = await resp.json().catch(() => ({}));
+    throw new Error(data.detail || 'Failed to fetch data');
+  }
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (value) buffered += decoder.decode(value, { stream: !done });
+    let nl;
+    while ((nl = buffered.indexOf('\n')) >= 0) {
+      const line = buffered.slice(0, nl).trim();
+      buffered = buffered.slice(nl + 1);
+      if (line) onResult(JSON.parse(line));
+    }
+    if (done) break;
+  }
+  if (buffered.trim()) onResult(JSON.parse(buffered));
+}
+
 async function fetchSymbol(symbol) {
   showLoading();
+  requestedSymbol = symbol.toUpperCase();
+  const requests = [{ id: 'interval', endpoint: '/api/interval', body: { symbol, interval: currentInterval } }];
+  symbolBatchProviders.forEach(provider => {
+    (provider(requestedSymbol) || []).forEach(r => requests.push(r));
+  });
+  const handlers = {};
+  requests.forEach(r => { if (r.onResult) handlers[r.id] = r.onResult; });
+
+  let switched = false;
+  let intervalError = null;
+  const held = [];  // sub-results that arrived before the interval did
   try {
-    const ds = await fetchInterval(symbol, currentInterval);
-    currentSymbol = symbol.toUpperCase();
-    DATASETS = {};
-    DATASETS[currentInterval] = ds;
-    document.title = currentSymbol + ' — OpenFinCh';
-    renderInterval(ds);
+    await fetchBatch(requests, item => {
+      if (item.id !== 'interval') {
+        if (!handlers[item.id]) return;
+        if (switched) handlers[item.id](item);
+        else held.push(item);
+        return;
+      }
+      if (item.status !== 200) {
+        intervalError = (item.body && item.body.detail) || 'Failed to fetch data';
+        return;
+      }
+      const ds = item.body.dataset;
+      currentSymbol = symbol.toUpperCase();
+      DATASETS = {};
+      DATASETS[currentInterval] = ds;
+      document.title = currentSymbol + ' — OpenFinCh';
+      renderInterval(ds);
+      switched = true;
+      held.splice(0).forEach(r => handlers[r.id](r));
+    });
+    if (intervalError) showToast(intervalError);
   } catch (e) {
     showToast(e.message || 'Network error');
   }
+  // The symbol didn't change: let the sub-requests restore what they cleared,
+  // unless a newer switch has taken over since
+  if (!switched && requestedSymbol === symbol.toUpperCase()) {
+    requestedSymbol = currentSymbol;
+    requests.forEach(r => { if (r.onDropped) r.onDropped(); });
+  }
   hideLoading();
 }
 
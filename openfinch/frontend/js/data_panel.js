@@ -447,40 +447,94 @@
     // Wire up SEC holders button
     const secBtn = pane.querySelector('#load-sec-holders');
     if (secBtn) {
-      secBtn.addEventListener('click', async () => {
-        const container = pane.querySelector('#sec-holders-container');
-        container.innerHTML = '<div class="panel-loading" style="padding:12px 0">Loading SEC 13F data\u2026 This may take a moment on first load.</div>';
+      const symbol = currentSymbol;
+      const container = pane.querySelector('#sec-holders-container');
+
+      // The server answers 202 with job progress until the 13F data is indexed
+      function secProgressText(s) {
+        const eta = s.etaSeconds != null ? ' \u2022 about ' + Math.ceil(s.etaSeconds) + 's left' : '';
+        if (s.state === 'downloading') {
+          const mb = n => (n / 1e6).toFixed(1);
+          const total = s.bytesTotal ? ' / ' + mb(s.bytesTotal) + ' MB (' + Math.floor(100 * s.bytesDownloaded / s.bytesTotal) + '%)' : ' MB';
+          return 'Downloading SEC 13F data\u2026 ' + mb(s.bytesDownloaded || 0) + total + eta;
+        }
+        if (s.state === 'extracting') return 'Extracting SEC 13F data\u2026';
+        if (s.state === 'indexing') {
+          return 'Indexing 13F holdings\u2026 ' + Number(s.rowsIndexed || 0).toLocaleString() + ' rows' + eta;
+        }
+        if (s.state === 'error') return 'Retrying after an error: ' + (s.error || 'unknown error');
+        return 'Preparing SEC 13F data\u2026';
+      }
+
+      async function loadSecHolders() {
+        // Stop polling once the user has moved on to another symbol
+        if (!container.isConnected || symbol !== currentSymbol) return;
         try {
           const resp = await fetch('/api/holders', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ symbol: currentSymbol }),
+            body: JSON.stringify({ symbol: symbol }),
           });
           const result = await resp.json();
+          if (resp.status === 202) {
+            container.innerHTML = '<div class="panel-loading" style="padding:12px 0">' + esc(secProgressText(result)) + '</div>';
+            setTimeout(loadSecHolders, 2000);
+            return;
+          }
           if (!resp.ok) {
-            container.innerHTML = '<div class="panel-empty">' + esc(result.error || 'Failed to load SEC data.') + '</div>';
+            container.innerHTML = '<div class="panel-empty">' + esc(result.detail || result.error || 'Failed to load SEC data.') + '</div>';
             return;
           }
           let h = '';
           if (result.quarter) {
-            h += '<div style="color:#787b86;font-size:11px;margin-bottom:8px">Quarter: ' + esc(result.quarter) + ' \u2022 ' + result.total + ' holders found</div>';
+            h += '<div style="color:#787b86;font-size:11px;margin-bottom:8px">Quarter: ' + esc(result.quarter) + ' \u2022 ' + result.total + ' holders found';
+            if (result.previousPeriod) h += ' \u2022 changes since ' + esc(result.previousPeriod);
+            h += '</div>';
+          }
+          const fmtChange = r => {
+            if (r.status === 'new') return '<span style="color:#26a69a">New</span>';
+            if (r.change == null) return '\u2014';
+            if (r.change === 0) return '0';
+            const color = r.change > 0 ? '#26a69a' : '#ef5350';
+            return '<span style="color:' + color + '">' + (r.change > 0 ? '+' : '') + Number(r.change).toLocaleString() + '</span>';
+          };
+          if (result.trend && result.trend.length > 1) {
+            h += '<table class="holder-table" style="margin-bottom:8px"><tr><th>Period</th><th>Holders</th><th>Shares</th></tr>';
+            result.trend.slice().reverse().forEach(t => {
+              h += '<tr><td>' + esc(t.period) + '</td><td>' + Number(t.holders).toLocaleString() + '</td><td>' + Number(t.shares).toLocaleString() + '</td></tr>';
+            });
+            h += '</table>';
           }
           if (result.holders && result.holders.length > 0) {
             h += '<div style="max-height:400px;overflow-y:auto">';
-            h += '<table class="holder-table"><tr><th>Holder</th><th>Shares</th><th>Value ($)</th><th>Filed</th></tr>';
+            h += '<table class="holder-table"><tr><th>Holder</th><th>Shares</th><th>Change</th><th>Value ($)</th><th>Filed</th></tr>';
             result.holders.forEach(r => {
               const shares = r.shares != null ? Number(r.shares).toLocaleString() : '\u2014';
               const value = r.value != null ? '$' + Number(r.value).toLocaleString() : '\u2014';
-              h += '<tr><td>' + esc(r.holder) + '</td><td>' + shares + '</td><td>' + value + '</td><td>' + esc(r.filingDate || '') + '</td></tr>';
+              h += '<tr><td>' + esc(r.holder) + '</td><td>' + shares + '</td><td>' + fmtChange(r) + '</td><td>' + value + '</td><td>' + esc(r.filingDate || '') + '</td></tr>';
             });
             h += '</table></div>';
           } else {
             h += '<div class="panel-empty">No 13F holders found for this security.</div>';
           }
+          if (result.closed && result.closed.length > 0) {
+            h += '<div style="color:#787b86;font-size:11px;margin:8px 0 4px">Closed positions (' + result.closed.length + ')</div>';
+            h += '<div style="max-height:200px;overflow-y:auto">';
+            h += '<table class="holder-table"><tr><th>Holder</th><th>Previous shares</th></tr>';
+            result.closed.forEach(r => {
+              h += '<tr><td>' + esc(r.holder) + '</td><td style="color:#ef5350">' + Number(r.previousShares).toLocaleString() + '</td></tr>';
+            });
+            h += '</table></div>';
+          }
           container.innerHTML = h;
         } catch (e) {
           container.innerHTML = '<div class="panel-empty">Network error loading SEC data.</div>';
         }
+      }
+
+      secBtn.addEventListener('click', () => {
+        container.innerHTML = '<div class="panel-loading" style="padding:12px 0">Loading SEC 13F data\u2026</div>';
+        loadSecHolders();
       });
     }
   }
@@ -612,72 +666,103 @@
     }
   }
 
-  async function loadTabData(tabName, symbol) {
-    const pane = tabPanes[tabName];
-    if (!pane) return;
-    const key = cacheKey(tabName, symbol);
+  const endpoints = {
+    news: '/api/news',
+    insiders: '/api/insiders',
+    profile: '/api/profile',
+    analysts: '/api/analysts',
+    financials: '/api/financials',
+  };
+
+  function tabRequestBody(tabName, symbol) {
+    const body = { symbol };
+    if (tabName === 'financials') body.freq = finFreq;
+    if (tabName === 'news') body.start = 0;
+    return body;
+  }
 
+  function beginTabLoad(tabName) {
     if (tabName === 'news') {
       newsStart = 0;
       newsHasMore = false;
       newsLoading = false;
       if (newsObserver) { newsObserver.disconnect(); newsObserver = null; }
     }
+    tabPanes[tabName].innerHTML = '<div class="panel-loading">Loading...</div>';
+  }
+
+  // Cache a tab's response and render it unless the panel has moved on
+  function applyTabResult(tabName, symbol, ok, result, isStale) {
+    const pane = tabPanes[tabName];
+    if (ok && tabName !== 'news') cache[cacheKey(tabName, symbol)] = result;
+    if (isStale()) return;
+    if (!ok) {
+      pane.innerHTML = '<div class="panel-empty">Failed to load data.</div>';
+      return;
+    }
 
-    pane.innerHTML = '<div class="panel-loading">Loading...</div>';
+    if (tabName === 'news') {
+      newsHasMore = !!result.hasMore;
+      newsStart = (result.news || []).length;
+      renderNews(pane, result.news, false);
+    }
+    else if (tabName === 'insiders') renderInsiders(pane, result.insiders);
+    else if (tabName === 'profile') renderProfile(pane, result.profile);
+    else if (tabName === 'analysts') renderAnalysts(pane, result);
+    else if (tabName === 'financials') renderFinancials(pane, result);
+  }
 
-    const endpoints = {
-      news: '/api/news',
-      insiders: '/api/insiders',
-      profile: '/api/profile',
-      analysts: '/api/analysts',
-      financials: '/api/financials',
-    };
+  async function loadTabData(tabName, symbol) {
+    const pane = tabPanes[tabName];
+    if (!pane) return;
+    beginTabLoad(tabName);
+    const isStale = () => activeTab !== tabName || currentSymbol !== symbol;
 
     try {
-      const body = { symbol };
-      if (tabName === 'financials') body.freq = finFreq;
-      if (tabName === 'news') body.start = 0;
       const resp = await fetch(endpoints[tabName], {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(body),
+        body: JSON.stringify(tabRequestBody(tabName, symbol)),
       });
       // Stale check
-      if (activeTab !== tabName || currentSymbol !== symbol) return;
+      if (isStale()) return;
       const result = await resp.json();
-      if (!resp.ok) {
-        pane.innerHTML = '<div class="panel-empty">Failed to load data.</div>';
-        return;
-      }
-      if (tabName !== 'news') cache[key] = result;
-
-      if (tabName === 'news') {
-        newsHasMore = !!result.hasMore;
-        newsStart = (result.news || []).length;
-        renderNews(pane, result.news, false);
-      }
-      else if (tabName === 'insiders') renderInsiders(pane, result.insiders);
-      else if (tabName === 'profile') renderProfile(pane, result.profile);
-      else if (tabName === 'analysts') renderAnalysts(pane, result);
-      else if (tabName === 'financials') renderFinancials(pane, result);
+      applyTabResult(tabName, symbol, resp.ok, result, isStale);
     } catch (e) {
       pane.innerHTML = '<div class="panel-empty">Network error.</div>';
     }
   }
 
-  // Hook into fetchSymbol to refresh active panel on symbol change
+  // On symbol change the open tab rides along in fetchSymbol's /api/batch
+  // request and renders as soon as its result streams in; other tabs load
+  // when they are opened.
+  symbolBatchProviders.push(symbol => {
+    if (!panelOpen || !activeTab) return [];
+    const tabName = activeTab;
+    beginTabLoad(tabName);
+    delete cache[cacheKey(tabName, symbol)];
+    return [{
+      id: 'tab:' + tabName,
+      endpoint: endpoints[tabName],
+      body: tabRequestBody(tabName, symbol),
+      onResult: item => applyTabResult(tabName, symbol, item.status === 200, item.body,
+        () => activeTab !== tabName || requestedSymbol !== symbol),
+      // The switch failed: put back the current symbol's data
+      onDropped: () => {
+        if (activeTab !== tabName) return;
+        const cached = cache[cacheKey(tabName, currentSymbol)];
+        if (cached) applyTabResult(tabName, currentSymbol, true, cached, () => false);
+        else loadTabData(tabName, currentSymbol);
+      },
+    }];
+  });
+
+  // Clear drawings before switching symbols
   const _origFetchSymbolForPanels = fetchSymbol;
   fetchSymbol = async function (symbol) {
     if (typeof clearAllDrawings === 'function') clearAllDrawings();
     if (typeof deactivateDrawingTool === 'function') deactivateDrawingTool();
     await _origFetchSymbolForPanels(symbol);
-    // Clear cache for new symbol
-    Object.keys(cache).forEach(k => { if (k.endsWith(':' + symbol) === false) { /* keep */ } });
-    if (panelOpen && activeTab) {
-      delete cache[cacheKey(activeTab, currentSymbol)];
-      loadTabData(activeTab, currentSymbol);
-    }
   };
 })();
 
@@ -0,0 +1,745 @@
+"""Indexed SQLite store of 13F holdings across quarters.
+
+The quarterly INFOTABLE.tsv runs to millions of rows, far too many to scan
+on every holders lookup. ``ingest`` loads a quarter's data set (INFOTABLE,
+COVERPAGE and SUBMISSION) once into ``holdings.db`` next to the extracted
+files, with indexes on the CUSIP prefix and the accession number, so
+``lookup`` and ``trend`` are index queries. Issuer names are tokenized at
+ingestion into a token -> CUSIP prefix table, so resolving a company name
+to a CUSIP (``search_issuer``) is a few index lookups too. Manager names
+are tokenized the same way, and a filer's whole portfolio (``portfolio``)
+or what two filers both hold (``overlap``) is read through the filer
+index rather than by scanning holdings.
+
+Several quarters can be stored side by side. Positions are compared by
+filer (CIK) and period of report rather than by data set, since late
+filings and amendments for a period can land in a later data set. For
+each filer and period, only the latest filing counts (``current``), plus
+any later "NEW HOLDINGS" amendments that add to it rather than restate it.
+
+A quarter is only marked as ingested in the same transaction that loads
+its rows, so readers (in any worker) see either all of it or none of it.
+"""
+
+import csv
+import datetime
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+from openfinch import metrics
+
+DB_PATH = Path.home() / ".openfinch" / "13f" / "holdings.db"
+BUSY_TIMEOUT = 30.0
+BATCH_SIZE = 50_000   # Rows per executemany during ingestion
+INGEST_CACHE_KB = 256 * 1024   # Page cache for the ingesting connection
+
+# Bump when the tables below change; an outdated store is rebuilt from the
+# extracted TSVs on the next lookup
+SCHEMA_VERSION = 5
+
+_schema_checked = False
+_schema_lock = threading.Lock()
+
+# Issuer-name words that don't tell companies apart (legal forms, filler)
+NAME_STOPWORDS = frozenset({
+    "THE", "INC", "INCORPORATED", "CORP", "CORPORATION", "CO", "COMPANY", "LTD", "LIMITED",
+    "PLC", "LLC", "LP", "LLP", "SA", "NV", "AG", "SE", "DEL", "NEW", "COM", "CL", "A", "B",
+})
+PREFIX_LEN = 4   # Leading characters a word must share with an abbreviated issuer name ("MACHINES" / "MACHS")
+
+# Rows with very long fields (free-text columns) exceed csv's default limit
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def _open() -> sqlite3.Connection:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect() -> sqlite3.Connection:
+    """Open a connection to the store, creating or rebuilding its schema if needed."""
+    global _schema_checked
+    conn = _open()
+    if not _schema_checked:
+        with _schema_lock:
+            if not _schema_checked:
+                if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                    _init(conn)
+                _schema_checked = True
+    return conn
+
+
+def _init(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        # Earlier layouts are derived data: drop them and re-ingest
+        for table in ("quarters", "filings", "holdings", "issuers", "issuer_tokens", "filer_tokens"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute("""
+            CREATE TABLE quarters (
+                name TEXT PRIMARY KEY,
+                period TEXT NOT NULL,
+                ingested_at REAL NOT NULL,
+                filings INTEGER NOT NULL,
+                holdings INTEGER NOT NULL
+            )
+        """)
+        # filer is the CIK, or the manager's name in data sets without one
+        conn.execute("""
+            CREATE TABLE filings (
+                accession TEXT PRIMARY KEY,
+                quarter TEXT NOT NULL,
+                filer TEXT NOT NULL,
+                manager TEXT NOT NULL,
+                period TEXT NOT NULL,
+                filed TEXT NOT NULL,
+                adds INTEGER NOT NULL,
+                current INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE holdings (
+                quarter TEXT NOT NULL,
+                accession TEXT NOT NULL,
+                cusip6 TEXT NOT NULL,
+                cusip TEXT NOT NULL,
+                issuer TEXT NOT NULL,
+                shares INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                type TEXT NOT NULL
+            )
+        """)
+        # Issuer names per CUSIP prefix and the words in them, with holdings row counts
+        conn.execute("""
+            CREATE TABLE issuers (
+                quarter TEXT NOT NULL,
+                cusip6 TEXT NOT NULL,
+                name TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                PRIMARY KEY (quarter, cusip6, name)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE issuer_tokens (
+                token TEXT NOT NULL,
+                quarter TEXT NOT NULL,
+                cusip6 TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                PRIMARY KEY (token, quarter, cusip6)
+            )
+        """)
+        # Words of filing manager names, for finding a filer by name
+        conn.execute("""
+            CREATE TABLE filer_tokens (
+                token TEXT NOT NULL,
+                quarter TEXT NOT NULL,
+                filer TEXT NOT NULL,
+                PRIMARY KEY (token, quarter, filer)
+            )
+        """)
+        conn.execute("CREATE INDEX filings_quarter ON filings (quarter)")
+        conn.execute("CREATE INDEX filings_filer ON filings (filer, period)")
+        conn.execute("CREATE INDEX holdings_cusip6 ON holdings (cusip6, accession)")
+        conn.execute("CREATE INDEX holdings_accession ON holdings (accession)")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _to_int(text: str) -> int:
+    try:
+        return int(float(text or 0))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _read_tsv(path: Path):
+    """Open a TSV file: (file, column name -> index, row reader past the header)."""
+    f = open(path, "r", encoding="utf-8", errors="replace", newline="")
+    reader = csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+    header = next(reader, [])
+    return f, {name.strip().upper(): i for i, name in enumerate(header)}, reader
+
+
+def _column(columns: dict[str, int], *names: str) -> int | None:
+    for name in names:
+        if name in columns:
+            return columns[name]
+    return None
+
+
+def _field(row: list[str], i: int | None) -> str:
+    return row[i].strip() if i is not None and i < len(row) else ""
+
+
+def _iso_date(text: str) -> str:
+    """SEC's "31-MAR-2025" dates as "2025-03-31", so they sort; other text as-is."""
+    try:
+        return datetime.datetime.strptime(text, "%d-%b-%Y").date().isoformat()
+    except ValueError:
+        return text
+
+
+def _cik(text: str) -> str:
+    """A CIK without the leading zeros SEC pads it with, so "0001067983" and "1067983" match."""
+    return str(int(text)) if text.isdigit() else text
+
+
+def _submissions(path: Path) -> dict[str, tuple[str, str, str]]:
+    """accession -> (CIK, filing date, period of report) from SUBMISSION.tsv, if present."""
+    if not path.exists():
+        return {}
+    f, cols, reader = _read_tsv(path)
+    with f:
+        acc = _column(cols, "ACCESSION_NUMBER")
+        cik = _column(cols, "CIK")
+        filed = _column(cols, "FILING_DATE")
+        period = _column(cols, "PERIODOFREPORT")
+        return {
+            _field(row, acc): (_cik(_field(row, cik)), _iso_date(_field(row, filed)), _iso_date(_field(row, period)))
+            for row in reader
+        }
+
+
+def _filing_rows(quarter: str, quarter_dir: Path):
+    submissions = _submissions(quarter_dir / "SUBMISSION.tsv")
+    f, cols, reader = _read_tsv(quarter_dir / "COVERPAGE.tsv")
+    with f:
+        acc = _column(cols, "ACCESSION_NUMBER")
+        name = _column(cols, "FILINGMANAGER_NAME", "FILING_MANAGER")
+        period_col = _column(cols, "REPORTCALENDARORQUARTER", "PERIODOFREPORT")
+        amendment = _column(cols, "AMENDMENTTYPE")
+        for row in reader:
+            accession = _field(row, acc)
+            manager = _field(row, name)
+            if not accession or not manager:
+                continue
+            cik, filed, period = submissions.get(accession, ("", "", ""))
+            yield (
+                accession, quarter, cik or manager.upper(), manager,
+                period or _iso_date(_field(row, period_col)), filed,
+                int(_field(row, amendment).upper() == "NEW HOLDINGS"),
+            )
+
+
+def _holding_rows(quarter: str, path: Path, accessions: set[str]):
+    f, cols, reader = _read_tsv(path)
+    with f:
+        acc = _column(cols, "ACCESSION_NUMBER")
+        cusip_col = _column(cols, "CUSIP")
+        issuer = _column(cols, "NAMEOFISSUER")
+        shares = _column(cols, "SSHPRNAMT", "SHRS_OR_PRN_AMT")
+        value = _column(cols, "VALUE")
+        sh_type = _column(cols, "SSHPRNAMTTYPE", "PUT_CALL")
+        for row in reader:
+            accession = _field(row, acc)
+            cusip = _field(row, cusip_col).upper()
+            if accession not in accessions or len(cusip) < 6:
+                continue
+            yield (
+                quarter, accession, cusip[:6], cusip,
+                _field(row, issuer).upper(),
+                _to_int(_field(row, shares)),
+                _to_int(_field(row, value)) * 1000,  # Value in thousands
+                _field(row, sh_type) or "SH",
+            )
+
+
+def name_tokens(name: str) -> list[str]:
+    """Distinctive upper-case words of a company or issuer name, in order."""
+    words = re.sub(r"[^A-Z0-9]+", " ", name.upper().replace("&", " AND ")).split()
+    return [w for w in words if w not in NAME_STOPWORDS]
+
+
+def _issuer_rows(quarter: str, names: Counter):
+    """Rows for issuers and issuer_tokens from (cusip6, issuer name) -> holdings rows."""
+    tokens: Counter = Counter()
+    for (cusip6, name), rows in names.items():
+        for token in set(name_tokens(name)):
+            tokens[token, cusip6] += rows
+    return (
+        [(quarter, cusip6, name, rows) for (cusip6, name), rows in names.items()],
+        [(token, quarter, cusip6, rows) for (token, cusip6), rows in tokens.items()],
+    )
+
+
+def _batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _delete_quarter(conn: sqlite3.Connection, quarter: str):
+    conn.execute(
+        "DELETE FROM holdings WHERE accession IN (SELECT accession FROM filings WHERE quarter=?)", (quarter,))
+    conn.execute("DELETE FROM filings WHERE quarter=?", (quarter,))
+    conn.execute("DELETE FROM quarters WHERE name=?", (quarter,))
+    conn.execute("DELETE FROM issuers WHERE quarter=?", (quarter,))
+    conn.execute("DELETE FROM issuer_tokens WHERE quarter=?", (quarter,))
+    conn.execute("DELETE FROM filer_tokens WHERE quarter=?", (quarter,))
+
+
+def _refresh_current(conn: sqlite3.Connection, periods: list[str]):
+    """Recompute which filings count for each filer in ``periods`` (see the module docstring)."""
+    if not periods:
+        return
+    marks = ", ".join("?" * len(periods))
+    conn.execute(f"UPDATE filings SET current = 0 WHERE period IN ({marks})", periods)
+    conn.execute(
+        f"""
+        WITH base AS (
+            SELECT accession, filer, period, filed FROM (
+                SELECT accession, filer, period, filed,
+                       ROW_NUMBER() OVER (PARTITION BY filer, period ORDER BY filed DESC, accession DESC) AS rn
+                FROM filings WHERE adds = 0 AND period IN ({marks})
+            ) WHERE rn = 1
+        )
+        UPDATE filings SET current = 1
+        WHERE period IN ({marks}) AND (
+            accession IN (SELECT accession FROM base)
+            OR (adds = 1 AND EXISTS (
+                SELECT 1 FROM base b
+                WHERE b.filer = filings.filer AND b.period = filings.period AND filings.filed >= b.filed))
+        )
+        """,
+        periods + periods,
+    )
+
+
+def ingest(quarter: str, quarter_dir: Path, progress: Callable[[int], None] | None = None):
+    """Load a quarter's COVERPAGE.tsv, SUBMISSION.tsv and INFOTABLE.tsv into the store.
+
+    Replaces whatever was stored for the quarter before, in one transaction.
+    ``progress`` is called with the number of holdings rows loaded so far
+    after each batch.
+    """
+    started = time.perf_counter()
+    print(f"[OpenFinCh] Indexing 13F holdings for {quarter}...")
+    conn = connect()
+    # Index pages for millions of random-order inserts; the default cache thrashes
+    conn.execute(f"PRAGMA cache_size = -{INGEST_CACHE_KB}")
+    try:
+        with conn:
+            _delete_quarter(conn, quarter)
+            conn.executemany(
+                "INSERT OR REPLACE INTO filings (accession, quarter, filer, manager, period, filed, adds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _filing_rows(quarter, quarter_dir),
+            )
+            accessions = {row[0] for row in conn.execute("SELECT accession FROM filings WHERE quarter=?", (quarter,))}
+            conn.executemany(
+                "INSERT OR IGNORE INTO filer_tokens VALUES (?, ?, ?)",
+                ((token, quarter, filer)
+                 for filer, manager in conn.execute(
+                     "SELECT DISTINCT filer, manager FROM filings WHERE quarter=?", (quarter,)).fetchall()
+                 for token in name_tokens(manager)),
+            )
+            loaded = 0
+            names: Counter = Counter()
+            for batch in _batches(_holding_rows(quarter, quarter_dir / "INFOTABLE.tsv", accessions)):
+                conn.executemany("INSERT INTO holdings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                names.update((row[2], row[4]) for row in batch)
+                loaded += len(batch)
+                if progress is not None:
+                    progress(loaded)
+            issuers, tokens = _issuer_rows(quarter, names)
+            conn.executemany("INSERT INTO issuers VALUES (?, ?, ?, ?)", issuers)
+            conn.executemany("INSERT INTO issuer_tokens VALUES (?, ?, ?, ?)", tokens)
+            periods = [row[0] for row in conn.execute(
+                "SELECT DISTINCT period FROM filings WHERE quarter=?", (quarter,))]
+            _refresh_current(conn, periods)
+            # The period most of the data set's filings report on
+            row = conn.execute(
+                "SELECT period FROM filings WHERE quarter=? GROUP BY period "
+                "ORDER BY COUNT(*) DESC, period DESC LIMIT 1",
+                (quarter,),
+            ).fetchone()
+            n_filings = conn.execute("SELECT COUNT(*) FROM filings WHERE quarter=?", (quarter,)).fetchone()[0]
+            conn.execute(
+                "INSERT INTO quarters (name, period, ingested_at, filings, holdings) VALUES (?, ?, ?, ?, ?)",
+                (quarter, row[0] if row else "", time.time(), n_filings, loaded),
+            )
+    finally:
+        conn.close()
+    print(f"[OpenFinCh] Indexed {loaded:,} holdings from {n_filings:,} filings "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def quarter_start(quarter: str) -> datetime.date:
+    """First day covered by a quarter named like SEC's ZIPs.
+
+    Current data sets are named like "01sep2025-30nov2025_form13f",
+    those before 2024 like "2023q4_form13f".
+    """
+    try:
+        return datetime.datetime.strptime(quarter[:9], "%d%b%Y").date()
+    except ValueError:
+        pass
+    match = re.match(r"(\d{4})q([1-4])", quarter)
+    if match:
+        return datetime.date(int(match[1]), 3 * int(match[2]) - 2, 1)
+    return datetime.date.min
+
+
+def latest_quarter() -> str | None:
+    """Most recent quarter in the store, or None before the first ingestion."""
+    conn = connect()
+    try:
+        names = [row[0] for row in conn.execute("SELECT name FROM quarters")]
+    finally:
+        conn.close()
+    return max(names, key=quarter_start, default=None)
+
+
+def is_ingested(quarter: str) -> bool:
+    conn = connect()
+    try:
+        return conn.execute("SELECT 1 FROM quarters WHERE name=?", (quarter,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def periods() -> dict[str, str]:
+    """quarter -> the period of report most of its filings cover, for every stored quarter."""
+    conn = connect()
+    try:
+        return dict(conn.execute("SELECT name, period FROM quarters"))
+    finally:
+        conn.close()
+
+
+def ingested_at() -> dict[str, float]:
+    """quarter -> when it was ingested (epoch seconds), for every stored quarter."""
+    conn = connect()
+    try:
+        return dict(conn.execute("SELECT name, ingested_at FROM quarters"))
+    finally:
+        conn.close()
+
+
+def prune(keep: set[str]) -> list[str]:
+    """Delete every stored quarter not in ``keep``; returns the ones deleted."""
+    conn = connect()
+    try:
+        with conn:
+            dropped = [name for (name,) in conn.execute("SELECT name FROM quarters") if name not in keep]
+            for quarter in dropped:
+                affected = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT period FROM filings WHERE quarter=?", (quarter,))]
+                _delete_quarter(conn, quarter)
+                _refresh_current(conn, affected)
+    finally:
+        conn.close()
+    return dropped
+
+
+# A CUSIP prefix's position per filer and period, from the filings that count
+_POSITIONS = """
+    WITH pos AS (
+        SELECT f.filer, f.period, MAX(f.manager) AS manager, SUM(h.shares) AS shares,
+               SUM(h.value) AS value, MIN(h.type) AS type, MAX(f.filed) AS filed
+        FROM holdings h JOIN filings f ON f.accession = h.accession
+        WHERE h.cusip6 = :cusip6 AND f.current = 1 AND f.period IN (:period, :previous)
+        GROUP BY f.filer, f.period
+    )
+"""
+
+# Whether a filer reported for a period at all (so a missing position means none was held)
+_FILED = "EXISTS (SELECT 1 FROM filings x WHERE x.filer = {filer} AND x.period = {period} AND x.current = 1)"
+
+
+@metrics.stage("db_read")
+def lookup(cusip6: str, period: str, previous: str | None = None) -> tuple[list[dict], list[dict]]:
+    """Holders of a CUSIP prefix for a period of report, and positions closed since ``previous``.
+
+    Holders come by shares descending, with rows from one filer (share
+    classes, several investment managers, amendments) added up. With a
+    previous period, each holder's ``change`` in shares is given and its
+    ``status`` is new, increased, decreased or unchanged; both stay null
+    for filers that didn't report for the previous period. Closed positions
+    are those held in the previous period by filers that reported for
+    ``period`` without them.
+    """
+    params = {"cusip6": cusip6, "period": period, "previous": previous or ""}
+    conn = connect()
+    try:
+        rows = conn.execute(
+            _POSITIONS + f"""
+            SELECT cur.manager, cur.shares, cur.value, cur.type, cur.filed, prev.shares,
+                   {_FILED.format(filer="cur.filer", period=":previous")}
+            FROM pos cur LEFT JOIN pos prev ON prev.filer = cur.filer AND prev.period = :previous
+            WHERE cur.period = :period
+            ORDER BY cur.shares DESC
+            """,
+            params,
+        ).fetchall()
+        closed = conn.execute(
+            _POSITIONS + f"""
+            SELECT prev.manager, prev.shares, prev.value, prev.type, prev.filed
+            FROM pos prev
+            WHERE prev.period = :previous
+              AND NOT EXISTS (SELECT 1 FROM pos cur WHERE cur.period = :period AND cur.filer = prev.filer)
+              AND {_FILED.format(filer="prev.filer", period=":period")}
+            ORDER BY prev.shares DESC
+            """,
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+
+    holders = []
+    for holder, shares, value, sh_type, filed, prev_shares, reported in rows:
+        if not reported:
+            change, status = None, None
+        elif prev_shares is None:
+            change, status = shares, "new"
+        else:
+            change = shares - prev_shares
+            status = "increased" if change > 0 else "decreased" if change < 0 else "unchanged"
+        holders.append({"holder": holder, "shares": shares, "value": value, "type": sh_type,
+                        "filingDate": filed, "change": change, "status": status})
+    return holders, [
+        {"holder": holder, "previousShares": shares, "previousValue": value, "type": sh_type, "filingDate": filed}
+        for holder, shares, value, sh_type, filed in closed
+    ]
+
+
+@metrics.stage("db_read")
+def trend(cusip6: str, periods: list[str]) -> list[dict]:
+    """Institutional ownership of a CUSIP prefix per period: holders, shares and value, oldest first."""
+    if not periods:
+        return []
+    marks = ", ".join("?" * len(periods))
+    conn = connect()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT f.period, COUNT(DISTINCT f.filer), SUM(h.shares), SUM(h.value)
+            FROM holdings h JOIN filings f ON f.accession = h.accession
+            WHERE h.cusip6 = ? AND f.current = 1 AND f.period IN ({marks})
+            GROUP BY f.period ORDER BY f.period
+            """,
+            [cusip6, *periods],
+        ).fetchall()
+    finally:
+        conn.close()
+    return [{"period": period, "holders": n, "shares": shares, "value": value}
+            for period, n, shares, value in rows]
+
+
+def _token_matches(conn: sqlite3.Connection, quarter: str, token: str, prefix: bool) -> dict[str, int]:
+    """cusip6 -> holdings rows for issuers with ``token`` as a word (or a word starting with it)."""
+    if prefix:
+        # A range scan on the primary key; chr(0x10FFFF) sorts after any word
+        rows = conn.execute(
+            "SELECT cusip6, MAX(rows) FROM issuer_tokens "
+            "WHERE token >= ? AND token < ? AND quarter = ? GROUP BY cusip6",
+            (token, token + chr(0x10FFFF), quarter),
+        )
+    else:
+        rows = conn.execute(
+            "SELECT cusip6, rows FROM issuer_tokens WHERE token = ? AND quarter = ?", (token, quarter))
+    return dict(rows)
+
+
+@metrics.stage("db_read")
+def _search(quarter: str, tokens: list[str], prefix_from: int, limit: int) -> list[dict]:
+    """CUSIP prefixes with issuer words matching every token; tokens from ``prefix_from`` on match as prefixes."""
+    if not tokens:
+        return []
+    conn = connect()
+    try:
+        scores: dict[str, int] = {}
+        for i, token in enumerate(tokens):
+            matches = _token_matches(conn, quarter, token, prefix=i >= prefix_from)
+            scores = matches if i == 0 else {c: min(n, matches[c]) for c, n in scores.items() if c in matches}
+            if not scores:
+                return []
+        results = []
+        for cusip6, rows in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            name = conn.execute(
+                "SELECT name FROM issuers WHERE quarter = ? AND cusip6 = ? ORDER BY rows DESC LIMIT 1",
+                (quarter, cusip6),
+            ).fetchone()
+            results.append({"cusip6": cusip6, "name": name[0] if name else "", "rows": rows})
+        return results
+    finally:
+        conn.close()
+
+
+def search_issuers(quarter: str, query: str, limit: int = 10, prefix: bool = False) -> list[dict]:
+    """CUSIP prefixes whose issuer names contain every word of ``query``, most held first.
+
+    With ``prefix``, the last word only has to start an issuer word (for
+    type-ahead); otherwise words must match whole.
+    """
+    tokens = name_tokens(query)
+    return _search(quarter, tokens, len(tokens) - 1 if prefix else len(tokens), limit)
+
+
+def search_issuer(quarter: str, company_name: str) -> str | None:
+    """Most commonly held CUSIP prefix for a company name, e.g. "Tesla, Inc." -> Tesla's.
+
+    Tries whole-word matches first, then words that share their first
+    PREFIX_LEN characters, for issuer names SEC filers abbreviate.
+    """
+    matches = search_issuers(quarter, company_name, limit=1)
+    if not matches:
+        matches = _search(quarter, [t[:PREFIX_LEN] for t in name_tokens(company_name)], 0, 1)
+    return matches[0]["cusip6"] if matches else None
+
+
+def _filer_matches(conn: sqlite3.Connection, token: str, prefix: bool) -> set[str]:
+    """Filers with ``token`` as a word of a manager name (or a word starting with it)."""
+    if prefix:
+        rows = conn.execute(
+            "SELECT DISTINCT filer FROM filer_tokens WHERE token >= ? AND token < ?",
+            (token, token + chr(0x10FFFF)),
+        )
+    else:
+        rows = conn.execute("SELECT DISTINCT filer FROM filer_tokens WHERE token = ?", (token,))
+    return {row[0] for row in rows}
+
+
+@metrics.stage("db_read")
+def search_filers(query: str, limit: int = 10) -> list[dict]:
+    """Filers whose manager names contain every word of ``query``, the last one as a prefix.
+
+    Closest names (fewest extra words) come first, then the filers that
+    reported most recently.
+    """
+    tokens = name_tokens(query)
+    if not tokens:
+        return []
+    conn = connect()
+    try:
+        filers: set[str] | None = None
+        for i, token in enumerate(tokens):
+            matches = _filer_matches(conn, token, prefix=i == len(tokens) - 1)
+            filers = matches if filers is None else filers & matches
+            if not filers:
+                return []
+        latest: dict[str, tuple[str, str]] = {}
+        candidates = sorted(filers)
+        for start in range(0, len(candidates), 900):
+            chunk = candidates[start:start + 900]
+            marks = ", ".join("?" * len(chunk))
+            for filer, period, manager in conn.execute(
+                f"SELECT filer, period, manager FROM filings WHERE filer IN ({marks}) AND current = 1", chunk
+            ):
+                if filer not in latest or period > latest[filer][0]:
+                    latest[filer] = (period, manager)
+    finally:
+        conn.close()
+    # Stable sorts, least significant key first
+    ranked = sorted(latest.items(), key=lambda item: item[1][1])
+    ranked.sort(key=lambda item: item[1][0], reverse=True)
+    ranked.sort(key=lambda item: len(name_tokens(item[1][1])))
+    return [{"filer": filer, "manager": manager, "latestPeriod": period}
+            for filer, (period, manager) in ranked[:limit]]
+
+
+def filing(accession: str) -> tuple[str, str] | None:
+    """(filer, period of report) of a stored filing."""
+    conn = connect()
+    try:
+        return conn.execute("SELECT filer, period FROM filings WHERE accession = ?", (accession,)).fetchone()
+    finally:
+        conn.close()
+
+
+def filer_periods(filer: str) -> list[str]:
+    """Periods a filer reported for in the store, newest first."""
+    conn = connect()
+    try:
+        return [row[0] for row in conn.execute(
+            "SELECT DISTINCT period FROM filings WHERE filer = ? AND current = 1 ORDER BY period DESC", (filer,))]
+    finally:
+        conn.close()
+
+
+# A filer's positions for a period, per CUSIP prefix, with their share of its total value
+_PORTFOLIO = """
+    {name} AS (
+        SELECT cusip6, issuer, shares, value, type,
+               COALESCE(value * 1.0 / SUM(value) OVER (), 0) AS weight
+        FROM (
+            SELECT h.cusip6, MAX(h.issuer) AS issuer, SUM(h.shares) AS shares,
+                   SUM(h.value) AS value, MIN(h.type) AS type
+            FROM filings f JOIN holdings h ON h.accession = f.accession
+            WHERE f.filer = :{name} AND f.period = :period AND f.current = 1
+            GROUP BY h.cusip6
+        )
+    )
+"""
+
+
+@metrics.stage("db_read")
+def portfolio(filer: str, period: str) -> dict | None:
+    """Everything a filer reported holding for a period, by value descending; None if it didn't report.
+
+    Rows for one CUSIP prefix (share classes, several investment
+    managers, amendments) are added up; ``weight`` is each position's
+    fraction of the portfolio's total value.
+    """
+    conn = connect()
+    try:
+        manager, filings, filed = conn.execute(
+            "SELECT MAX(manager), COUNT(*), MAX(filed) FROM filings WHERE filer = ? AND period = ? AND current = 1",
+            (filer, period),
+        ).fetchone()
+        if not filings:
+            return None
+        rows = conn.execute(
+            "WITH" + _PORTFOLIO.format(name="filer") + "SELECT * FROM filer ORDER BY value DESC",
+            {"filer": filer, "period": period},
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        "filer": filer,
+        "manager": manager,
+        "period": period,
+        "filingDate": filed,
+        "filings": filings,
+        "value": sum(row[3] for row in rows),
+        "positions": [
+            {"cusip6": cusip6, "issuer": issuer, "shares": shares, "value": value, "type": sh_type,
+             "weight": round(weight, 6)}
+            for cusip6, issuer, shares, value, sh_type, weight in rows
+        ],
+    }
+
+
+@metrics.stage("db_read")
+def overlap(filer_a: str, filer_b: str, period: str) -> list[dict]:
+    """Positions two filers both reported for a period, by the smaller of their two weights descending."""
+    conn = connect()
+    try:
+        rows = conn.execute(
+            "WITH" + _PORTFOLIO.format(name="a") + "," + _PORTFOLIO.format(name="b") + """
+            SELECT a.cusip6, a.issuer, a.shares, a.value, a.weight, b.shares, b.value, b.weight
+            FROM a JOIN b ON b.cusip6 = a.cusip6
+            ORDER BY MIN(a.weight, b.weight) DESC, a.value + b.value DESC
+            """,
+            {"a": filer_a, "b": filer_b, "period": period},
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"cusip6": cusip6, "issuer": issuer,
+         "a": {"shares": a_shares, "value": a_value, "weight": round(a_weight, 6)},
+         "b": {"shares": b_shares, "value": b_value, "weight": round(b_weight, 6)}}
+        for cusip6, issuer, a_shares, a_value, a_weight, b_shares, b_value, b_weight in rows
+    ]
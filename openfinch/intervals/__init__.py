@@ -4,13 +4,16 @@ To add a new interval, simply add an entry to the INTERVALS dict below.
 """
 
 import concurrent.futures
+import contextvars
 import time
-import pandas as pd
-import yfinance as yf
+from typing import TYPE_CHECKING
+
+from openfinch import metrics, offline, profiling, yahoo
 from . import db
+from openfinch import coordination
 
-# Initialize the cache database entirely
-db.init_db()
+if TYPE_CHECKING:  # pandas is only needed once data is fetched
+    import pandas as pd
 
 
 # Each interval entry defines how to fetch and process data from yfinance.
@@ -149,17 +152,69 @@ INTERVALS = {
 }
 
 
-def fetch_interval(symbol: str, interval_key: str) -> pd.DataFrame:
+# (symbol, yfinance interval) whose last download in this process failed
+_fetch_failed: set[tuple[str, str]] = set()
+
+
+def _update_cache(symbol: str, period: str, yf_interval: str):
+    """Download new bars from yfinance into the cache if they are due.
+
+    Only one worker/thread downloads a given symbol and interval at a time;
+    the others wait for it and then read its bars from the cache. If the
+    download fails but bars are already cached (e.g. Yahoo is throttling
+    us and the upstream circuit is open), the error is logged and the
+    stale cache is served instead. In offline mode nothing is downloaded.
+    """
+    if offline.is_offline():
+        return
+    due = db.should_fetch(symbol, yf_interval)
+    metrics.cache_lookup("price_data", hit=not due)
+    if not due:
+        return
+
+    def _refresh():
+        if not db.should_fetch(symbol, yf_interval):
+            return  # Another worker refreshed it while we were getting the lease
+        try:
+            new_df = yahoo.history(symbol, period, yf_interval)
+        except Exception as e:
+            if not db.has_data(symbol, yf_interval):
+                raise
+            print(f"[OpenFinCh] Serving cached {symbol} {yf_interval} bars: {e}")
+            _fetch_failed.add((symbol, yf_interval))
+            return
+        _fetch_failed.discard((symbol, yf_interval))
+        if not new_df.empty:
+            db.save_data(symbol, yf_interval, new_df)
+
+    coordination.run_once(f"history:{symbol}:{yf_interval}", _refresh)
+
+
+def freshness(symbol: str, yf_intervals) -> dict:
+    """Staleness indicator for a symbol's cached bars at some yfinance intervals.
+
+    ``stale`` is true in offline mode, when the last download of any of
+    them failed, or when one is overdue for a refresh; ``asOf`` is the
+    oldest time one of them was fetched.
+    """
+    times = db.get_fetch_times(symbol)
+    fetched = {i: times[i] for i in yf_intervals if i in times}
+    stale = offline.is_offline() or any((symbol, i) in _fetch_failed for i in yf_intervals)
+    if not fetched:
+        return {"stale": stale, "asOf": None}
+    return {
+        "stale": stale or any(db.is_due(i, ts) for i, ts in fetched.items()),
+        "asOf": min(fetched.values()).isoformat(timespec="seconds"),
+    }
+
+
+def fetch_interval(symbol: str, interval_key: str) -> "pd.DataFrame":
     """Fetch OHLCV data for a single interval from cache, fetching new data if needed."""
     cfg = INTERVALS[interval_key]
     yf_interval = cfg["yf_interval"]
 
-    # 1. Check if we should fetch from yfinance
-    if db.should_fetch(symbol, yf_interval):
-        ticker = yf.Ticker(symbol)
-        new_df = ticker.history(period=cfg["period"], interval=yf_interval)
-        if not new_df.empty:
-            db.save_data(symbol, yf_interval, new_df)
+    # 1. Fetch from yfinance if the cache is due for an update
+    _update_cache(symbol, cfg["period"], yf_interval)
 
     # 2. Always load the full historical dataset from cache
     cached_df = db.get_cached_data(symbol, yf_interval)
@@ -170,18 +225,13 @@ def fetch_interval(symbol: str, interval_key: str) -> pd.DataFrame:
     df = cached_df
 
     if cfg.get("resample_rule"):
-        df = df.resample(cfg["resample_rule"]).agg({
-            "Open": "first",
-            "High": "max",
-            "Low": "min",
-            "Close": "last",
-            "Volume": "sum",
-        }).dropna()
+        df = _resample(df, cfg["resample_rule"])
 
     return df
 
 
-def _resample(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+@metrics.stage("resample")
+def _resample(df: "pd.DataFrame", rule: str) -> "pd.DataFrame":
     """Resample OHLCV DataFrame to a coarser interval."""
     return df.resample(rule).agg({
         "Open": "first",
@@ -192,10 +242,12 @@ def _resample(df: pd.DataFrame, rule: str) -> pd.DataFrame:
     }).dropna()
 
 
-def prepare_chart_data(df: pd.DataFrame, intraday: bool) -> dict:
+@metrics.stage("prepare")
+def prepare_chart_data(df: "pd.DataFrame", intraday: bool) -> dict:
     """Convert a DataFrame to chart-ready candle and volume lists."""
     if intraday:
-        times = (df.index.astype("int64") // 10**9).tolist()
+        # The index unit varies (ns from yfinance, us from the cache with pandas 3)
+        times = df.index.as_unit("s").asi8.tolist()
     else:
         times = df.index.strftime("%Y-%m-%d").tolist()
 
@@ -238,11 +290,7 @@ def fetch_all_intervals(symbol: str) -> dict:
                 break
 
         # Fetch from yfinance if needed (only once per yf_interval)
-        if db.should_fetch(symbol, yf_interval):
-            ticker = yf.Ticker(symbol)
-            new_df = ticker.history(period=period, interval=yf_interval)
-            if not new_df.empty:
-                db.save_data(symbol, yf_interval, new_df)
+        _update_cache(symbol, period, yf_interval)
 
         # Single cache read for this yf_interval
         cached_df = db.get_cached_data(symbol, yf_interval)
@@ -267,7 +315,7 @@ def fetch_all_intervals(symbol: str) -> dict:
     # Run each yf_interval group in parallel
     with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
         futures = {
-            executor.submit(_fetch_group, yf_int, members): yf_int
+            executor.submit(contextvars.copy_context().run, profiling.call, _fetch_group, yf_int, members): yf_int
             for yf_int, members in yf_groups.items()
         }
         for future in concurrent.futures.as_completed(futures):
@@ -299,6 +347,30 @@ def fetch_custom_interval(symbol: str, value: int, unit: str) -> dict:
     """Fetch data for a custom interval specified by value + unit.
 
     Returns chart-ready dict with candles, volume, intraday fields.
+    Raises ValueError if the unit is invalid or value < 1.
+    """
+    yf_interval, period = custom_source(value, unit)
+    freq_suffix, intraday, _ = _UNIT_CONFIG[unit]
+    resample_rule = f"{value}{freq_suffix}"
+
+    _update_cache(symbol, period, yf_interval)
+    df = db.get_cached_data(symbol, yf_interval)
+
+    if df.empty:
+        return {"candles": [], "volume": [], "intraday": intraday}
+
+    # Resample (always, since it's a custom interval)
+    df = _resample(df, resample_rule)
+
+    if df.empty:
+        return {"candles": [], "volume": [], "intraday": intraday}
+
+    return prepare_chart_data(df, intraday)
+
+
+def custom_source(value: int, unit: str) -> tuple[str, str]:
+    """Return the (yf_interval, period) a custom interval is resampled from.
+
     Raises ValueError if the unit is invalid or value < 1.
     """
     if value < 1:
@@ -306,8 +378,7 @@ def fetch_custom_interval(symbol: str, value: int, unit: str) -> dict:
     if unit not in _UNIT_CONFIG:
         raise ValueError(f"Invalid unit '{unit}'. Must be one of: {', '.join(_UNIT_CONFIG.keys())}")
 
-    freq_suffix, intraday, sources = _UNIT_CONFIG[unit]
-    resample_rule = f"{value}{freq_suffix}"
+    sources = _UNIT_CONFIG[unit][2]
 
     # Pick the best (smallest) source interval whose period covers enough data
     # For minutes, we want the smallest source that divides evenly if possible
@@ -329,28 +400,5 @@ def fetch_custom_interval(symbol: str, value: int, unit: str) -> dict:
             yf_interval = "1m"
             period = "7d"
 
-    if db.should_fetch(symbol, yf_interval):
-        ticker = yf.Ticker(symbol)
-        new_df = ticker.history(period=period, interval=yf_interval)
-        if not new_df.empty:
-            db.save_data(symbol, yf_interval, new_df)
-            
-    df = db.get_cached_data(symbol, yf_interval)
-
-    if df.empty:
-        return {"candles": [], "volume": [], "intraday": intraday}
-
-    # Resample (always, since it's a custom interval)
-    df = df.resample(resample_rule).agg({
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum",
-    }).dropna()
-
-    if df.empty:
-        return {"candles": [], "volume": [], "intraday": intraday}
-
-    return prepare_chart_data(df, intraday)
+    return yf_interval, period
 
@@ -1,15 +1,58 @@
 import sqlite3
-import pandas as pd
 import datetime
 import os
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from openfinch import metrics
+
+if TYPE_CHECKING:  # imported lazily in get_cached_data to keep startup fast
+    import pandas as pd
 
 # Database path at the root of the project
 DB_PATH = Path(os.path.abspath(__file__)).parent.parent.parent / "openfinch_cache.db"
 
+# Seconds a connection waits on another worker's write lock before failing
+BUSY_TIMEOUT = 30.0
+
+# Bump when the tables below change. The database records the version it
+# was created with (PRAGMA user_version), so the DDL only runs on a new or
+# outdated file instead of on every start.
+SCHEMA_VERSION = 3
+
+_schema_checked = False
+_schema_lock = threading.Lock()
+
+def _open() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def connect() -> sqlite3.Connection:
+    """Open a connection to the cache database.
+
+    The database is in WAL mode (set by init_db), so readers never block
+    the writer; concurrent writers from other workers wait up to
+    BUSY_TIMEOUT for the lock instead of failing with "database is locked".
+    The first connection in a process makes sure the schema is current.
+    """
+    global _schema_checked
+    conn = _open()
+    if not _schema_checked:
+        with _schema_lock:
+            if not _schema_checked:
+                if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                    init_db()
+                _schema_checked = True
+    return conn
+
 def init_db():
     """Initializes the SQLite database with necessary tables."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _open()
+    # WAL is persistent: it is recorded in the database file
+    conn.execute("PRAGMA journal_mode=WAL")
     cursor = conn.cursor()
     
     # Metadata table to store last fetched timestamps
@@ -37,7 +80,61 @@ def init_db():
             PRIMARY KEY (symbol, interval, timestamp)
         )
     """)
-    
+
+    # Cross-worker coordination (see openfinch.coordination)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS generations (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires REAL NOT NULL
+        )
+    """)
+
+    # Runtime settings shared by all workers (e.g. offline mode)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+    # Last good JSON response per key, served when upstream is unreachable
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """)
+
+    # SEC 13F lookups (see openfinch.edgar): symbol -> CUSIP prefix, and
+    # holder lists per quarter, valid for the set of stored quarters they
+    # were computed against
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cusips (
+            symbol TEXT PRIMARY KEY,
+            cusip6 TEXT NOT NULL,
+            resolved_at REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS holder_results (
+            quarter TEXT NOT NULL,
+            cusip6 TEXT NOT NULL,
+            periods TEXT NOT NULL,
+            value TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            PRIMARY KEY (quarter, cusip6)
+        )
+    """)
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
@@ -47,7 +144,7 @@ def should_fetch(symbol: str, interval: str) -> bool:
     Intraday intervals re-fetch after 15 minutes to accumulate history.
     Daily+ intervals are cached permanently.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("SELECT last_fetched FROM metadata WHERE symbol=? AND interval=?", (symbol, interval))
     row = cursor.fetchone()
@@ -55,22 +152,44 @@ def should_fetch(symbol: str, interval: str) -> bool:
 
     if not row:
         return True
+    return is_due(interval, _parse_fetched(row[0]))
+
+def _parse_fetched(value: str) -> datetime.datetime:
+    ts = datetime.datetime.fromisoformat(value)
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=datetime.timezone.utc)
 
+def is_due(interval: str, last_fetched: datetime.datetime) -> bool:
+    """Whether bars fetched at ``last_fetched`` should be refreshed (see should_fetch)."""
     # Daily and above: permanent cache
     is_intraday = interval.endswith("m") or interval.endswith("h")
     if not is_intraday:
         return False
 
     # Intraday: re-fetch after 15 minutes to accumulate new candles
-    last_fetched = datetime.datetime.fromisoformat(row[0])
     now = datetime.datetime.now(datetime.timezone.utc)
-    if last_fetched.tzinfo is None:
-        last_fetched = last_fetched.replace(tzinfo=datetime.timezone.utc)
     return (now - last_fetched).total_seconds() > 15 * 60
 
+def get_fetch_times(symbol: str) -> dict[str, datetime.datetime]:
+    """Return the last_fetched time (UTC) of every interval cached for a symbol."""
+    conn = connect()
+    try:
+        rows = conn.execute("SELECT interval, last_fetched FROM metadata WHERE symbol=?", (symbol,)).fetchall()
+    finally:
+        conn.close()
+    return {interval: _parse_fetched(last_fetched) for interval, last_fetched in rows}
+
+def has_data(symbol: str, interval: str) -> bool:
+    """Return True if any bars are cached for a symbol and interval."""
+    conn = connect()
+    row = conn.execute(
+        "SELECT 1 FROM price_data WHERE symbol=? AND interval=? LIMIT 1", (symbol, interval)
+    ).fetchone()
+    conn.close()
+    return row is not None
+
 def update_metadata(symbol: str, interval: str):
     """Update the last_fetched timestamp for a symbol and interval."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
     cursor.execute("""
@@ -80,10 +199,15 @@ def update_metadata(symbol: str, interval: str):
     conn.commit()
     conn.close()
 
-def save_data(symbol: str, interval: str, df: pd.DataFrame):
+@metrics.stage("db_write")
+def save_data(symbol: str, interval: str, df: "pd.DataFrame", mark_fetched: bool = True):
     """
     Save new yfinance DataFrame to the sqlite database.
     Uses INSERT OR REPLACE to update existing timestamps.
+
+    With ``mark_fetched=False`` the bars are merged in without touching
+    ``last_fetched``, so a partial download (e.g. a quote refresh) doesn't
+    make should_fetch() skip the full-history fetch.
     """
     if df.empty:
         return
@@ -110,7 +234,7 @@ def save_data(symbol: str, interval: str, df: pd.DataFrame):
     
     df_to_save = df_to_save[['symbol', 'interval', 'timestamp', 'open', 'high', 'low', 'close', 'volume']]
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     
     # Using to_sql with 'append' will fail if primary key exists. 
     # Therefore, we use a custom executemany with INSERT OR REPLACE.
@@ -127,14 +251,18 @@ def save_data(symbol: str, interval: str, df: pd.DataFrame):
     conn.close()
     
     # Update last_fetched
-    update_metadata(symbol, interval)
+    if mark_fetched:
+        update_metadata(symbol, interval)
 
-def get_cached_data(symbol: str, interval: str) -> pd.DataFrame:
+@metrics.stage("db_read")
+def get_cached_data(symbol: str, interval: str) -> "pd.DataFrame":
     """
     Retrieve all cached data from the sqlite database for a given symbol and interval.
     Returns a DataFrame with a DatetimeIndex resembling yfinance output.
     """
-    conn = sqlite3.connect(DB_PATH)
+    import pandas as pd
+
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute(
         "SELECT timestamp, open, high, low, close, volume "
@@ -154,3 +282,183 @@ def get_cached_data(symbol: str, interval: str) -> pd.DataFrame:
     df.index.name = "Date"
 
     return df
+
+# SQLite caps the number of bound parameters per statement; stay well below it
+_MAX_PARAMS = 900
+
+
+def _chunks(items: list, size: int = _MAX_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@metrics.stage("db_read")
+def get_latest_bars(symbols: list[str], interval: str, n: int = 2) -> dict[str, list[tuple]]:
+    """Return the newest ``n`` cached bars per symbol, newest first.
+
+    One query per chunk of symbols: for each symbol the primary-key index
+    finds the n-th newest timestamp, and only bars at or after it are read,
+    so the cost doesn't grow with the length of the cached history.
+    Values are (timestamp, open, high, low, close, volume) tuples.
+    """
+    out: dict[str, list[tuple]] = {}
+    conn = connect()
+    try:
+        for chunk in _chunks(list(symbols)):
+            placeholders = ",".join("(?)" for _ in chunk)
+            rows = conn.execute(
+                f"""
+                WITH wanted(symbol) AS (VALUES {placeholders})
+                SELECT p.symbol, p.timestamp, p.open, p.high, p.low, p.close, p.volume
+                FROM wanted w
+                JOIN price_data p ON p.symbol = w.symbol AND p.interval = ?
+                WHERE p.timestamp >= COALESCE((
+                    SELECT timestamp FROM price_data
+                    WHERE symbol = w.symbol AND interval = ?
+                    ORDER BY timestamp DESC LIMIT 1 OFFSET ?
+                ), '')
+                ORDER BY p.symbol, p.timestamp DESC
+                """,
+                (*chunk, interval, interval, n - 1),
+            ).fetchall()
+            for symbol, *bar in rows:
+                out.setdefault(symbol, []).append(tuple(bar))
+    finally:
+        conn.close()
+    return out
+
+
+def get_last_fetched(symbols: list[str], interval: str) -> dict[str, datetime.datetime]:
+    """Return the last_fetched time (UTC) for each symbol that has one."""
+    out = {}
+    conn = connect()
+    try:
+        for chunk in _chunks(list(symbols)):
+            placeholders = ",".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT symbol, last_fetched FROM metadata WHERE interval=? AND symbol IN ({placeholders})",
+                (interval, *chunk),
+            ).fetchall()
+            for symbol, last_fetched in rows:
+                out[symbol] = _parse_fetched(last_fetched)
+    finally:
+        conn.close()
+    return out
+
+
+@metrics.stage("db_write")
+def mark_fetched(symbols: list[str], interval: str):
+    """Set last_fetched to now for several symbols at once."""
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    conn = connect()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO metadata (symbol, interval, last_fetched) VALUES (?, ?, ?)",
+            [(symbol, interval, now) for symbol in symbols],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_setting(name: str) -> str | None:
+    conn = connect()
+    try:
+        row = conn.execute("SELECT value FROM settings WHERE name=?", (name,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def set_setting(name: str, value: str):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)", (name, value))
+    finally:
+        conn.close()
+
+
+@metrics.stage("db_read")
+def get_response(key: str) -> tuple[str, float] | None:
+    """Return the stored (JSON text, fetched_at epoch seconds) for a key, if any."""
+    conn = connect()
+    try:
+        return conn.execute("SELECT value, fetched_at FROM responses WHERE key=?", (key,)).fetchone()
+    finally:
+        conn.close()
+
+
+@metrics.stage("db_write")
+def put_response(key: str, value: str, fetched_at: float):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, fetched_at) VALUES (?, ?, ?)",
+                (key, value, fetched_at),
+            )
+    finally:
+        conn.close()
+
+
+@metrics.stage("db_read")
+def get_cusip(symbol: str, max_age: float) -> str | None:
+    """Stored CUSIP prefix for a symbol, if resolved less than ``max_age`` seconds ago."""
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT cusip6 FROM cusips WHERE symbol=? AND resolved_at >= ?",
+            (symbol, time.time() - max_age),
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+@metrics.stage("db_write")
+def put_cusip(symbol: str, cusip6: str):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cusips (symbol, cusip6, resolved_at) VALUES (?, ?, ?)",
+                (symbol, cusip6, time.time()),
+            )
+    finally:
+        conn.close()
+
+
+@metrics.stage("db_read")
+def get_holder_result(quarter: str, cusip6: str, periods: str) -> str | None:
+    """Stored JSON holder result, if it was computed against the same stored ``periods``."""
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT value FROM holder_results WHERE quarter=? AND cusip6=? AND periods=?",
+            (quarter, cusip6, periods),
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+@metrics.stage("db_write")
+def put_holder_result(quarter: str, cusip6: str, periods: str, value: str, keep: int):
+    """Store a holder result, dropping other quarters' and all but the newest ``keep`` rows."""
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO holder_results (quarter, cusip6, periods, value, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (quarter, cusip6, periods, value, time.time()),
+            )
+            conn.execute("DELETE FROM holder_results WHERE quarter != ?", (quarter,))
+            conn.execute(
+                "DELETE FROM holder_results WHERE rowid NOT IN "
+                "(SELECT rowid FROM holder_results ORDER BY stored_at DESC LIMIT ?)",
+                (keep,),
+            )
+    finally:
+        conn.close()
@@ -0,0 +1,249 @@
+"""Per-request stage timing, Server-Timing headers and Prometheus metrics.
+
+Code on the request path wraps its work in ``stage(name)`` (a context
+manager that also works as a function decorator); the standard
+stages are ``upstream`` (network calls), ``db_read``, ``db_write``,
+``resample``, ``prepare`` (chart-data preparation), ``serialize``
+(DataFrame conversion and JSON rendering) and ``compress``. Durations
+are collected in a per-request ``Timings`` object held in a context
+variable, so they also add up across threads that run with a copy of the
+request's context (see ``fanout``). Stages that ran in parallel threads
+are summed, so together they can exceed the request's total time.
+
+``MetricsMiddleware`` creates the ``Timings`` for each request, sends
+them back in a ``Server-Timing`` header and folds them into process-wide
+histograms, which ``render()`` serves in Prometheus text format together
+with cache hit rates and upstream call counts per endpoint. With several
+workers each process reports its own numbers.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from openfinch import cache
+
+# Seconds; roughly log-spaced from 1 ms to 30 s
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BACKGROUND = "background"   # Endpoint label for work done outside a request
+
+
+class Timings:
+    """Stage durations and upstream calls for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.upstream: dict[str, int] = {}   # host -> calls
+        self.lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self.lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def upstream_call(self, host: str):
+        with self.lock:
+            self.upstream[host] = self.upstream.get(host, 0) + 1
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header (durations in ms)."""
+        with self.lock:
+            parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Timings | None] = contextvars.ContextVar("openfinch_timings", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label tuple, in Prometheus style."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            labels = _labels(self.labels, label_values)
+            for bound, n in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple, n: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + n
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value:g}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+REQUEST_SECONDS = Histogram(
+    "openfinch_request_duration_seconds", "Request latency by endpoint.", ("endpoint", "method", "status"))
+STAGE_SECONDS = Histogram(
+    "openfinch_stage_duration_seconds", "Time per request spent in each stage.", ("endpoint", "stage"))
+UPSTREAM_CALLS = Counter(
+    "openfinch_upstream_requests_total", "Upstream HTTP requests by endpoint and host.", ("endpoint", "host"))
+CACHE_LOOKUPS = Counter(
+    "openfinch_cache_lookups_total", "Lookups in persistent caches by result.", ("cache", "result"))
+
+
+def current() -> Timings | None:
+    """The running request's timings, if any."""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as part of stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+        else:
+            STAGE_SECONDS.observe((BACKGROUND, name), elapsed)
+
+
+def upstream_call(host: str):
+    """Count one upstream request against the running request (or background)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.upstream_call(host)
+    else:
+        UPSTREAM_CALLS.inc((BACKGROUND, host))
+
+
+def cache_lookup(name: str, hit: bool):
+    """Record a hit or miss for a cache that isn't an in-memory ``LRUCache``."""
+    CACHE_LOOKUPS.inc((name, "hit" if hit else "miss"))
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times each request and adds a Server-Timing header.
+
+    It should be the outermost middleware so the header includes the time
+    spent in the others (e.g. compression), which finish before the
+    response start message reaches it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = _current.set(timings)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            endpoint = _route_label(scope)
+            REQUEST_SECONDS.observe(
+                (endpoint, scope.get("method", ""), str(status)), time.perf_counter() - timings.started)
+            with timings.lock:
+                stages = dict(timings.stages)
+                upstream = dict(timings.upstream)
+            for name, seconds in stages.items():
+                STAGE_SECONDS.observe((endpoint, name), seconds)
+            for host, n in upstream.items():
+                UPSTREAM_CALLS.inc((endpoint, host), n)
+
+
+def _cache_lines() -> list[str]:
+    names = ("cache",)
+    lines = [
+        "# HELP openfinch_cache_hit_ratio Hit ratio of in-memory caches.",
+        "# TYPE openfinch_cache_hit_ratio gauge",
+    ]
+    entries = []
+    for name, c in sorted(cache.registry().items()):
+        stats = c.stats()
+        entries.append((name, stats))
+        if stats["hitRate"] is not None:
+            lines.append(f"openfinch_cache_hit_ratio{{{_labels(names, (name,))}}} {stats['hitRate']}")
+    for metric, key, kind in (
+        ("openfinch_cache_hits_total", "hits", "counter"),
+        ("openfinch_cache_misses_total", "misses", "counter"),
+        ("openfinch_cache_entries", "size", "gauge"),
+    ):
+        lines.append(f"# HELP {metric} In-memory cache {key}.")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, stats in entries:
+            lines.append(f"{metric}{{{_labels(names, (name,))}}} {stats[key]}")
+    return lines
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in (REQUEST_SECONDS, STAGE_SECONDS, UPSTREAM_CALLS, CACHE_LOOKUPS):
+        lines.extend(metric.render())
+    lines.extend(_cache_lines())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+"""Google News RSS fetching and per-symbol caching.
+
+The feed for a symbol is downloaded and parsed once, kept sorted by
+publication date in memory, and refreshed with a conditional request
+(ETag / Last-Modified) once its TTL has expired. Pages for "load more"
+are sliced from the cached list without touching the network.
+
+Every refreshed feed is also stored in the cache database, so after a
+restart it can still be served when Google News is unreachable or the
+app is in offline mode; such pages are marked ``stale``.
+"""
+
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen, Request
+
+from openfinch import metrics, offline, upstream
+from openfinch.cache import LRUCache
+from openfinch.intervals import db
+
+NEWS_TTL = 300           # Seconds before a feed is revalidated upstream
+PAGE_SIZE = 15
+MAX_ARTICLES = 500       # Per-symbol cap so merged feeds can't grow forever
+MAX_FEEDS = 256          # Symbols kept in memory; evicted feeds reload from the database
+
+
+class _Feed:
+    """Parsed, date-sorted articles for one symbol plus HTTP validators."""
+
+    def __init__(self):
+        self.entries: list[tuple[float, dict]] = []  # (sort key, article), newest first
+        self.urls: set[str] = set()
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.fetched_at = 0.0
+        self.stale = False   # The last refresh failed; cleared by the next one that succeeds
+        self.lock = threading.Lock()
+
+
+_feeds = LRUCache(MAX_FEEDS, name="news.feeds")
+_feeds_lock = threading.Lock()
+
+
+def _feed_url(symbol: str) -> str:
+    return (
+        f"https://news.google.com/rss/search"
+        f'?q="{quote(symbol)}"+stock+market&hl=en&gl=US&ceid=US:en'
+    )
+
+
+def _sort_key(pub: str) -> float:
+    """Seconds since the epoch for an RFC 822 date, 0.0 if it can't be parsed."""
+    try:
+        return parsedate_to_datetime(pub).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _parse_items(xml_data: bytes) -> list[tuple[float, dict]]:
+    """Parse RSS XML into (sort key, article) pairs."""
+    root = ET.fromstring(xml_data)
+    entries = []
+    for item in root.findall(".//item"):
+        pub = item.findtext("pubDate") or ""
+        source_el = item.find("source")
+        entries.append((_sort_key(pub), {
+            "title": (item.findtext("title") or "").strip(),
+            "summary": "",
+            "pubDate": pub,
+            "url": (item.findtext("link") or "").strip(),
+            "source": source_el.text if source_el is not None and source_el.text else "",
+            "thumbnail": "",
+        }))
+    return entries
+
+
+def _refresh(feed: _Feed, symbol: str) -> None:
+    """Revalidate a feed upstream and merge any new articles into it."""
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if feed.etag:
+        headers["If-None-Match"] = feed.etag
+    if feed.last_modified:
+        headers["If-Modified-Since"] = feed.last_modified
+
+    url = _feed_url(symbol)
+
+    def _fetch():
+        with urlopen(Request(upstream.resolve(url), headers=headers), timeout=5) as resp:
+            return resp.read(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+    try:
+        xml_data, etag, last_modified = upstream.call(url, _fetch)
+    except HTTPError as e:
+        if e.code == 304:
+            feed.fetched_at = time.time()
+            feed.stale = False
+            return
+        raise
+
+    merged = list(feed.entries)
+    for key, article in _parse_items(xml_data):
+        url = article["url"]
+        if url and url in feed.urls:
+            continue
+        if url:
+            feed.urls.add(url)
+        merged.append((key, article))
+
+    merged.sort(key=lambda e: e[0], reverse=True)
+    if len(merged) > MAX_ARTICLES:
+        for _, article in merged[MAX_ARTICLES:]:
+            feed.urls.discard(article["url"])
+        merged = merged[:MAX_ARTICLES]
+
+    feed.entries = merged
+    feed.etag = etag
+    feed.last_modified = last_modified
+    feed.fetched_at = time.time()
+    feed.stale = False
+    db.put_response(_store_key(symbol), json.dumps(merged), feed.fetched_at)
+
+
+def _store_key(symbol: str) -> str:
+    return f"news:{symbol}"
+
+
+def _restore(feed: _Feed, symbol: str) -> bool:
+    """Load the stored copy of a feed into an empty one; False if there is none."""
+    stored = db.get_response(_store_key(symbol))
+    if stored is None:
+        return False
+    text, fetched_at = stored
+    feed.entries = [(key, article) for key, article in json.loads(text)]
+    feed.urls = {article["url"] for _, article in feed.entries if article["url"]}
+    feed.fetched_at = fetched_at
+    return True
+
+
+def _get_feed(symbol: str) -> _Feed:
+    with _feeds_lock:
+        return _feeds.get_or_create(symbol, _Feed)
+
+
+def get_news_page(symbol: str, start: int = 0, page_size: int = PAGE_SIZE) -> dict:
+    """Return one page of news for a symbol, newest first.
+
+    Only the first page (start == 0) triggers revalidation of an expired
+    feed, so offsets stay stable while the user scrolls through "load more".
+    If revalidation fails (or offline mode is on) and older articles are
+    cached, in memory or in the database, those are served with
+    ``stale: true`` and ``asOf``, on every page until a refresh succeeds.
+    """
+    symbol = symbol.upper()
+    start = max(start, 0)
+    feed = _get_feed(symbol)
+
+    with feed.lock:
+        expired = time.time() - feed.fetched_at > NEWS_TTL
+        refresh = not feed.fetched_at or (start == 0 and expired)
+        metrics.cache_lookup("news", hit=not refresh)
+        if refresh:
+            try:
+                _refresh(feed, symbol)
+            except Exception:
+                if not feed.entries and not _restore(feed, symbol):
+                    raise
+                feed.stale = True
+        entries = feed.entries
+        fetched_at = feed.fetched_at
+        stale = feed.stale
+
+    page = [article for _, article in entries[start:start + page_size]]
+    result = {"news": page, "hasMore": start + page_size < len(entries)}
+    if stale:
+        result.update(stale=True, asOf=offline.as_of(fetched_at))
+    return result
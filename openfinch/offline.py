@@ -0,0 +1,93 @@
+"""Offline (cache-only) mode.
+
+With ``--offline``, or after ``POST /api/offline``, ``upstream.call``
+refuses every request immediately instead of waiting on network
+timeouts, and endpoints answer from what is cached locally:
+
+* candles and quotes from ``price_data``, with ``stale``/``asOf`` telling
+  how old they are;
+* fundamentals (profile, analysts, financials, insiders) and 13F holders
+  from the last good response stored by ``cached()``;
+* news from the persisted feed (see ``openfinch.news``).
+
+The switch lives in the shared cache database, so it applies to every
+worker; each process re-reads it at most once per ``CHECK_INTERVAL``.
+"""
+
+import datetime
+import json
+import threading
+import time
+from typing import Callable
+
+from openfinch.intervals import db
+
+SETTING = "offline"
+CHECK_INTERVAL = 1.0   # Seconds a process trusts its copy of the switch
+
+
+class NotCached(LookupError):
+    """Raised in offline mode when nothing is cached for a request."""
+
+
+_state = {"offline": False, "checked": 0.0}
+_lock = threading.Lock()
+
+
+def is_offline() -> bool:
+    now = time.monotonic()
+    if now - _state["checked"] >= CHECK_INTERVAL:
+        with _lock:
+            if now - _state["checked"] >= CHECK_INTERVAL:
+                _state["offline"] = db.get_setting(SETTING) == "1"
+                _state["checked"] = now
+    return _state["offline"]
+
+
+def set_offline(offline: bool):
+    """Turn offline mode on or off for every worker."""
+    db.set_setting(SETTING, "1" if offline else "0")
+    with _lock:
+        _state["offline"] = offline
+        _state["checked"] = time.monotonic()
+    print(f"[OpenFinCh] Offline mode {'on' if offline else 'off'}")
+
+
+def as_of(epoch: float) -> str:
+    """ISO 8601 UTC time for a staleness indicator."""
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def _has_data(value: dict) -> bool:
+    # Composite endpoints turn failed sections into empty defaults; a
+    # response where every section came back empty isn't worth keeping
+    return any(v for v in value.values() if not isinstance(v, str))
+
+
+def cached(key: str, fetch: Callable[[], dict]) -> dict:
+    """Return ``fetch()`` and store it, or the stored copy when it can't be fetched.
+
+    The stored copy is served, with ``stale: true`` and ``asOf``, in
+    offline mode and when ``fetch`` fails to reach upstream (or returns
+    nothing but empty sections). Raises ``NotCached`` in offline mode when
+    there is no stored copy.
+    """
+    if is_offline():
+        stored = db.get_response(key)
+        if stored is None:
+            raise NotCached(f"Offline mode: nothing cached for {key}")
+    else:
+        try:
+            value = fetch()
+        except OSError:   # ConnectionError (and upstream.UpstreamUnavailable), urllib and curl_cffi errors
+            stored = db.get_response(key)
+            if stored is None:
+                raise
+        else:
+            stored = None if _has_data(value) else db.get_response(key)
+            if stored is None:
+                db.put_response(key, json.dumps(value, default=str), time.time())
+                return value
+
+    text, fetched_at = stored
+    return {**json.loads(text), "stale": True, "asOf": as_of(fetched_at)}
@@ -0,0 +1,266 @@
+"""Opt-in per-request profiling.
+
+When the server runs with ``--profile-requests``, a request carrying the
+``X-OpenFinCh-Profile: 1`` header or a ``profile=1`` query parameter runs
+under ``cProfile``: the endpoint function on its worker thread, every
+``fanout``/interval task it spawns on pool threads, and the event-loop
+side of the request (body parsing, JSON encoding and rendering). The
+result is saved as a pstats file in ``PROFILES_DIR`` next to a JSON
+sidecar with the request parameters and the top functions. Open the
+``.prof`` with ``python -m pstats``, snakeviz, or convert it to a
+flamegraph with flameprof.
+
+Since Python 3.12, cProfile runs on ``sys.monitoring`` and sees every
+thread, but only one profiler may be active per process; so a profiled
+request enables a single process-wide profiler, and profiled requests
+take turns. Older versions profile per thread: the endpoint and each
+task it spawns get their own profiler (see ``call``), merged at the end.
+
+The profile also sees other requests served concurrently, so profile on
+an otherwise idle server for clean numbers.
+"""
+
+import contextvars
+import cProfile
+import datetime
+import functools
+import inspect
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import anyio
+from fastapi.routing import APIRoute
+
+PROFILES_DIR = Path.home() / ".openfinch" / "profiles"
+ENV_FLAG = "OPENFINCH_PROFILE_REQUESTS"   # Environment, so uvicorn workers inherit it
+TRIGGER_HEADER = b"x-openfinch-profile"
+TRIGGER_PARAM = "profile"
+MAX_PROFILES = 200        # Oldest profiles are deleted beyond this
+TOP_FUNCTIONS = 20        # Functions listed in each sidecar
+NAME_RE = re.compile(r"^[\w.-]+\.(prof|json)$")
+PROCESS_WIDE = sys.version_info >= (3, 12)   # cProfile on sys.monitoring: one profiler, all threads
+
+
+class _Capture:
+    """The profiles collected from all threads working on one request."""
+
+    def __init__(self):
+        self.profiles: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile):
+        with self.lock:
+            self.profiles.append(profile)
+
+
+_active: contextvars.ContextVar[_Capture | None] = contextvars.ContextVar("openfinch_profile", default=None)
+_local = threading.local()   # .profiling: a profiler is already running on this thread
+_turn: anyio.Lock | None = None   # Serializes profiled requests (PROCESS_WIDE)
+
+
+def enable():
+    """Allow requests to ask for profiling (for this process and its workers)."""
+    os.environ[ENV_FLAG] = "1"
+
+
+def is_enabled() -> bool:
+    return os.environ.get(ENV_FLAG) == "1"
+
+
+def call(fn, *args, **kwargs):
+    """Run ``fn``, under its own profiler if the current request is being profiled.
+
+    Only before Python 3.12, where a profiler sees just its own thread;
+    otherwise the request's process-wide profiler already covers ``fn``.
+    """
+    capture = _active.get()
+    if PROCESS_WIDE or capture is None or getattr(_local, "profiling", False):
+        return fn(*args, **kwargs)
+    profile = cProfile.Profile()
+    _local.profiling = True
+    try:
+        return profile.runcall(fn, *args, **kwargs)
+    finally:
+        _local.profiling = False
+        capture.add(profile)
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that profiles sync endpoints and the request's event-loop work."""
+
+    def get_route_handler(self):
+        if PROCESS_WIDE:
+            return super().get_route_handler()
+        call_fn = self.dependant.call
+        if call_fn is not None and not inspect.iscoroutinefunction(call_fn):
+            self.dependant.call = functools.wraps(call_fn)(functools.partial(call, call_fn))
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            capture = _active.get()
+            if capture is None:
+                return await handler(request)
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return await handler(request)
+            finally:
+                profile.disable()
+                capture.add(profile)
+
+        return profiled_handler
+
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name.lower() == TRIGGER_HEADER:
+            return value.strip() not in (b"", b"0", b"false")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get(TRIGGER_PARAM, ["0"])[-1] not in ("", "0", "false")
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w]+", "-", text).strip("-")[:60] or "root"
+
+
+def _top_functions(stats: pstats.Stats) -> list[dict]:
+    rows = []
+    for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": calls,
+            "tottimeMs": round(tottime * 1000, 3),
+            "cumtimeMs": round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumtimeMs"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def _prune():
+    profiles = sorted(PROFILES_DIR.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[:-MAX_PROFILES]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".json").unlink(missing_ok=True)
+
+
+def save(capture: _Capture, name: str, meta: dict):
+    """Merge a request's thread profiles into ``<name>.prof`` plus ``<name>.json``."""
+    with capture.lock:
+        profiles = list(capture.profiles)
+    if not profiles:
+        return
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(PROFILES_DIR / f"{name}.prof")
+    meta = {**meta, "name": f"{name}.prof", "threads": len(profiles), "top": _top_functions(stats)}
+    (PROFILES_DIR / f"{name}.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    _prune()
+
+
+def list_profiles() -> list[dict]:
+    """Sidecar metadata of the saved profiles, newest first."""
+    if not PROFILES_DIR.exists():
+        return []
+    out = []
+    for path in sorted(PROFILES_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta.pop("top", None)
+        out.append(meta)
+    return out
+
+
+def profile_path(name: str) -> Path | None:
+    """Path of a saved profile file, or None if the name is invalid or unknown."""
+    if not NAME_RE.match(name):
+        return None
+    path = PROFILES_DIR / name
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it, when profiling is enabled.
+
+    The request body is buffered so it can be stored with the profile
+    (endpoint parameters are sent as JSON bodies).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _turn
+        if scope["type"] != "http" or not is_enabled() or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        created = datetime.datetime.now()
+        name = f"{created:%Y%m%d-%H%M%S-%f}-{_slug(scope['path'])}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-openfinch-profile-id", f"{name}.prof".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if _turn is None:
+            _turn = anyio.Lock()
+        capture = _Capture()
+        async with _turn:
+            token = _active.set(capture)
+            started = time.perf_counter()
+            profile = cProfile.Profile() if PROCESS_WIDE else None
+            if profile is not None:
+                profile.enable()
+            try:
+                await self.app(scope, replay, send_wrapper)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    capture.add(profile)
+                _active.reset(token)
+                try:
+                    parsed = json.loads(body) if body else None
+                except ValueError:
+                    parsed = body.decode("utf-8", errors="replace")
+                save(capture, name, {
+                    "method": scope.get("method", ""),
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "body": parsed,
+                    "status": status,
+                    "durationMs": round((time.perf_counter() - started) * 1000, 1),
+                    "createdAt": created.isoformat(timespec="seconds"),
+                })
@@ -0,0 +1,140 @@
+"""Multi-symbol quote snapshots for watchlists.
+
+A quote is derived from the newest bars already cached in ``price_data``
+(daily bars, overridden by a 1-minute bar fetched more recently), so
+a warm watchlist is answered with a handful of indexed queries regardless
+of its size. Symbols whose quote is older than ``QUOTE_TTL`` are refreshed
+first with batched ``yf.download`` calls rather than one request each
+(except in offline mode).
+"""
+
+import datetime
+
+from openfinch import offline, yahoo
+from openfinch.intervals import db
+
+QUOTE_TTL = 60           # Seconds before a symbol's quote is refreshed upstream
+MAX_SYMBOLS = 500
+REFRESH_CHUNK = 100      # Symbols per batched upstream download
+REFRESH_PERIOD = "5d"    # Enough daily bars to always include the previous close
+QUOTE_KEY = "quote"      # metadata "interval" that records quote refresh times
+DAILY_INTERVAL = "1d"
+INTRADAY_INTERVAL = "1m"
+
+
+def parse_symbols(raw: str) -> list[str]:
+    """Split a comma/space separated symbol list into unique upper-case symbols."""
+    seen = {}
+    for part in raw.replace(" ", ",").split(","):
+        symbol = part.strip().upper()
+        if symbol:
+            seen[symbol] = None
+    return list(seen)
+
+
+def stale_symbols(symbols: list[str]) -> list[str]:
+    """Symbols whose quote hasn't been refreshed within ``QUOTE_TTL``."""
+    last = db.get_last_fetched(symbols, QUOTE_KEY)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [s for s in symbols if s not in last or (now - last[s]).total_seconds() > QUOTE_TTL]
+
+
+def refresh(symbols: list[str]):
+    """Fetch recent daily bars for many symbols in chunked batch downloads.
+
+    Bars are merged into the daily cache without marking the daily
+    interval as fetched, so a later chart load still gets full history.
+    A chunk that fails is left stale and retried on the next request.
+    """
+    for i in range(0, len(symbols), REFRESH_CHUNK):
+        chunk = symbols[i:i + REFRESH_CHUNK]
+        try:
+            frames = yahoo.download(chunk, REFRESH_PERIOD, DAILY_INTERVAL)
+        except Exception as e:
+            print(f"[OpenFinCh] Quote refresh failed for {len(chunk)} symbols: {e}")
+            continue
+        for symbol, df in frames.items():
+            if df.index.tz is None:
+                # Naive midnights would be stored at 00:00 UTC, beside the
+                # exchange-midnight bars history() saved: two bars per day
+                print(f"[OpenFinCh] Quote refresh skipped {symbol}: bars have no timezone")
+                continue
+            db.save_data(symbol, DAILY_INTERVAL, df, mark_fetched=False)
+        # Unknown symbols are marked too, so they aren't re-requested every call
+        db.mark_fetched(chunk, QUOTE_KEY)
+
+
+def _quote(symbol: str, daily: list[tuple], intraday: list[tuple],
+           daily_fetched: datetime.datetime | None = None,
+           intraday_fetched: datetime.datetime | None = None) -> dict | None:
+    """Build a quote from the newest bars (newest first) of each interval.
+
+    A daily bar is stamped with its session's date, so a minute bar from
+    the same session always looks newer. It only overrides the daily bar
+    if it was fetched no earlier than the daily bars were: a daily row
+    refreshed after the close is fresher than a minute bar cached at 15:20.
+    """
+    if not daily and not intraday:
+        return None
+
+    ts, price, volume, previous_close = None, None, None, None
+    if daily:
+        ts, price, volume = daily[0][0], daily[0][4], daily[0][5]
+        if len(daily) > 1:
+            previous_close = daily[1][4]
+
+    if intraday and (ts is None or intraday[0][0] > ts):
+        if ts is None:
+            ts, price = intraday[0][0], intraday[0][4]
+        elif intraday[0][0][:10] > ts[:10]:
+            # The minute bar is from a session the daily cache doesn't have yet
+            previous_close, volume = price, None
+            ts, price = intraday[0][0], intraday[0][4]
+        elif daily_fetched is None or (intraday_fetched is not None and intraday_fetched >= daily_fetched):
+            ts, price = intraday[0][0], intraday[0][4]
+
+    change = change_percent = None
+    if price is not None and previous_close:
+        change = price - previous_close
+        change_percent = change / previous_close * 100
+
+    return {
+        "symbol": symbol,
+        "price": price,
+        "previousClose": previous_close,
+        "change": change,
+        "changePercent": change_percent,
+        "volume": volume,
+        "time": datetime.datetime.fromisoformat(ts).isoformat(),
+    }
+
+
+def get_quotes(symbols: list[str], refresh_stale: bool = True) -> dict:
+    """Return quote snapshots for ``symbols``, in request order.
+
+    Symbols with no cached bars (even after a refresh) are listed under
+    ``missing``, and those whose quote couldn't be refreshed (offline
+    mode, or a failed download) under ``stale``.
+    """
+    stale = stale_symbols(symbols)
+    if stale and refresh_stale and not offline.is_offline():
+        refresh(stale)
+        stale = stale_symbols(stale)
+
+    daily = db.get_latest_bars(symbols, DAILY_INTERVAL, n=2)
+    intraday = db.get_latest_bars(symbols, INTRADAY_INTERVAL, n=1)
+    # Daily bars are written both by chart loads and by quote refreshes
+    daily_fetched = db.get_last_fetched(symbols, DAILY_INTERVAL)
+    for symbol, fetched in db.get_last_fetched(symbols, QUOTE_KEY).items():
+        daily_fetched[symbol] = max(fetched, daily_fetched.get(symbol, fetched))
+    intraday_fetched = db.get_last_fetched(list(intraday), INTRADAY_INTERVAL)
+
+    quotes, missing = [], []
+    for symbol in symbols:
+        quote = _quote(symbol, daily.get(symbol, []), intraday.get(symbol, []),
+                       daily_fetched.get(symbol), intraday_fetched.get(symbol))
+        if quote is None:
+            missing.append(symbol)
+        else:
+            quotes.append(quote)
+    return {"quotes": quotes, "missing": missing, "stale": [s for s in stale if s not in missing]}
@@ -0,0 +1,136 @@
+"""Vectorized DataFrame → JSON-ready conversion.
+
+yfinance hands back most fundamentals as DataFrames. Walking them with
+``iterrows()`` and checking every cell with ``math.isnan`` is the slowest
+way to serialize them; these helpers mask NaN/NaT to None, format dates
+and coerce dtypes column-at-a-time and only build Python dicts at the end.
+"""
+
+import numpy as np
+import pandas as pd
+
+from openfinch import metrics
+
+# Matches str(pd.Timestamp) for tz-naive timestamps, which the UI already parses
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_datetimes(values, date_format: str | None = None) -> pd.Series:
+    """Format datetime-like values as strings, with None for NaT.
+
+    Without ``date_format``, output matches ``str(Timestamp)``: tz-aware
+    values keep their UTC offset, tz-naive ones get a full time component.
+    """
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, errors="coerce")
+    if date_format:
+        out = values.dt.strftime(date_format)
+    elif values.dt.tz is not None:
+        out = values.astype(str)
+    else:
+        out = values.dt.strftime(DATETIME_FORMAT)
+    return out.astype(object).where(values.notna(), None)
+
+
+def coerce(values: pd.Series, kind: str) -> pd.Series:
+    """Coerce a column to "int", "float" or "str", as an object Series with None for missing."""
+    if kind == "str":
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return format_datetimes(values)
+        mask = values.notna()
+        return values.astype(str).astype(object).where(mask, None)
+
+    numeric = pd.to_numeric(values, errors="coerce")
+    mask = numeric.notna()
+    if kind == "int":
+        # Truncate like int() would; fill first so NaN doesn't block the cast
+        numeric = numeric.fillna(0).astype("int64")
+    elif kind != "float":
+        raise ValueError(f"Unknown kind '{kind}'")
+    out = pd.Series(numeric.to_numpy(dtype=object), index=values.index)
+    out[~mask] = None
+    return out
+
+
+def clean_column(values: pd.Series, stringify: bool = False, date_format: str | None = None) -> list:
+    """One column as a list of JSON-ready Python values, with None for NaN/NaT.
+
+    Datetime columns are formatted as strings; with ``stringify`` every
+    other column is converted with ``str`` as well.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return format_datetimes(values, date_format).tolist()
+    if stringify:
+        return coerce(values, "str").tolist()
+    out = values.to_numpy(dtype=object)
+    out[values.isna().to_numpy()] = None
+    return out.tolist()
+
+
+def records(columns: dict[str, list]) -> list[dict]:
+    """Zip equal-length column lists into row dicts."""
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def index_strings(index: pd.Index, date_format: str | None = None) -> list:
+    """Stringify an index the way ``str(label)`` would, but vectorized for datetimes."""
+    if isinstance(index, pd.DatetimeIndex):
+        return format_datetimes(index, date_format).tolist()
+    return [str(x) for x in index]
+
+
+def to_records(
+    df: pd.DataFrame | None,
+    index_label: str | None = None,
+    stringify: bool = False,
+    date_format: str | None = None,
+) -> list[dict]:
+    """Convert a DataFrame into a list of row dicts with NaN → None.
+
+    If ``index_label`` is given, each record starts with the stringified
+    index under that key.
+    """
+    if df is None or df.empty:
+        return []
+    with metrics.stage("serialize"):
+        columns = {}
+        if index_label is not None:
+            columns[index_label] = index_strings(df.index, date_format)
+        for i, col in enumerate(df.columns):
+            columns[str(col)] = clean_column(df.iloc[:, i], stringify, date_format)
+        return records(columns)
+
+
+def to_columns(df: pd.DataFrame | None, date_format: str = "%Y-%m-%d") -> dict | None:
+    """Convert a DataFrame into {column: {row label: value}} with NaN → None.
+
+    Datetime column labels (statement periods) are formatted with
+    ``date_format``; row labels are stringified.
+    """
+    if df is None or df.empty:
+        return None
+    with metrics.stage("serialize"):
+        labels = [str(i) for i in df.index]
+        out = {}
+        for i, col in enumerate(df.columns):
+            key = col.strftime(date_format) if hasattr(col, "strftime") else str(col)
+            out[key] = dict(zip(labels, clean_column(df.iloc[:, i])))
+        return out
+
+
+def text_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """A column as strings with missing values (or a missing column) as ""."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str)
+
+
+def select(conditions: list, choices: list, default="") -> np.ndarray:
+    """``np.select`` over boolean Series, returning an object array."""
+    return np.select(
+        [np.asarray(c, dtype=bool) for c in conditions],
+        choices,
+        default=default,
+    ).astype(object)
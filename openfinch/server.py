@@ -1,35 +1,57 @@
 """Local HTTP server for OpenFinCh running on FastAPI.
 
 Serves the chart page and provides a JSON API for fetching stock data.
+pandas/numpy (via ``serialize``), yfinance and uvicorn are imported where
+they are first needed, so the server can start serving the page without
+paying for them.
 """
 
-import importlib
+import concurrent.futures
+import contextlib
+import json
 import math
 import threading
 import webbrowser
-from urllib.request import urlopen, Request
 from urllib.parse import quote
-from email.utils import parsedate_to_datetime
-import xml.etree.ElementTree as ET
 
-import uvicorn
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-import yfinance as yf
-
-from openfinch.edgar import get_holders
+from openfinch import assets, metrics, offline, profiling, quotes, symbols, upstream, yahoo
+from openfinch.compression import CompressionMiddleware
+from openfinch.edgar import IngestFailed, Preparing, get_holders, get_overlap, get_portfolio, ingest_status, start_ingest
+from openfinch.fanout import gather, submit
+from openfinch.news import get_news_page
 from openfinch.intervals import (
     fetch_all_intervals, fetch_custom_interval,
-    fetch_interval, prepare_chart_data, INTERVALS,
+    fetch_interval, prepare_chart_data, INTERVALS, custom_source, freshness,
 )
-import openfinch.stock_chart as _stock_chart_mod
 
 DEFAULT_SYMBOL = "AAPL"
 PORT = 8765
 
-app = FastAPI(title="OpenFinCh API")
+class _TimedJSONResponse(JSONResponse):
+    """JSON response whose rendering counts towards the "serialize" stage."""
+
+    def render(self, content) -> bytes:
+        with metrics.stage("serialize"):
+            return super().render(content)
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    # Runs in every worker process; searches fall back to loading it themselves
+    symbols.preload()
+    yield
+
+app = FastAPI(title="OpenFinCh API", default_response_class=_TimedJSONResponse, lifespan=_lifespan)
+# Must be set before the routes below are declared
+app.router.route_class = profiling.ProfiledRoute
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+# Added last so it wraps compression and its Server-Timing header includes it
+app.add_middleware(metrics.MetricsMiddleware)
 
 class SymbolRequest(BaseModel):
     symbol: str
@@ -54,11 +76,55 @@ class FinancialsRequest(BaseModel):
 class SearchRequest(BaseModel):
     query: str
 
+class OfflineRequest(BaseModel):
+    offline: bool
+
+class ManagerRequest(BaseModel):
+    manager: str               # Accession number, CIK or manager name
+    period: str | None = None  # Period of report, e.g. "2025-09-30"
+
+class OverlapRequest(BaseModel):
+    a: str
+    b: str
+    period: str | None = None
+    limit: int = 10
+
+class BatchItem(BaseModel):
+    endpoint: str
+    body: dict = {}
+    id: str | None = None
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem]
+    stream: bool = False
+
+def _asset_response(request: Request, asset: assets.Asset, cache_control: str) -> Response:
+    """Serve an in-memory asset with ETag revalidation and precompressed bodies."""
+    body, encoding, etag = asset.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.content_type, headers=headers)
+
 @app.get("/", response_class=HTMLResponse)
-def get_chart():
-    importlib.reload(_stock_chart_mod)
-    html = _stock_chart_mod.build_chart_html(DEFAULT_SYMBOL)
-    return html
+def get_chart(request: Request):
+    bundle = assets.get_bundle(DEFAULT_SYMBOL)
+    return _asset_response(request, bundle.shell, "no-cache")
+
+@app.get("/static/{name}")
+def get_static(name: str, request: Request):
+    asset = assets.get_bundle(DEFAULT_SYMBOL).static.get(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail=f"Unknown asset '{name}'")
+    # Names carry the content hash, so a given URL never changes
+    return _asset_response(request, asset, "public, max-age=31536000, immutable")
+
+def _no_data_status() -> int:
+    # Offline, missing bars may just not have been downloaded yet
+    return 503 if offline.is_offline() else 404
 
 @app.post("/api/data")
 def api_data(req: SymbolRequest):
@@ -70,8 +136,9 @@ def api_data(req: SymbolRequest):
         datasets = fetch_all_intervals(symbol)
         has_data = any(len(ds["candles"]) > 0 for ds in datasets.values())
         if not has_data:
-            raise HTTPException(status_code=404, detail=f"No data found for '{symbol}'")
-        return {"symbol": symbol, "datasets": datasets}
+            raise HTTPException(status_code=_no_data_status(), detail=f"No data found for '{symbol}'")
+        yf_intervals = {cfg["yf_interval"] for cfg in INTERVALS.values()}
+        return {"symbol": symbol, "datasets": datasets, **freshness(symbol, yf_intervals)}
     except HTTPException:
         raise
     except Exception as e:
@@ -90,9 +157,10 @@ def api_interval(req: IntervalRequest):
         cfg = INTERVALS[interval]
         df = fetch_interval(symbol, interval)
         if df.empty:
-            raise HTTPException(status_code=404, detail=f"No data for '{symbol}' at {interval}")
+            raise HTTPException(status_code=_no_data_status(), detail=f"No data for '{symbol}' at {interval}")
         dataset = prepare_chart_data(df, cfg["intraday"])
-        return {"symbol": symbol, "interval": interval, "dataset": dataset}
+        return {"symbol": symbol, "interval": interval, "dataset": dataset,
+                **freshness(symbol, [cfg["yf_interval"]])}
     except HTTPException:
         raise
     except Exception as e:
@@ -107,8 +175,9 @@ def api_custom_interval(req: CustomIntervalRequest):
     try:
         dataset = fetch_custom_interval(symbol, req.value, req.unit.strip().lower())
         if not dataset["candles"]:
-            raise HTTPException(status_code=404, detail=f"No data for '{symbol}' at {req.value} {req.unit}")
-        return {"dataset": dataset}
+            raise HTTPException(status_code=_no_data_status(), detail=f"No data for '{symbol}' at {req.value} {req.unit}")
+        yf_interval, _ = custom_source(req.value, req.unit.strip().lower())
+        return {"dataset": dataset, **freshness(symbol, [yf_interval])}
     except HTTPException:
         raise
     except Exception as e:
@@ -119,53 +188,62 @@ def api_news(req: NewsRequest):
     symbol = req.symbol.strip().upper()
     if not symbol:
         raise HTTPException(status_code=400, detail="Missing symbol")
-    start = req.start
-    page_size = 15
 
     try:
-        rss_url = (
-            f"https://news.google.com/rss/search"
-            f'?q="{quote(symbol)}"+stock+market&hl=en&gl=US&ceid=US:en'
-        )
-        rss_req = Request(rss_url, headers={"User-Agent": "Mozilla/5.0"})
-        with urlopen(rss_req, timeout=5) as resp:
-            xml_data = resp.read()
-
-        root = ET.fromstring(xml_data)
-        items = root.findall(".//item")
-
-        articles = []
-        for item in items:
-            pub = item.findtext("pubDate") or ""
-            try:
-                dt = parsedate_to_datetime(pub)
-            except Exception:
-                dt = None
-            source_el = item.find("source")
-            articles.append({
-                "title": (item.findtext("title") or "").strip(),
-                "summary": "",
-                "pubDate": pub,
-                "url": (item.findtext("link") or "").strip(),
-                "source": source_el.text if source_el is not None and source_el.text else "",
-                "thumbnail": "",
-                "_dt": dt,
-            })
-
-        articles.sort(
-            key=lambda a: a["_dt"] or parsedate_to_datetime("1 Jan 1970 00:00:00 GMT"),
-            reverse=True,
-        )
-        for a in articles:
-            del a["_dt"]
-
-        page = articles[start:start + page_size]
-        has_more = start + page_size < len(articles)
-
-        return {"news": page, "hasMore": has_more}
+        return get_news_page(symbol, req.start)
+    except upstream.Offline as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@metrics.stage("serialize")
+def _insider_records(df) -> list[dict]:
+    """Serialize yfinance insider transactions, classifying blank transaction types."""
+    import numpy as np
+    import pandas as pd
+    from openfinch import serialize
+
+    if df is None or df.empty:
+        return []
+
+    empty = pd.Series(np.nan, index=df.index)
+    value = serialize.coerce(df.get("Value", empty), "float")
+    shares = serialize.coerce(df.get("Shares", empty), "int")
+    value_num = pd.to_numeric(df.get("Value", empty), errors="coerce")
+    shares_num = pd.to_numeric(df.get("Shares", empty), errors="coerce")
+
+    txn = serialize.text_column(df, "Transaction").str.strip()
+    text = serialize.text_column(df, "Text").str.lower()
+
+    # First matching rule wins, mirroring how the Text column is worded
+    txn = serialize.select(
+        [
+            txn != "",
+            text.str.contains("sale", regex=False),
+            text.str.contains("purchase", regex=False) | text.str.contains("buy", regex=False),
+            text.str.contains("gift", regex=False),
+            text.str.contains("exercise", regex=False),
+            (value_num > 0) & (shares_num > 0),
+            value_num.isna() | (value_num == 0),
+        ],
+        [txn, "Sale", "Purchase", "Stock Gift", "Option Exercise", "Sale", "Award"],
+    )
+
+    if "Start Date" in df.columns:
+        dates = serialize.format_datetimes(df["Start Date"]).fillna("")
+    else:
+        dates = pd.Series("", index=df.index)
+
+    return serialize.records({
+        "insider": serialize.text_column(df, "Insider").tolist(),
+        "position": serialize.text_column(df, "Position").tolist(),
+        "transaction": txn.tolist(),
+        "date": dates.tolist(),
+        "shares": shares.tolist(),
+        "value": value.tolist(),
+        "ownership": serialize.text_column(df, "Ownership").tolist(),
+    })
+
 @app.post("/api/insiders")
 def api_insiders(req: SymbolRequest):
     symbol = req.symbol.strip().upper()
@@ -173,55 +251,12 @@ def api_insiders(req: SymbolRequest):
         raise HTTPException(status_code=400, detail="Missing symbol")
 
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.insider_transactions
-        insiders = []
-        if df is not None and not df.empty:
-            for _, row in df.iterrows():
-                val = row.get("Value", None)
-                if val is not None:
-                    try:
-                        if math.isnan(val):
-                            val = None
-                    except (TypeError, ValueError):
-                        pass
-                shares = row.get("Shares", None)
-                if shares is not None:
-                    try:
-                        if math.isnan(shares):
-                            shares = None
-                        else:
-                            shares = int(shares)
-                    except (TypeError, ValueError):
-                        pass
-                start_date = row.get("Start Date", None)
-                if start_date is not None:
-                    start_date = str(start_date)
-                txn = str(row.get("Transaction", "")).strip()
-                if not txn:
-                    text = str(row.get("Text", "")).lower()
-                    if "sale" in text:
-                        txn = "Sale"
-                    elif "purchase" in text or "buy" in text:
-                        txn = "Purchase"
-                    elif "gift" in text:
-                        txn = "Stock Gift"
-                    elif "exercise" in text:
-                        txn = "Option Exercise"
-                    elif val is not None and val > 0 and shares and shares > 0:
-                        txn = "Sale"
-                    elif val is None or val == 0:
-                        txn = "Award"
-                insiders.append({
-                    "insider": str(row.get("Insider", "")),
-                    "position": str(row.get("Position", "")),
-                    "transaction": txn,
-                    "date": start_date or "",
-                    "shares": shares,
-                    "value": val,
-                    "ownership": str(row.get("Ownership", "")),
-                })
-        return {"insiders": insiders}
+        return offline.cached(
+            f"insiders:{symbol}",
+            lambda: {"insiders": _insider_records(yahoo.ticker(symbol).insider_transactions)},
+        )
+    except offline.NotCached as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -232,171 +267,142 @@ def api_profile(req: SymbolRequest):
         raise HTTPException(status_code=400, detail="Missing symbol")
 
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.get_info() or {}
-
-        summary = info.get("longBusinessSummary", "")
-
-        cal = {}
-        try:
-            cal_raw = ticker.get_calendar()
-            if cal_raw is not None:
-                if isinstance(cal_raw, dict):
-                    cal = cal_raw
-        except Exception:
-            pass
-
-        fields = [
-            "shortName", "longName", "symbol", "exchange",
-            "quoteType", "sector", "industry", "country", "city",
-            "website", "marketCap", "enterpriseValue",
-            "trailingPE", "forwardPE", "pegRatio", "priceToBook",
-            "profitMargins", "operatingMargins", "grossMargins",
-            "returnOnEquity", "returnOnAssets",
-            "revenueGrowth", "earningsGrowth",
-            "dividendYield", "dividendRate", "payoutRatio",
-            "beta", "fiftyTwoWeekHigh", "fiftyTwoWeekLow",
-            "fiftyDayAverage", "twoHundredDayAverage",
-            "averageVolume", "averageVolume10days",
-            "fullTimeEmployees", "currentPrice",
-            "targetHighPrice", "targetLowPrice",
-            "targetMeanPrice", "targetMedianPrice",
-            "recommendationKey",
-        ]
-        profile = {}
-        for f in fields:
-            v = info.get(f)
-            if v is not None:
+        return offline.cached(f"profile:{symbol}", lambda: _profile(symbol))
+    except offline.NotCached as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _profile(symbol: str) -> dict:
+    ticker = yahoo.ticker(symbol)
+    info = ticker.get_info() or {}
+
+    summary = info.get("longBusinessSummary", "")
+
+    cal = {}
+    try:
+        cal_raw = ticker.get_calendar()
+        if cal_raw is not None:
+            if isinstance(cal_raw, dict):
+                cal = cal_raw
+    except Exception:
+        pass
+
+    fields = [
+        "shortName", "longName", "symbol", "exchange",
+        "quoteType", "sector", "industry", "country", "city",
+        "website", "marketCap", "enterpriseValue",
+        "trailingPE", "forwardPE", "pegRatio", "priceToBook",
+        "profitMargins", "operatingMargins", "grossMargins",
+        "returnOnEquity", "returnOnAssets",
+        "revenueGrowth", "earningsGrowth",
+        "dividendYield", "dividendRate", "payoutRatio",
+        "beta", "fiftyTwoWeekHigh", "fiftyTwoWeekLow",
+        "fiftyDayAverage", "twoHundredDayAverage",
+        "averageVolume", "averageVolume10days",
+        "fullTimeEmployees", "currentPrice",
+        "targetHighPrice", "targetLowPrice",
+        "targetMeanPrice", "targetMedianPrice",
+        "recommendationKey",
+    ]
+    profile = {}
+    for f in fields:
+        v = info.get(f)
+        if v is not None:
+            try:
+                if isinstance(v, float) and math.isnan(v):
+                    v = None
+            except (TypeError, ValueError):
+                pass
+        profile[f] = v
+
+    profile["longBusinessSummary"] = summary
+
+    cal_clean = {}
+    for k, v in cal.items():
+        if v is not None:
+            if isinstance(v, list):
+                cal_clean[k] = [str(x) for x in v]
+            else:
                 try:
                     if isinstance(v, float) and math.isnan(v):
                         v = None
                 except (TypeError, ValueError):
                     pass
-            profile[f] = v
-
-        profile["longBusinessSummary"] = summary
-
-        cal_clean = {}
-        for k, v in cal.items():
-            if v is not None:
-                if isinstance(v, list):
-                    cal_clean[k] = [str(x) for x in v]
-                else:
-                    try:
-                        if isinstance(v, float) and math.isnan(v):
-                            v = None
-                    except (TypeError, ValueError):
-                        pass
-                    cal_clean[k] = str(v) if v is not None else None
-        profile["calendar"] = cal_clean
-
-        return {"profile": profile}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+                cal_clean[k] = str(v) if v is not None else None
+    profile["calendar"] = cal_clean
+
+    return {"profile": profile}
+
+def _analyst_price_targets(ticker) -> dict | None:
+    pt = ticker.get_analyst_price_targets()
+    if pt is not None and isinstance(pt, dict):
+        return {
+            k: (None if (isinstance(v, float) and math.isnan(v)) else v)
+            for k, v in pt.items()
+        }
+    return None
+
+def _analyst_recommendations(ticker) -> dict | None:
+    rec = ticker.get_recommendations()
+    if rec is not None and not rec.empty:
+        latest = rec.iloc[0].to_dict()
+        return {
+            k: (None if (isinstance(v, float) and math.isnan(v)) else v)
+            for k, v in latest.items()
+        }
+    return None
+
+def _analyst_upgrades(ticker) -> list:
+    from openfinch import serialize
+
+    ud = ticker.get_upgrades_downgrades()
+    if ud is None or ud.empty:
+        return []
+    ud = ud.head(20)
+    with metrics.stage("serialize"):
+        return serialize.records({
+            "date": serialize.index_strings(ud.index),
+            "firm": serialize.text_column(ud, "Firm").tolist(),
+            "toGrade": serialize.text_column(ud, "ToGrade").tolist(),
+            "fromGrade": serialize.text_column(ud, "FromGrade").tolist(),
+            "action": serialize.text_column(ud, "Action").tolist(),
+        })
 
 @app.post("/api/analysts")
 def api_analysts(req: SymbolRequest):
+    from openfinch import serialize
+
     symbol = req.symbol.strip().upper()
     if not symbol:
         raise HTTPException(status_code=400, detail="Missing symbol")
 
-    try:
-        ticker = yf.Ticker(symbol)
-        result = {}
-
-        try:
-            pt = ticker.get_analyst_price_targets()
-            if pt is not None and isinstance(pt, dict):
-                result["priceTargets"] = {
-                    k: (None if (isinstance(v, float) and math.isnan(v)) else v)
-                    for k, v in pt.items()
-                }
-            else:
-                result["priceTargets"] = None
-        except Exception:
-            result["priceTargets"] = None
-
-        try:
-            rec = ticker.get_recommendations()
-            if rec is not None and not rec.empty:
-                latest = rec.iloc[0].to_dict()
-                result["recommendations"] = {
-                    k: (None if (isinstance(v, float) and math.isnan(v)) else v)
-                    for k, v in latest.items()
-                }
-            else:
-                result["recommendations"] = None
-        except Exception:
-            result["recommendations"] = None
-
-        try:
-            ud = ticker.get_upgrades_downgrades()
-            if ud is not None and not ud.empty:
-                rows = []
-                for idx, row in ud.head(20).iterrows():
-                    rows.append({
-                        "date": str(idx),
-                        "firm": str(row.get("Firm", "")),
-                        "toGrade": str(row.get("ToGrade", "")),
-                        "fromGrade": str(row.get("FromGrade", "")),
-                        "action": str(row.get("Action", "")),
-                    })
-                result["upgrades"] = rows
-            else:
-                result["upgrades"] = []
-        except Exception:
-            result["upgrades"] = []
-
-        try:
-            ih = ticker.get_institutional_holders()
-            if ih is not None and not ih.empty:
-                holders = []
-                for _, row in ih.iterrows():
-                    entry = {}
-                    for col in ih.columns:
-                        v = row.get(col)
-                        if v is not None:
-                            try:
-                                if isinstance(v, float) and math.isnan(v):
-                                    v = None
-                            except (TypeError, ValueError):
-                                pass
-                        entry[col] = str(v) if v is not None else None
-                    holders.append(entry)
-                result["institutional"] = holders
-            else:
-                result["institutional"] = []
-        except Exception:
-            result["institutional"] = []
-
-        try:
-            mf = ticker.get_mutualfund_holders()
-            if mf is not None and not mf.empty:
-                holders = []
-                for _, row in mf.iterrows():
-                    entry = {}
-                    for col in mf.columns:
-                        v = row.get(col)
-                        if v is not None:
-                            try:
-                                if isinstance(v, float) and math.isnan(v):
-                                    v = None
-                            except (TypeError, ValueError):
-                                pass
-                        entry[col] = str(v) if v is not None else None
-                    holders.append(entry)
-                result["mutualFund"] = holders
-            else:
-                result["mutualFund"] = []
-        except Exception:
-            result["mutualFund"] = []
+    def fetch():
+        ticker = yahoo.ticker(symbol)
+        # Sections run concurrently; a failed one falls back to its default
+        # and one that times out comes back as null.
+        return gather(
+            {
+                "priceTargets": lambda: _analyst_price_targets(ticker),
+                "recommendations": lambda: _analyst_recommendations(ticker),
+                "upgrades": lambda: _analyst_upgrades(ticker),
+                "institutional": lambda: serialize.to_records(ticker.get_institutional_holders(), stringify=True),
+                "mutualFund": lambda: serialize.to_records(ticker.get_mutualfund_holders(), stringify=True),
+            },
+            defaults={"upgrades": [], "institutional": [], "mutualFund": []},
+        )
 
-        return result
+    try:
+        return offline.cached(f"analysts:{symbol}", fetch)
+    except offline.NotCached as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/financials")
 def api_financials(req: FinancialsRequest):
+    from openfinch import serialize
+
     symbol = req.symbol.strip().upper()
     freq = req.freq.strip().lower()
     if not symbol:
@@ -404,74 +410,27 @@ def api_financials(req: FinancialsRequest):
     if freq not in ("annual", "quarterly"):
         freq = "annual"
 
-    try:
-        ticker = yf.Ticker(symbol)
-        result = {"freq": freq}
-
+    def fetch():
+        ticker = yahoo.ticker(symbol)
         yf_freq = "yearly" if freq == "annual" else freq
 
-        def df_to_dict(df):
-            if df is None or df.empty:
-                return None
-            out = {}
-            for col in df.columns:
-                col_key = str(col)
-                if hasattr(col, 'strftime'):
-                    col_key = col.strftime('%Y-%m-%d')
-                col_data = {}
-                for idx, val in df[col].items():
-                    v = val
-                    if v is not None:
-                        try:
-                            if isinstance(v, float) and math.isnan(v):
-                                v = None
-                        except (TypeError, ValueError):
-                            pass
-                    col_data[str(idx)] = v
-                out[col_key] = col_data
-            return out
-
-        try:
-            inc = ticker.get_financials(freq=yf_freq)
-            result["income"] = df_to_dict(inc)
-        except Exception:
-            result["income"] = None
-
-        try:
-            bs = ticker.get_balance_sheet(freq=yf_freq)
-            result["balance"] = df_to_dict(bs)
-        except Exception:
-            result["balance"] = None
-
-        try:
-            cf = ticker.get_cash_flow(freq=yf_freq)
-            result["cashflow"] = df_to_dict(cf)
-        except Exception:
-            result["cashflow"] = None
-
-        try:
-            ed = ticker.get_earnings_dates(limit=12)
-            if ed is not None and not ed.empty:
-                dates = []
-                for idx, row in ed.iterrows():
-                    entry = {"date": str(idx)}
-                    for col in ed.columns:
-                        v = row.get(col)
-                        if v is not None:
-                            try:
-                                if isinstance(v, float) and math.isnan(v):
-                                    v = None
-                            except (TypeError, ValueError):
-                                pass
-                        entry[col] = v
-                    dates.append(entry)
-                result["earningsDates"] = dates
-            else:
-                result["earningsDates"] = []
-        except Exception:
-            result["earningsDates"] = []
-
+        result = {"freq": freq}
+        result.update(gather(
+            {
+                "income": lambda: serialize.to_columns(ticker.get_financials(freq=yf_freq)),
+                "balance": lambda: serialize.to_columns(ticker.get_balance_sheet(freq=yf_freq)),
+                "cashflow": lambda: serialize.to_columns(ticker.get_cash_flow(freq=yf_freq)),
+                "earningsDates": lambda: serialize.to_records(
+                    ticker.get_earnings_dates(limit=12), index_label="date"),
+            },
+            defaults={"earningsDates": []},
+        ))
         return result
+
+    try:
+        return offline.cached(f"financials:{symbol}:{freq}", fetch)
+    except offline.NotCached as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -482,8 +441,57 @@ def api_holders(req: SymbolRequest):
         raise HTTPException(status_code=400, detail="Missing symbol")
 
     try:
-        result = get_holders(symbol)
-        return result
+        if offline.is_offline():
+            # Holdings are stored locally: answer from them whenever the CUSIP is known
+            try:
+                return get_holders(symbol)
+            except offline.NotCached:
+                pass
+        return offline.cached(f"holders:{symbol}", lambda: get_holders(symbol))
+    except Preparing as e:
+        # The 13F data set is downloading; clients poll until it's indexed
+        return JSONResponse(status_code=202, content={"status": "preparing", **e.status})
+    except IngestFailed as e:
+        # Nothing indexed and the download failed: don't keep clients polling
+        raise HTTPException(status_code=503, detail=str(e))
+    except offline.NotCached as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/holders/status")
+def api_holders_status():
+    return ingest_status()
+
+@app.post("/api/manager")
+def api_manager(req: ManagerRequest):
+    if not req.manager.strip():
+        raise HTTPException(status_code=400, detail="Missing manager")
+
+    try:
+        return get_portfolio(req.manager, req.period)
+    except Preparing as e:
+        return JSONResponse(status_code=202, content={"status": "preparing", **e.status})
+    except (IngestFailed, offline.NotCached) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/manager/overlap")
+def api_manager_overlap(req: OverlapRequest):
+    if not req.a.strip() or not req.b.strip():
+        raise HTTPException(status_code=400, detail="Missing manager")
+
+    try:
+        return get_overlap(req.a, req.b, req.period, max(1, min(req.limit, 100)))
+    except Preparing as e:
+        return JSONResponse(status_code=202, content={"status": "preparing", **e.status})
+    except (IngestFailed, offline.NotCached) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -493,16 +501,17 @@ def api_search(req: SearchRequest):
     if not query:
         return {"results": []}
 
+    local = symbols.get_index().search(query, limit=6)
+    if local or offline.is_offline():
+        return {"results": local}
+
     try:
-        import json
         url = (
             f"https://query2.finance.yahoo.com/v1/finance/search"
             f"?q={quote(query)}&quotesCount=6&newsCount=0"
             f"&enableFuzzyQuery=false&quotesQueryId=tss_match_phrase_query"
         )
-        yahoo_req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urlopen(yahoo_req, timeout=5) as resp:
-            raw = json.loads(resp.read().decode("utf-8"))
+        raw = yahoo.get_json(url, timeout=5)
 
         results = []
         for q in raw.get("quotes", []):
@@ -513,16 +522,191 @@ def api_search(req: SearchRequest):
                 "type": q.get("quoteType", ""),
             })
 
+        symbols.learn(results)
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def start_server():
-    """Start the local FastAPI server using Uvicorn and open the browser."""
-    url = f"http://127.0.0.1:{PORT}"
-    print(f"OpenFinCh API running at {url}")
+@app.get("/api/quotes")
+def api_quotes(symbols: str = ""):
+    wanted = quotes.parse_symbols(symbols)
+    if not wanted:
+        raise HTTPException(status_code=400, detail="Missing symbols")
+    if len(wanted) > quotes.MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {quotes.MAX_SYMBOLS} symbols per request")
+
+    try:
+        return quotes.get_quotes(wanted)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/offline")
+def api_offline():
+    return {"offline": offline.is_offline()}
+
+@app.post("/api/offline")
+def api_set_offline(req: OfflineRequest):
+    offline.set_offline(req.offline)
+    return {"offline": req.offline}
+
+# Endpoints that may be called through /api/batch: path -> (handler, request model)
+_BATCH_ROUTES = {
+    "/api/data": (api_data, SymbolRequest),
+    "/api/interval": (api_interval, IntervalRequest),
+    "/api/custom_interval": (api_custom_interval, CustomIntervalRequest),
+    "/api/news": (api_news, NewsRequest),
+    "/api/insiders": (api_insiders, SymbolRequest),
+    "/api/profile": (api_profile, SymbolRequest),
+    "/api/analysts": (api_analysts, SymbolRequest),
+    "/api/financials": (api_financials, FinancialsRequest),
+    "/api/holders": (api_holders, SymbolRequest),
+    "/api/manager": (api_manager, ManagerRequest),
+    "/api/manager/overlap": (api_manager_overlap, OverlapRequest),
+    "/api/search": (api_search, SearchRequest),
+}
+MAX_BATCH_SIZE = 20
+
+def _finite(value):
+    """Replace NaN and infinities (which JSON can't carry) with None, recursively."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+def _run_batch_item(index: int, item: BatchItem) -> dict:
+    """Run one sub-request, turning errors into a status/detail pair like the HTTP API would."""
+    result = {"id": item.id if item.id is not None else str(index), "endpoint": item.endpoint}
+    route = _BATCH_ROUTES.get(item.endpoint)
+    if route is None:
+        return {**result, "status": 404, "body": {"detail": f"Unknown endpoint '{item.endpoint}'"}}
+
+    handler, model = route
+    try:
+        body = handler(model.model_validate(item.body))
+        if isinstance(body, Response):
+            return {**result, "status": body.status_code, "body": json.loads(body.body or b"null")}
+        return {**result, "status": 200, "body": _finite(jsonable_encoder(body))}
+    except ValidationError as e:
+        return {**result, "status": 422, "body": {"detail": jsonable_encoder(e.errors())}}
+    except HTTPException as e:
+        return {**result, "status": e.status_code, "body": {"detail": e.detail}}
+    except Exception as e:
+        return {**result, "status": 500, "body": {"detail": str(e)}}
+
+@app.post("/api/batch")
+def api_batch(req: BatchRequest):
+    """Run several API calls concurrently in one round trip.
+
+    Each sub-request is {endpoint, body, id?}. Results come back as
+    {id, endpoint, status, body}: all at once in request order, or with
+    ``stream`` as NDJSON lines in completion order.
+    """
+    if len(req.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} requests per batch")
+
+    futures = [submit(_run_batch_item, i, item) for i, item in enumerate(req.requests)]
+
+    if not req.stream:
+        return {"results": [f.result() for f in futures]}
+
+    def _lines():
+        for future in concurrent.futures.as_completed(futures):
+            # Same rules as JSONResponse: a bare NaN would break the client's JSON.parse
+            yield json.dumps(future.result(), allow_nan=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+@app.get("/api/metrics/yahoo")
+def api_metrics_yahoo():
+    return yahoo.metrics()
+
+@app.get("/api/metrics/upstream")
+def api_metrics_upstream():
+    return upstream.metrics()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _require_profiling():
+    if not profiling.is_enabled():
+        raise HTTPException(status_code=404, detail="Request profiling is disabled (start with --profile-requests)")
+
+@app.get("/api/profiles")
+def api_profiles():
+    _require_profiling()
+    return {"directory": str(profiling.PROFILES_DIR), "profiles": profiling.list_profiles()}
+
+@app.get("/api/profiles/{name}")
+def api_profile_file(name: str):
+    _require_profiling()
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile '{name}'")
+    media_type = "application/json" if path.suffix == ".json" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+def start_server(
+    dev: bool = False,
+    headless: bool = False,
+    workers: int = 1,
+    host: str = "127.0.0.1",
+    port: int = PORT,
+    profile_requests: bool = False,
+    upstream_url: str | None = None,
+    offline_mode: bool = False,
+    prefetch_13f: bool = False,
+):
+    """Start the local FastAPI server using Uvicorn and open the browser.
+
+    In dev mode the frontend bundle is rebuilt whenever a source file
+    changes; otherwise it is built once at startup. Headless mode doesn't
+    open a browser. With more than one worker, uvicorn runs that many
+    server processes on one port; they share the SQLite cache and keep
+    their in-memory caches coherent through ``openfinch.coordination``.
+    With ``profile_requests``, requests can ask to be profiled (see
+    ``openfinch.profiling``). ``upstream_url`` sends all Yahoo, Google
+    News and SEC traffic to a stand-in server (see ``openfinch.upstream``).
+    ``offline_mode`` starts in offline mode, serving only cached data (see
+    ``openfinch.offline``); without it, offline mode left on by a previous
+    run is turned off. ``prefetch_13f`` starts downloading and indexing
+    SEC 13F data right away instead of on the first holders request.
+    """
+    import uvicorn
+
+    if profile_requests:
+        profiling.enable()
+        print(f"[OpenFinCh] Request profiling enabled, profiles go to {profiling.PROFILES_DIR}")
+    if upstream_url:
+        upstream.set_override(upstream_url)
+        print(f"[OpenFinCh] Upstream requests go to {upstream_url}")
+    offline.set_offline(offline_mode)
+    if prefetch_13f:
+        start_ingest()
+
+    if dev and workers > 1:
+        raise SystemExit("--dev needs a single worker (the bundle watcher runs in-process)")
+
+    url = f"http://{host}:{port}"
+    print(f"OpenFinCh API running at {url}" + (f" ({workers} workers)" if workers > 1 else ""))
     print("Press Ctrl+C to stop.")
 
-    threading.Timer(1.0, lambda: webbrowser.open(url)).start()
-    
-    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="info")
+    if not headless:
+        threading.Timer(1.0, lambda: webbrowser.open(url)).start()
+
+    if workers > 1:
+        # Workers import the app themselves and build the bundle on first request
+        uvicorn.run("openfinch.server:app", host=host, port=port, workers=workers, log_level="info")
+        return
+
+    try:
+        assets.get_bundle(DEFAULT_SYMBOL)
+    except OSError as e:
+        print(f"[OpenFinCh] Could not build frontend bundle: {e}")
+    if dev:
+        assets.start_watcher(DEFAULT_SYMBOL)
+
+    uvicorn.run(app, host=host, port=port, log_level="info")
@@ -0,0 +1,54 @@
+"""Startup import profiling (``python -m openfinch --profile-startup``).
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+and summarizes its output, so the breakdown reflects a real cold start
+rather than whatever the current process has already imported.
+"""
+
+import subprocess
+import sys
+
+DEFAULT_MODULE = "openfinch.server"
+
+
+def import_times(module: str = DEFAULT_MODULE) -> list[dict]:
+    """Import ``module`` in a subprocess and return per-module import times.
+
+    Each entry has ``module``, ``selfMs``, ``cumulativeMs`` and ``depth``
+    (0 for modules imported directly by ``module``'s import statement).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "selfMs": int(self_us) / 1000,
+            "cumulativeMs": int(cumulative_us) / 1000,
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return entries
+
+
+def print_profile(module: str = DEFAULT_MODULE, top: int = 15):
+    """Print total import time, time per top-level package and the slowest modules."""
+    entries = import_times(module)
+    total = next((e["cumulativeMs"] for e in entries if e["module"] == module), 0.0)
+
+    by_package: dict[str, float] = {}
+    for e in entries:
+        package = e["module"].split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0.0) + e["selfMs"]
+
+    print(f"[OpenFinCh] import {module}: {total:.0f} ms")
+    print(f"  {'package':<36}{'ms':>8}")
+    for package, ms in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {package:<36}{ms:>8.1f}")
+    print(f"  {'slowest modules (self)':<36}{'ms':>8}")
+    for e in sorted(entries, key=lambda e: e["selfMs"], reverse=True)[:top]:
+        print(f"  {e['module']:<36}{e['selfMs']:>8.1f}")
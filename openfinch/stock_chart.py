@@ -1,56 +1,73 @@
 """HTML chart page generator for OpenFinCh.
 
-This module only generates the HTML/CSS/JS for the chart page.
-Data is fetched dynamically via AJAX from the local server.
+This module only generates the HTML shell for the chart page; the CSS,
+JS and the Lightweight Charts library are served as separate, cacheable
+static assets. Data is fetched dynamically via AJAX from the local server.
 """
 
+import json
 import os
 from openfinch.intervals import get_interval_buttons
 
+FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend")
+CSS_FILE = os.path.join(FRONTEND_DIR, "css", "styles.css")
+LAYOUT_FILE = os.path.join(FRONTEND_DIR, "html", "layout.html")
+VENDOR_CHARTS_FILE = os.path.join(FRONTEND_DIR, "vendor", "lightweight-charts.standalone.production.js")
+JS_FILES = ["core.js", "ui.js", "drawings.js", "color_picker.js", "indicators.js", "data_panel.js", "init.js"]
+DEFAULT_INTERVAL = "1d"
 
-def build_chart_html(default_symbol: str) -> str:
-    """Generate the chart HTML page with an editable ticker and interval toggles."""
 
+def source_paths() -> list[str]:
+    """All frontend files the chart page is built from."""
+    return [CSS_FILE, LAYOUT_FILE, VENDOR_CHARTS_FILE] + [os.path.join(FRONTEND_DIR, "js", f) for f in JS_FILES]
+
+
+def read_sources(default_symbol: str) -> dict:
+    """Read the frontend files.
+
+    Returns a dict with ``css``, ``layout`` (with the initial symbol and
+    interval options injected), ``js`` and ``vendor`` strings.
+    """
     buttons = get_interval_buttons()
     interval_options_html = "\n      ".join(
         f'<option value="{b["key"]}">{b["label"]}</option>'
         for b in buttons
     )
-    default_interval = "1d"
 
-    frontend_dir = os.path.join(os.path.dirname(__file__), "frontend")
-    
-    with open(os.path.join(frontend_dir, "css", "styles.css"), "r", encoding="utf-8") as f:
+    with open(CSS_FILE, "r", encoding="utf-8") as f:
         styles_css = f.read()
 
-    with open(os.path.join(frontend_dir, "html", "layout.html"), "r", encoding="utf-8") as f:
+    with open(LAYOUT_FILE, "r", encoding="utf-8") as f:
         layout_html = f.read()
 
-    js_files = ["core.js", "ui.js", "drawings.js", "color_picker.js", "indicators.js", "data_panel.js", "init.js"]
+    with open(VENDOR_CHARTS_FILE, "r", encoding="utf-8") as f:
+        vendor_js = f.read()
+
     js_content = ""
-    for js_f in js_files:
-        with open(os.path.join(frontend_dir, "js", js_f), "r", encoding="utf-8") as f:
+    for js_f in JS_FILES:
+        with open(os.path.join(FRONTEND_DIR, "js", js_f), "r", encoding="utf-8") as f:
             js_content += f.read() + "\n"
 
     # Inject variables
     layout_html = layout_html.replace("{default_symbol}", default_symbol)
     layout_html = layout_html.replace("{interval_options_html}", interval_options_html)
 
-    js_content = js_content.replace("{default_interval}", default_interval)
-    js_content = js_content.replace("{default_symbol}", default_symbol)
+    return {"css": styles_css, "layout": layout_html, "js": js_content, "vendor": vendor_js}
 
+
+def render_shell(default_symbol: str, layout: str, css_url: str, vendor_url: str, js_url: str) -> str:
+    """Assemble the HTML shell that links the static assets."""
+    config = json.dumps({"symbol": default_symbol, "interval": DEFAULT_INTERVAL})
     return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
 <title>{default_symbol} — OpenFinCh</title>
-<style>
-{styles_css}
-</style>
+<link rel="stylesheet" href="{css_url}">
 </head>
 <body>
-{layout_html}
-<script src="https://unpkg.com/lightweight-charts@4/dist/lightweight-charts.standalone.production.js"></script>
+{layout}
+<script src="{vendor_url}"></script>
 <script>
 window.onerror = function(msg, url, lineNo, columnNo, error) {{
   var err = document.createElement('div');
@@ -66,10 +83,9 @@ window.onerror = function(msg, url, lineNo, columnNo, error) {{
   err.innerHTML = 'ERROR: ' + msg + '<br>Line: ' + lineNo;
   document.body.appendChild(err);
 }};
+window.OPENFINCH_CONFIG = {config};
 </script>
-<script>
-{js_content}
-</script>
+<script src="{js_url}"></script>
 </body>
 </html>
 """
@@ -0,0 +1,251 @@
+"""Local symbol universe for ticker autocomplete.
+
+Symbols are loaded from the bundled ``data/symbols.csv`` and an optional
+user file (``~/.openfinch/symbols.csv``), and every Yahoo search result
+seen is added to the index and appended to the user file. Lookups run
+against in-memory sorted arrays, so the search endpoint only needs to go
+to Yahoo when the local index has nothing to offer.
+"""
+
+import bisect
+import csv
+import difflib
+import heapq
+import re
+import threading
+from pathlib import Path
+
+BUNDLED_SYMBOLS_PATH = Path(__file__).parent / "data" / "symbols.csv"
+USER_SYMBOLS_PATH = Path.home() / ".openfinch" / "symbols.csv"
+CSV_FIELDS = ["symbol", "name", "exchange", "type"]
+
+_TOKEN_RE = re.compile(r"[A-Z0-9]+")
+# Sorts after any character that can appear in an upper-cased token
+_HIGH = "\uffff"
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.upper())
+
+
+def _entry(record: dict) -> dict | None:
+    """A record normalized to {symbol, name, exchange, type}, or None without a symbol."""
+    symbol = (record.get("symbol") or "").strip().upper()
+    if not symbol:
+        return None
+    return {
+        "symbol": symbol,
+        "name": (record.get("name") or "").strip(),
+        "exchange": (record.get("exchange") or "").strip(),
+        "type": (record.get("type") or "").strip(),
+    }
+
+
+class SymbolIndex:
+    """In-memory symbol and company-name index with prefix and fuzzy lookup.
+
+    ``_symbols`` is a sorted list of ticker symbols and ``_name_tokens`` a
+    sorted list of ``(token, name length, symbol)`` entries, so both prefix
+    queries are a pair of binary searches, and the symbols under each
+    token already come in ranking order (shortest company name first).
+    """
+
+    BULK = 32         # Adds beyond this re-sort the lists once instead of inserting one by one
+    SORT_LIMIT = 256  # Token matches up to this many are ranked by sorting them outright
+
+    def __init__(self):
+        self._records: dict[str, dict] = {}
+        self._symbols: list[str] = []
+        self._name_tokens: list[tuple[str, int, str]] = []
+        self._tokens: list[str] = []  # distinct name tokens, sorted
+        self._symbol_tokens: dict[str, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: dict) -> bool:
+        """Add a {symbol, name, exchange, type} record. Returns True if it was new."""
+        return bool(self.add_many([record]))
+
+    def add_many(self, records) -> list[dict]:
+        """Add records, returning the (normalized) ones that were new."""
+        new = []
+        with self._lock:
+            for record in records:
+                entry = _entry(record)
+                if entry is None:
+                    continue
+                existing = self._records.get(entry["symbol"])
+                if existing is not None:
+                    # Fill in details an earlier, sparser source left blank
+                    for k, v in entry.items():
+                        if v and not existing[k]:
+                            existing[k] = v
+                    continue
+                self._records[entry["symbol"]] = entry
+                new.append(entry)
+            self._insert(new)
+        return new
+
+    def _insert(self, entries: list[dict]):
+        name_tokens = []
+        for entry in entries:
+            symbol = entry["symbol"]
+            tokens = tuple(set(_tokens(entry["name"])))
+            self._symbol_tokens[symbol] = tokens
+            name_tokens.extend((tok, len(entry["name"]), symbol) for tok in tokens)
+        if len(entries) > self.BULK:
+            self._symbols.extend(e["symbol"] for e in entries)
+            self._symbols.sort()
+            self._name_tokens.extend(name_tokens)
+            self._name_tokens.sort()
+            self._tokens = sorted(set(self._tokens).union(tok for tok, _, _ in name_tokens))
+            return
+        for entry in entries:
+            bisect.insort(self._symbols, entry["symbol"])
+        for item in name_tokens:
+            bisect.insort(self._name_tokens, item)
+            tok = item[0]
+            i = bisect.bisect_left(self._tokens, tok)
+            if i == len(self._tokens) or self._tokens[i] != tok:
+                self._tokens.insert(i, tok)
+
+    def load_csv(self, path: Path) -> int:
+        """Load symbols from a CSV with symbol,name,exchange,type columns."""
+        if not path.exists():
+            return 0
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return len(self.add_many(csv.DictReader(f)))
+
+    def _symbol_prefix(self, prefix: str) -> list[str]:
+        lo = bisect.bisect_left(self._symbols, prefix)
+        hi = bisect.bisect_left(self._symbols, prefix + _HIGH)
+        return self._symbols[lo:hi]
+
+    def _token_range(self, prefix: str) -> tuple[int, int]:
+        return (bisect.bisect_left(self._name_tokens, (prefix,)),
+                bisect.bisect_left(self._name_tokens, (prefix + _HIGH,)))
+
+    def _token_prefix(self, prefix: str) -> set[str]:
+        lo, hi = self._token_range(prefix)
+        return {sym for _, _, sym in self._name_tokens[lo:hi]}
+
+    def _token_group(self, i: int):
+        tok = self._name_tokens[i][0]
+        while i < len(self._name_tokens) and self._name_tokens[i][0] == tok:
+            yield self._name_tokens[i][1:]
+            i += 1
+
+    def _ranked_token_prefix(self, prefix: str):
+        """(name length, symbol) with a name token starting with ``prefix``, best first, lazily.
+
+        A symbol can come more than once (e.g. for "INC" and "INCOME").
+        """
+        lo, hi = self._token_range(prefix)
+        if hi - lo <= self.SORT_LIMIT:
+            return iter(sorted(item[1:] for item in self._name_tokens[lo:hi]))
+        # Each token's entries are already ranked: merge them rather than sort them all
+        first = bisect.bisect_left(self._tokens, prefix)
+        last = bisect.bisect_left(self._tokens, prefix + _HIGH)
+        return heapq.merge(*(self._token_group(bisect.bisect_left(self._name_tokens, (tok,)))
+                             for tok in self._tokens[first:last]))
+
+    def _fuzzy_tokens(self, tok: str) -> list[str]:
+        """Known tokens close to ``tok``, assuming its first letter is right."""
+        lo = bisect.bisect_left(self._tokens, tok[0])
+        hi = bisect.bisect_left(self._tokens, tok[0] + _HIGH)
+        candidates = [t for t in self._tokens[lo:hi] if abs(len(t) - len(tok)) <= 2]
+        return difflib.get_close_matches(tok, candidates, n=5, cutoff=0.75)
+
+    def search(self, query: str, limit: int = 6) -> list[dict]:
+        """Return up to ``limit`` records matching the query.
+
+        Ranking: exact symbol, then symbol prefix matches (shortest first),
+        then companies whose name tokens start with every query token. If
+        none of those match, the query tokens are fuzzily matched against
+        known name tokens sharing their first letter.
+        """
+        q = query.strip().upper()
+        if not q:
+            return []
+
+        with self._lock:
+            ranked: list[str] = []
+            seen: set[str] = set()
+
+            def take(symbols):
+                for sym in symbols:
+                    if len(ranked) >= limit:
+                        return
+                    if sym not in seen:
+                        seen.add(sym)
+                        ranked.append(sym)
+
+            if q in self._records:
+                take([q])
+            take(heapq.nsmallest(limit, self._symbol_prefix(q), key=lambda s: (len(s), s)))
+
+            q_tokens = _tokens(q)
+            if q_tokens and len(ranked) < limit:
+                # Walk the narrowest token's matches in rank order, keeping those
+                # that match the other tokens too, until there are enough
+                spans = {tok: self._token_range(tok) for tok in q_tokens}
+                lead = min(q_tokens, key=lambda tok: spans[tok][1] - spans[tok][0])
+                others = [tok for tok in q_tokens if tok != lead]
+                take(sym for _, sym in self._ranked_token_prefix(lead)
+                     if all(any(t.startswith(o) for t in self._symbol_tokens[sym]) for o in others))
+
+            if not ranked and q_tokens:
+                matches = None
+                for tok in q_tokens:
+                    close = self._fuzzy_tokens(tok)
+                    syms = set().union(*(self._token_prefix(c) for c in close)) if close else set()
+                    matches = syms if matches is None else matches & syms
+                    if not matches:
+                        break
+                if matches:
+                    take(heapq.nsmallest(limit, matches))
+
+            return [dict(self._records[s]) for s in ranked[:limit]]
+
+
+_index: SymbolIndex | None = None
+_index_lock = threading.Lock()
+_user_file_lock = threading.Lock()
+
+
+def get_index() -> SymbolIndex:
+    """Return the process-wide symbol index, loading the CSV files on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SymbolIndex()
+                index.load_csv(BUNDLED_SYMBOLS_PATH)
+                index.load_csv(USER_SYMBOLS_PATH)
+                _index = index
+    return _index
+
+
+def preload():
+    """Load the index in a background thread, so the first search doesn't wait for it."""
+    threading.Thread(target=get_index, name="openfinch-symbols", daemon=True).start()
+
+
+def learn(results: list[dict]) -> None:
+    """Add upstream search results to the index and persist the new ones."""
+    new = get_index().add_many(results)
+    if not new:
+        return
+    try:
+        with _user_file_lock:
+            USER_SYMBOLS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            write_header = not USER_SYMBOLS_PATH.exists()
+            with open(USER_SYMBOLS_PATH, "a", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(new)
+    except OSError as e:
+        print(f"[OpenFinCh] Could not save symbols to {USER_SYMBOLS_PATH}: {e}")
@@ -0,0 +1,320 @@
+"""Shared governor for outbound requests to Yahoo, Google News and SEC.
+
+Every upstream call goes through ``call()``, which for the target host
+applies:
+
+* a token-bucket rate limit, so bursts from parallel interval fetches or
+  batch requests queue up instead of getting us throttled;
+* jittered exponential backoff on 429/5xx and network errors (honouring
+  ``Retry-After``) for idempotent requests;
+* a circuit breaker that, after repeated failures, rejects calls
+  immediately with ``UpstreamUnavailable`` until a cool-down has passed,
+  so callers can fall back to whatever they have cached instead of
+  waiting on a host that is throttling us.
+
+In offline mode (``openfinch.offline``) every call fails immediately with
+``Offline``.
+
+Setting ``OVERRIDE_ENV`` (``--upstream`` on the command line) sends every
+upstream request to a stand-in server instead, e.g.
+``https://query2.finance.yahoo.com/v8/finance/chart/AAPL`` becomes
+``<override>/query2.finance.yahoo.com/v8/finance/chart/AAPL`` (see
+``benchmarks/fixture_server.py``). Host policies still apply by the
+original host, so load tests see production rate limits.
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from openfinch import offline
+# Aliased: this module's own metrics() would shadow it
+from openfinch import metrics as request_metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5       # Seconds before the first retry
+BACKOFF_CAP = 8.0        # Longest single backoff sleep
+MAX_QUEUE_WAIT = 10.0    # Reject instead of queueing longer than this for a token
+OVERRIDE_ENV = "OPENFINCH_UPSTREAM_URL"   # Environment, so uvicorn workers inherit it
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    rate: float                   # Sustained requests per second
+    burst: int                    # Requests allowed back-to-back
+    max_retries: int = 2
+    failure_threshold: int = 5    # Consecutive failures that open the circuit
+    reset_timeout: float = 30.0   # Seconds the circuit stays open before a probe
+
+
+# Matched against the request host, then its parent domains (www.sec.gov -> sec.gov)
+POLICIES = {
+    "query1.finance.yahoo.com": HostPolicy(rate=5, burst=10),
+    "query2.finance.yahoo.com": HostPolicy(rate=5, burst=10),
+    "news.google.com": HostPolicy(rate=2, burst=5),
+    # SEC fair-access policy allows at most 10 requests/second
+    "sec.gov": HostPolicy(rate=8, burst=8, reset_timeout=60.0),
+}
+DEFAULT_POLICY = HostPolicy(rate=10, burst=20)
+
+
+class UpstreamUnavailable(ConnectionError):
+    """Raised without contacting the host while its circuit is open or its queue is full."""
+
+
+class Offline(UpstreamUnavailable):
+    """Raised for every upstream request while offline mode is on."""
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float | None:
+        """Take a token and return how long to wait before using it.
+
+        Tokens may go negative, which queues callers in arrival order.
+        Returns None (taking nothing) if the wait would exceed ``max_wait``.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+
+class _CircuitBreaker:
+    """closed → (failure_threshold failures) → open → (reset_timeout) → half-open.
+
+    In half-open state a single probe request is let through; its outcome
+    closes the circuit again or re-opens it for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a half-open probe slot without recording an outcome."""
+        with self.lock:
+            self.probing = False
+
+    def record(self, ok: bool) -> bool:
+        """Record an outcome; returns True if this opened the circuit."""
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.state = "closed"
+                self.failures = 0
+                return False
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                opened = self.state != "open"
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+    def retry_in(self) -> float:
+        with self.lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class _Governor:
+    """Rate limit, breaker and counters for one host."""
+
+    def __init__(self, host: str, policy: HostPolicy):
+        self.host = host
+        self.policy = policy
+        self.bucket = _TokenBucket(policy.rate, policy.burst)
+        self.breaker = _CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.counts = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "rejected": 0}
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counts[name] += n
+
+    def stats(self) -> dict:
+        with self.lock:
+            out = dict(self.counts)
+            out["queuedSeconds"] = round(self.waited, 3)
+        out["circuit"] = self.breaker.state
+        out["retryIn"] = round(self.breaker.retry_in(), 1)
+        out["rate"] = self.policy.rate
+        out["burst"] = self.policy.burst
+        return out
+
+
+_governors: dict[str, _Governor] = {}
+_governors_lock = threading.Lock()
+
+
+def _policy_for(host: str) -> HostPolicy:
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        policy = POLICIES.get(".".join(parts[i:]))
+        if policy is not None:
+            return policy
+    return DEFAULT_POLICY
+
+
+def governor(url_or_host: str) -> _Governor:
+    """Return the governor for a URL's host, creating it on first use."""
+    host = urlsplit(url_or_host).hostname if "://" in url_or_host else url_or_host
+    host = (host or "").lower()
+    with _governors_lock:
+        gov = _governors.get(host)
+        if gov is None:
+            gov = _governors[host] = _Governor(host, _policy_for(host))
+        return gov
+
+
+def set_override(base_url: str | None):
+    """Send upstream requests to ``base_url`` (None restores the real hosts)."""
+    if base_url:
+        os.environ[OVERRIDE_ENV] = base_url.rstrip("/")
+    else:
+        os.environ.pop(OVERRIDE_ENV, None)
+
+
+def resolve(url: str) -> str:
+    """The URL to actually fetch for ``url``, honouring the override."""
+    base = os.environ.get(OVERRIDE_ENV)
+    if not base:
+        return url
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    return f"{base}/{parts.hostname}{path}" + (f"?{parts.query}" if parts.query else "")
+
+
+def _status(obj) -> int | None:
+    """HTTP status of a response or HTTP error object, if it has one."""
+    for attr in ("status_code", "code"):
+        value = getattr(obj, attr, None)
+        # curl errors carry a small integer curl code, not an HTTP status
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(obj, "response", None)
+    if response is not None and response is not obj:
+        return _status(response)
+    return None
+
+
+def _retry_after(obj) -> float | None:
+    headers = getattr(obj, "headers", None)
+    if headers is None and getattr(obj, "response", None) is not None:
+        headers = getattr(obj.response, "headers", None)
+    try:
+        return float(headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, retry_after: float | None) -> float:
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_CAP)
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+
+def call(url: str, fn, retry: bool = True):
+    """Run ``fn()`` (one request to ``url``'s host) under that host's governor.
+
+    ``fn`` may return a response object or raise; a 429/5xx status or an
+    exception without an HTTP status (timeout, connection reset) counts as
+    a failure. Other responses and HTTP errors (404, 304, ...) are passed
+    through as-is. Failures are retried with backoff when ``retry`` is set;
+    once retries are exhausted the last response is returned or the last
+    exception re-raised. Raises ``UpstreamUnavailable`` without calling
+    ``fn`` while the circuit is open or the rate-limit queue is too long,
+    and ``Offline`` in offline mode.
+    """
+    if offline.is_offline():
+        raise Offline(f"Offline mode: not contacting {urlsplit(url).hostname}")
+    gov = governor(url)
+    attempts = gov.policy.max_retries + 1 if retry else 1
+
+    for attempt in range(attempts):
+        if not gov.breaker.allow():
+            gov.count("rejected")
+            raise UpstreamUnavailable(
+                f"{gov.host} is unavailable (circuit open, retry in {gov.breaker.retry_in():.0f}s)"
+            )
+        wait = gov.bucket.reserve(MAX_QUEUE_WAIT)
+        if wait is None:
+            gov.breaker.release()
+            gov.count("rejected")
+            raise UpstreamUnavailable(f"{gov.host} rate-limit queue is full")
+        if wait:
+            with gov.lock:
+                gov.waited += wait
+            time.sleep(wait)
+
+        gov.count("requests")
+        request_metrics.upstream_call(gov.host)
+        try:
+            with request_metrics.stage("upstream"):
+                result = fn()
+        except Exception as e:
+            status = _status(e)
+            if status is not None and status not in RETRY_STATUSES:
+                gov.breaker.record(True)
+                raise
+            outcome, error = e, True
+        else:
+            status = _status(result)
+            if status not in RETRY_STATUSES:
+                gov.breaker.record(True)
+                return result
+            outcome, error = result, False
+
+        if status == 429:
+            gov.count("throttled")
+        gov.count("failures")
+        if gov.breaker.record(False):
+            print(f"[OpenFinCh] Upstream {gov.host} unhealthy, failing fast for {gov.policy.reset_timeout:.0f}s")
+
+        if attempt + 1 >= attempts:
+            if error:
+                raise outcome
+            return outcome
+        gov.count("retries")
+        time.sleep(_backoff(attempt, _retry_after(outcome)))
+
+
+def metrics() -> dict:
+    """Per-host governor state and counters."""
+    with _governors_lock:
+        governors = list(_governors.values())
+    return {gov.host: gov.stats() for gov in governors}
@@ -0,0 +1,146 @@
+"""Process-wide Yahoo Finance client.
+
+All Yahoo traffic goes through here: one pooled keep-alive HTTP session
+(shared with yfinance, so the cookie/crumb handshake happens once per
+process) and a bounded LRU of ``yf.Ticker`` objects per symbol. The
+session records which requests reused an existing connection, exposed
+through ``metrics()``.
+"""
+
+import threading
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from openfinch import upstream
+from openfinch.cache import LRUCache
+
+if TYPE_CHECKING:  # yfinance and curl_cffi are imported on first use
+    import yfinance as yf
+
+TICKER_POOL_SIZE = 64
+TICKER_TTL = 15 * 60     # Tickers cache info/fundamentals internally; don't keep them forever
+REQUEST_TIMEOUT = 10
+
+_metrics_lock = threading.Lock()
+_requests_by_host: dict[str, int] = {}
+_connections: set[tuple[str, int]] = set()  # (server ip, local port) pairs seen so far
+_new_connections = 0
+_reused_connections = 0
+
+
+def _session_class():
+    """Build the metered session class on top of curl_cffi (or requests).
+
+    Done on first use so importing this module doesn't pull in the HTTP
+    stack.
+    """
+    try:
+        from curl_cffi import requests as http
+        kwargs = {"impersonate": "chrome"}
+    except ImportError:  # yfinance falls back to plain requests in this case too
+        import requests as http
+        kwargs = {}
+
+    class _MeteredSession(http.Session):
+        """HTTP session that counts requests per host and connection reuse.
+
+        A response whose (server IP, local port) pair has been seen before
+        travelled over a kept-alive connection. Every request goes through the
+        upstream governor, so yfinance's own calls are rate limited and retried
+        too.
+        """
+
+        def request(self, method, url, *args, **kwargs):
+            global _new_connections, _reused_connections
+
+            def _send():
+                return super(_MeteredSession, self).request(method, upstream.resolve(url), *args, **kwargs)
+
+            resp = upstream.call(url, _send, retry=method.upper() in ("GET", "HEAD"))
+            host = urlsplit(url).hostname or ""
+            conn = (getattr(resp, "primary_ip", ""), getattr(resp, "local_port", 0))
+            with _metrics_lock:
+                _requests_by_host[host] = _requests_by_host.get(host, 0) + 1
+                if conn[1]:
+                    if conn in _connections:
+                        _reused_connections += 1
+                    else:
+                        _connections.add(conn)
+                        _new_connections += 1
+            return resp
+
+    return _MeteredSession, kwargs
+
+
+_session = None
+_session_lock = threading.Lock()
+_tickers = LRUCache(maxsize=TICKER_POOL_SIZE, ttl=TICKER_TTL, name="yahoo.tickers")
+
+
+def get_session():
+    """Return the shared HTTP session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session_class, kwargs = _session_class()
+                _session = session_class(**kwargs)
+    return _session
+
+
+def ticker(symbol: str) -> "yf.Ticker":
+    """Return a pooled ``yf.Ticker`` for a symbol."""
+    import yfinance as yf
+
+    symbol = symbol.upper()
+    return _tickers.get_or_create(symbol, lambda: yf.Ticker(symbol, session=get_session()))
+
+
+def history(symbol: str, period: str, interval: str):
+    """Download OHLCV history for a symbol (thin wrapper over ``Ticker.history``)."""
+    return ticker(symbol).history(period=period, interval=interval)
+
+
+def download(symbols: list[str], period: str, interval: str) -> dict:
+    """Download history for several symbols in one batched request.
+
+    Returns {symbol: DataFrame}; symbols Yahoo had no data for are omitted.
+    Bars keep their exchange timezone like ``history()``'s (yfinance would
+    otherwise strip it from daily bars), so both store the same timestamps.
+    """
+    import yfinance as yf
+
+    df = yf.download(
+        symbols, period=period, interval=interval, group_by="ticker", ignore_tz=False,
+        threads=True, progress=False, timeout=REQUEST_TIMEOUT, session=get_session(),
+    )
+    if df is None or df.empty:
+        return {}
+    frames = {}
+    for symbol in symbols:
+        if symbol not in df.columns.get_level_values(0):
+            continue
+        frame = df[symbol].dropna(how="all")
+        if not frame.empty:
+            frames[symbol] = frame
+    return frames
+
+
+def get_json(url: str, timeout: float = REQUEST_TIMEOUT) -> dict:
+    """GET a Yahoo JSON API URL over the shared session."""
+    resp = get_session().get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def metrics() -> dict:
+    """Connection-reuse and ticker-pool counters for the Yahoo client."""
+    with _metrics_lock:
+        total = _new_connections + _reused_connections
+        return {
+            "requests": dict(_requests_by_host),
+            "newConnections": _new_connections,
+            "reusedConnections": _reused_connections,
+            "reuseRate": round(_reused_connections / total, 4) if total else None,
+            "tickers": _tickers.stats(),
+        }